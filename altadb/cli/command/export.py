@@ -44,6 +44,11 @@ class CLIExportController(CLIExportInterface):
             default=None,
             help="Search Term to filter matching Series, Study or Import data.",
         )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Discard any previous export in the folder, instead of resuming it.",
+        )
 
     def handler(self, args: Namespace) -> None:
         """Handle upload command."""
@@ -58,4 +63,5 @@ class CLIExportController(CLIExportInterface):
             self.args.concurrency,
             self.args.number,
             self.args.search,
+            self.args.overwrite,
         )
@@ -23,7 +23,8 @@ class CLIUploadController(CLIUploadInterface):
         )
         parser.add_argument(
             "path",
-            help="The path containing files to upload to the project",
+            help="The path containing files to upload to the project "
+            + "(a directory, file, or zip/tar archive)",
         )
         parser.add_argument(
             "-n",
@@ -37,6 +38,24 @@ class CLIUploadController(CLIUploadInterface):
             default=MAX_UPLOAD_CONCURRENCY,
             help=f"Concurrency value (Default: {MAX_UPLOAD_CONCURRENCY})",
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only upload files that are new or changed since a previous upload",
+        )
+        parser.add_argument(
+            "--dedupe",
+            action="store_true",
+            help="Skip files whose content or SOPInstanceUID is already uploaded "
+            + "(implies --incremental)",
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes uploading the files (Default: 1)",
+        )
 
     def handler(self, args: Namespace) -> None:
         """Handle upload command."""
@@ -54,5 +73,8 @@ class CLIUploadController(CLIUploadInterface):
                 path,
                 self.args.name or None,
                 self.args.concurrency,
+                self.args.incremental,
+                self.args.dedupe,
+                self.args.workers,
             )
         )
@@ -86,6 +86,7 @@ class CLIDataset:
         page_size: int = MAX_CONCURRENCY,
         number: Optional[int] = None,
         search: Optional[str] = None,
+        overwrite: bool = False,
     ) -> None:
         """Export files from dataset."""
-        self.dataset.export_to_files(path, page_size, number, search)
+        self.dataset.export_to_files(path, page_size, number, search, overwrite)
@@ -1,5 +1,6 @@
 """Graphql Client responsible for make API requests."""
 
+import asyncio
 import time
 import json
 import base64
@@ -21,6 +22,7 @@ from altadb.common.constants import (
     REQUEST_TIMEOUT,
     PEERLESS_ERRORS,
 )
+from altadb.common.errors import RequestTooLargeError
 from altadb.utils.logging import assert_validation, log_error, logger
 
 
@@ -119,21 +121,33 @@ class AltaDBClient:
         """Execute a graphql query using asyncio."""
         start_time = time.time()
         logger.debug("Executing async: " + query.strip().split("\n")[0])
-        async with aio_session.post(
-            self.url,
-            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
-            headers=self.headers,
-            data=self.prepare_query(query, variables),
-        ) as response:
-            self._check_status_msg(response.status, start_time)
-            return self._process_json_response(await response.json(), raise_for_error)
+        try:
+            async with aio_session.post(
+                self.url,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                headers=self.headers,
+                data=self.prepare_query(query, variables),
+            ) as response:
+                self._check_status_msg(response.status, start_time)
+                return self._process_json_response(
+                    await response.json(), raise_for_error
+                )
+        except asyncio.TimeoutError as error:
+            if isinstance(error, TimeoutError):
+                raise
+            # Not a TimeoutError before Python 3.11, and would be retried
+            raise TimeoutError("Request timed out") from error
 
     @staticmethod
     def _check_status_msg(response_status: int, start_time: float) -> None:
         total_time = time.time() - start_time
         logger.debug(f"Response status: {response_status} took {total_time} seconds")
-        if response_status == 413 or response_status >= 500:
-            if response_status == 413 or total_time >= 26:
+        if response_status == 413:
+            raise RequestTooLargeError(
+                "Request too large. Please consider using lower concurrency"
+            )
+        if response_status >= 500:
+            if total_time >= 26:
                 raise TimeoutError(
                     "Request timed out/too large. Please consider using lower concurrency"
                 )
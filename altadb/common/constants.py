@@ -2,14 +2,40 @@
 
 MAX_CONCURRENCY = 30
 MAX_FILE_BATCH_SIZE = 1000
+SCAN_CHUNK_SIZE = 256
+SCAN_WORKERS = 8
+DICOM_PREAMBLE_SIZE = 132
+PRESIGN_GROW_AFTER = 4
+IMPORT_STATUS_PAGE_SIZE = 50
+IMPORT_POLL_MIN_DELAY = 2
+IMPORT_POLL_MAX_DELAY = 30
 MAX_UPLOAD_CONCURRENCY = 5
 MAX_FILE_UPLOADS = 50
+# Hard limit of adaptive windows (the uploaders of an upload)
+MAX_CONCURRENCY_WINDOW = MAX_UPLOAD_CONCURRENCY * MAX_FILE_UPLOADS
+UPLOAD_WORKER_CHUNK_SIZE = 64
+UPLOAD_WORKER_REPORT_INTERVAL = 0.5
 MAX_RETRY_ATTEMPTS = 3
 REQUEST_TIMEOUT = 30
 EXPORT_PAGE_SIZE = 50
+EXPORT_PREFETCH_PAGES = 2
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+ARCHIVE_SPOOL_SIZE = 64 * 1024  # In memory, per compressed tar member queued
+MAX_HEADER_TEMPLATES = 64
+EXPORT_MAX_REQUESTS = 64
+EXPORT_MAX_BYTES = 512 * 1024 * 1024
+EXPORT_FRAME_SPOOL_SIZE = 8 * 1024 * 1024  # Larger frames are spooled to disk
+
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 30
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
 
 DEFAULT_URL = "https://app.altadb.com"
 
+IMPORT_TERMINAL_STATUSES = ("CREATION_SUCCESS", "CREATION_PARTIAL", "CREATION_FAILURE")
+
 PEERLESS_ERRORS = (
     KeyboardInterrupt,
     PermissionError,
@@ -3,6 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple
 
+import aiohttp
+
 
 class DatasetRepoInterface(ABC):
     """Abstract interface to Dataset APIs."""
@@ -33,10 +35,25 @@ class DatasetRepoInterface(ABC):
 
     @abstractmethod
     def get_data_store_imports(
-        self, org_id: str, data_store: str
+        self,
+        org_id: str,
+        data_store: str,
+        first: int = 20,
+        cursor: Optional[str] = None,
     ) -> Tuple[List[Dict], str]:
         """Get data store imports."""
 
+    @abstractmethod
+    async def get_data_store_imports_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        first: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], str]:
+        """Get data store imports, without blocking the event loop."""
+
     @abstractmethod
     def get_data_store_import_series(
         self,
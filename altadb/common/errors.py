@@ -0,0 +1,11 @@
+"""Errors raised by the SDK."""
+
+
+class RequestTooLargeError(TimeoutError):
+    """Request rejected by the server for being too large (HTTP 413).
+
+    A TimeoutError, so that it is not retried as is, and handled by the
+    callers of requests that timed out (e.g. split into smaller requests).
+    """
+
+    status = 413
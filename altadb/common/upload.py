@@ -3,6 +3,8 @@
 from typing import List, Dict, Optional, Tuple
 from abc import ABC, abstractmethod
 
+import aiohttp
+
 
 class UploadControllerInterface(ABC):
     """Abstract interface to define methods for Upload."""
@@ -27,3 +29,26 @@ class UploadControllerInterface(ABC):
         total_files: int,
     ) -> bool:
         """Process import."""
+
+    @abstractmethod
+    async def import_files_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        import_name: Optional[str] = None,
+        import_id: Optional[str] = None,
+        files: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[str, List[str]]:
+        """Import files into a dataset, without blocking the event loop."""
+
+    @abstractmethod
+    async def process_import_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        import_id: str,
+        total_files: int,
+    ) -> bool:
+        """Process import, without blocking the event loop."""
@@ -1,10 +1,13 @@
 """AltaDB SDK global config."""
 
 import logging
-from typing import Callable, TypedDict
+from typing import Callable, Optional, TypedDict, Union
 import os
 from typing_extensions import Required  # type: ignore
 
+from altadb.common.constants import EXPORT_MAX_BYTES, EXPORT_MAX_REQUESTS
+from altadb.utils.common_utils import BandwidthSchedule, parse_rate, parse_schedule
+
 
 class Config:
     """Basic altadb config."""
@@ -16,6 +19,12 @@ class Config:
         debug: Callable[[], bool]
         verify_ssl: Callable[[], bool]
         log_level: Callable[[], int]
+        export_executor: Callable[[], str]
+        export_max_requests: Callable[[], int]
+        export_max_bytes: Callable[[], int]
+        download_bandwidth: Callable[[], Optional[int]]
+        upload_bandwidth: Callable[[], Optional[int]]
+        bandwidth_schedule: Callable[[], BandwidthSchedule]
 
     class ConfigState(TypedDict, total=False):
         """AltaDB config state."""
@@ -25,6 +34,14 @@ class Config:
         debug: bool
         verify_ssl: bool
         log_level: int
+        export_executor: str
+        export_max_requests: int
+        export_max_bytes: int
+        download_bandwidth: Optional[int]
+        upload_bandwidth: Optional[int]
+        bandwidth_schedule: BandwidthSchedule
+
+    EXPORT_EXECUTORS = ("thread", "process")
 
     def __init__(self) -> None:
         """Define configs."""
@@ -39,6 +56,24 @@ class Config:
             "log_level": lambda: int(
                 os.environ.get("ALTADB_SDK_LOG_LEVEL", logging.INFO)
             ),
+            "export_executor": lambda: os.environ.get(
+                "ALTADB_EXPORT_EXECUTOR", "thread"
+            ).lower(),
+            "export_max_requests": lambda: int(
+                os.environ.get("ALTADB_EXPORT_MAX_REQUESTS", EXPORT_MAX_REQUESTS)
+            ),
+            "export_max_bytes": lambda: int(
+                os.environ.get("ALTADB_EXPORT_MAX_BYTES", EXPORT_MAX_BYTES)
+            ),
+            "download_bandwidth": lambda: parse_rate(
+                os.environ.get("ALTADB_DOWNLOAD_BANDWIDTH")
+            ),
+            "upload_bandwidth": lambda: parse_rate(
+                os.environ.get("ALTADB_UPLOAD_BANDWIDTH")
+            ),
+            "bandwidth_schedule": lambda: parse_schedule(
+                os.environ.get("ALTADB_BANDWIDTH_SCHEDULE")
+            ),
         }
         logger = logging.getLogger("altadb")
         logger.setLevel(
@@ -133,6 +168,124 @@ class Config:
             del self._state["log_level"]
         self.logger.setLevel(logging.DEBUG if self.debug else self.log_level)
 
+    @property
+    def export_executor(self) -> str:
+        """Executor used to assemble exported DICOM files (thread or process)."""
+        if "export_executor" not in self._state:
+            val = self._options["export_executor"]()
+            self._state["export_executor"] = (
+                val if val in self.EXPORT_EXECUTORS else self.EXPORT_EXECUTORS[0]
+            )
+        return self._state["export_executor"]
+
+    @export_executor.setter
+    def export_executor(self, val: str) -> None:
+        """Executor used to assemble exported DICOM files (thread or process)."""
+        if val in self.EXPORT_EXECUTORS:
+            self._state["export_executor"] = val
+
+    @export_executor.deleter
+    def export_executor(self) -> None:
+        """Executor used to assemble exported DICOM files (thread or process)."""
+        if "export_executor" in self._state:
+            del self._state["export_executor"]
+
+    @property
+    def export_max_requests(self) -> int:
+        """Maximum number of HTTP requests in flight during an export."""
+        if "export_max_requests" not in self._state:
+            self._state["export_max_requests"] = self._options["export_max_requests"]()
+        return self._state["export_max_requests"]
+
+    @export_max_requests.setter
+    def export_max_requests(self, val: int) -> None:
+        """Maximum number of HTTP requests in flight during an export."""
+        if isinstance(val, int) and val > 0:
+            self._state["export_max_requests"] = val
+
+    @export_max_requests.deleter
+    def export_max_requests(self) -> None:
+        """Maximum number of HTTP requests in flight during an export."""
+        if "export_max_requests" in self._state:
+            del self._state["export_max_requests"]
+
+    @property
+    def export_max_bytes(self) -> int:
+        """Maximum number of downloaded bytes held in flight during an export."""
+        if "export_max_bytes" not in self._state:
+            self._state["export_max_bytes"] = self._options["export_max_bytes"]()
+        return self._state["export_max_bytes"]
+
+    @export_max_bytes.setter
+    def export_max_bytes(self, val: int) -> None:
+        """Maximum number of downloaded bytes held in flight during an export."""
+        if isinstance(val, int) and val > 0:
+            self._state["export_max_bytes"] = val
+
+    @export_max_bytes.deleter
+    def export_max_bytes(self) -> None:
+        """Maximum number of downloaded bytes held in flight during an export."""
+        if "export_max_bytes" in self._state:
+            del self._state["export_max_bytes"]
+
+    @property
+    def download_bandwidth(self) -> Optional[int]:
+        """Download bandwidth limit in bytes/s (None for no limit)."""
+        if "download_bandwidth" not in self._state:
+            self._state["download_bandwidth"] = self._options["download_bandwidth"]()
+        return self._state["download_bandwidth"]
+
+    @download_bandwidth.setter
+    def download_bandwidth(self, val: Optional[Union[int, str]]) -> None:
+        """Download bandwidth limit in bytes/s or as a string (e.g. 10M)."""
+        self._state["download_bandwidth"] = parse_rate(
+            None if val is None else str(val)
+        )
+
+    @download_bandwidth.deleter
+    def download_bandwidth(self) -> None:
+        """Download bandwidth limit in bytes/s (None for no limit)."""
+        if "download_bandwidth" in self._state:
+            del self._state["download_bandwidth"]
+
+    @property
+    def upload_bandwidth(self) -> Optional[int]:
+        """Upload bandwidth limit in bytes/s (None for no limit)."""
+        if "upload_bandwidth" not in self._state:
+            self._state["upload_bandwidth"] = self._options["upload_bandwidth"]()
+        return self._state["upload_bandwidth"]
+
+    @upload_bandwidth.setter
+    def upload_bandwidth(self, val: Optional[Union[int, str]]) -> None:
+        """Upload bandwidth limit in bytes/s or as a string (e.g. 10M)."""
+        self._state["upload_bandwidth"] = parse_rate(None if val is None else str(val))
+
+    @upload_bandwidth.deleter
+    def upload_bandwidth(self) -> None:
+        """Upload bandwidth limit in bytes/s (None for no limit)."""
+        if "upload_bandwidth" in self._state:
+            del self._state["upload_bandwidth"]
+
+    @property
+    def bandwidth_schedule(self) -> BandwidthSchedule:
+        """Bandwidth limits by time of day, overriding the upload/download limits."""
+        if "bandwidth_schedule" not in self._state:
+            self._state["bandwidth_schedule"] = self._options["bandwidth_schedule"]()
+        return self._state["bandwidth_schedule"]
+
+    @bandwidth_schedule.setter
+    def bandwidth_schedule(self, val: Union[str, BandwidthSchedule]) -> None:
+        """Bandwidth schedule, e.g. `22:00-06:00=off;08:00-18:00=10M`."""
+        self._state["bandwidth_schedule"] = (
+            parse_schedule(val) if isinstance(val, str) else list(val)
+        )
+
+    @bandwidth_schedule.deleter
+    def bandwidth_schedule(self) -> None:
+        """Bandwidth limits by time of day, overriding the upload/download limits."""
+        if "bandwidth_schedule" in self._state:
+            del self._state["bandwidth_schedule"]
+
     @property
     def log_info(self) -> bool:
         """Show info logs."""
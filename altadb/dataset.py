@@ -56,10 +56,16 @@ class AltaDBDataset:
         page_size: int = MAX_CONCURRENCY,
         number: Optional[int] = None,
         search: Optional[str] = None,
+        overwrite: bool = False,
+        max_requests: Optional[int] = None,
+        max_bytes: Optional[int] = None,
     ) -> None:
         """
         Export the dataset files to a local folder.
 
+        Running the export again on the same folder resumes it,
+        skipping the series that were already exported.
+
         Args
         ----
         path: str
@@ -70,7 +76,22 @@ class AltaDBDataset:
             The number of files to download.
         search: Optional[str]
             The search string to filter the files.
+        overwrite: bool
+            Discard any previous export in the folder and start over.
+        max_requests: Optional[int]
+            The maximum number of requests in flight (default: config.export_max_requests).
+        max_bytes: Optional[int]
+            The maximum number of downloaded bytes in flight (default: config.export_max_bytes).
         """
         asyncio.run(
-            self.export.export_to_files(self.name, path, page_size, number, search)
+            self.export.export_to_files(
+                self.name,
+                path,
+                page_size,
+                number,
+                search,
+                overwrite,
+                max_requests,
+                max_bytes,
+            )
         )
@@ -0,0 +1,149 @@
+"""Append-only manifest of exported series."""
+
+import os
+import json
+import struct
+import textwrap
+from typing import Dict, Iterator, List, Optional
+
+INDEX_ENTRY = struct.Struct("<Q")
+
+# Fields only used to resume an export, they are not written to series.json
+JOURNAL_FIELDS = ("sizes",)
+
+
+class SeriesManifest:
+    """Append-only JSONL manifest of exported series.
+
+    Every series is stored as a single JSON line in `series.jsonl`.
+    The sidecar `series.jsonl.idx` stores the end offset of every line
+    (little endian uint64), it is written after the data has been synced,
+    so only fully written lines are ever considered part of the manifest.
+
+    The manifest doubles as the export journal: every entry records the
+    files of a completed series along with their sizes, which allows an
+    interrupted export to be resumed.
+
+    :param dataset_root: Folder where the dataset is exported.
+    """
+
+    FILE_NAME = "series.jsonl"
+    LEGACY_FILE_NAME = "series.json"
+
+    def __init__(self, dataset_root: str) -> None:
+        """Construct SeriesManifest."""
+        self.path = os.path.join(dataset_root, self.FILE_NAME)
+        self.index_path = self.path + ".idx"
+        self.legacy_path = os.path.join(dataset_root, self.LEGACY_FILE_NAME)
+        self._offsets: List[int] = []
+        self._load()
+
+    def _load(self) -> None:
+        """Load the offset index and drop any partially written line."""
+        if not os.path.isfile(self.index_path) or not os.path.isfile(self.path):
+            self._offsets = []
+            return
+
+        with open(self.index_path, "rb") as index_file:
+            data = index_file.read()
+        data = data[: len(data) - len(data) % INDEX_ENTRY.size]
+        offsets = [offset for (offset,) in INDEX_ENTRY.iter_unpack(data)]
+        size = os.path.getsize(self.path)
+        while offsets and offsets[-1] > size:
+            offsets.pop()
+        self._offsets = offsets
+
+        end = offsets[-1] if offsets else 0
+        if size > end:
+            with open(self.path, "r+b") as manifest_file:
+                manifest_file.truncate(end)
+        with open(self.index_path, "r+b") as index_file:
+            index_file.truncate(len(offsets) * INDEX_ENTRY.size)
+
+    def __len__(self) -> int:
+        """Get number of series in the manifest."""
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over the series in the manifest."""
+        if not self._offsets:
+            return
+        with open(self.path, "rb") as manifest_file:
+            for _ in self._offsets:
+                yield json.loads(manifest_file.readline())
+
+    def append(self, entries: List[Dict]) -> None:
+        """Append the entries to the manifest and sync them to disk."""
+        if not entries:
+            return
+        self._write(entries, append=True)
+
+    def compact(self, entries: List[Dict]) -> None:
+        """Replace the manifest contents with the given entries."""
+        self.reset()
+        self._write(entries, append=False)
+
+    def _write(self, entries: List[Dict], append: bool) -> None:
+        offsets: List[int] = []
+        with open(self.path, "ab" if append else "wb") as manifest_file:
+            for entry in entries:
+                manifest_file.write(
+                    json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+                )
+                offsets.append(manifest_file.tell())
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+
+        with open(self.index_path, "ab" if append else "wb") as index_file:
+            for offset in offsets:
+                index_file.write(INDEX_ENTRY.pack(offset))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+
+        self._offsets.extend(offsets)
+
+    def reset(self) -> None:
+        """Remove the manifest and its index."""
+        for path in (self.path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._offsets = []
+
+    def to_json(self) -> None:
+        """Write the legacy series.json (a single indented JSON array)."""
+        if not self._offsets:
+            return
+
+        partial_path = self.legacy_path + ".part"
+        with open(partial_path, "w", encoding="utf-8") as series_file:
+            series_file.write("[")
+            for idx, entry in enumerate(self):
+                series_file.write(",\n" if idx else "\n")
+                for field in JOURNAL_FIELDS:
+                    entry.pop(field, None)
+                series_file.write(textwrap.indent(json.dumps(entry, indent=2), "  "))
+            series_file.write("\n]")
+        os.replace(partial_path, self.legacy_path)
+
+    def load_legacy(self) -> List[Dict]:
+        """Load the entries of an existing series.json."""
+        if not os.path.isfile(self.legacy_path):
+            return []
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as series_file:
+                entries = json.load(series_file)
+        except ValueError:
+            return []
+        return entries if isinstance(entries, list) else []
+
+    @staticmethod
+    def invalid_items(entry: Dict) -> List[str]:
+        """Return the files of an entry that are missing or truncated."""
+        items: List[str] = entry.get("items") or []
+        sizes: List[Optional[int]] = entry.get("sizes") or [None] * len(items)
+        return [
+            item
+            for item, size in zip(items, sizes)
+            if not os.path.isfile(item)
+            or (size is not None and os.path.getsize(item) != size)
+        ]
@@ -1,17 +1,28 @@
 """Decode DICOM images from metadata and URL."""
 
+import asyncio
+from concurrent.futures import Executor
 from functools import partial
-import json
 import os
-from typing import Dict, Iterator, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set
 
+import aiohttp
+import tqdm  # type: ignore
 from rich.console import Console
 
-from altadb.common.constants import MAX_CONCURRENCY
+from altadb.common.constants import (
+    EXPORT_PAGE_SIZE,
+    EXPORT_PREFETCH_PAGES,
+    MAX_CONCURRENCY,
+)
 from altadb.common.context import AltaDBContext
-from altadb.utils.async_utils import gather_with_concurrency
+from altadb.config import config
+from altadb.export.manifest import SeriesManifest
+from altadb.utils.async_utils import ConcurrencyBudget, create_executor
+from altadb.utils.bandwidth import download_bandwidth
 from altadb.utils.files import save_dicom_series
-from altadb.utils.pagination import PaginationIterator
+from altadb.utils.pagination import AsyncPaginationIterator, PaginationIterator
+from altadb.utils.session import create_session
 
 
 class Export:
@@ -40,16 +51,53 @@ class Export:
         for ds_import_series in my_iter:
             yield ds_import_series
 
+    async def iter_data_store_series(
+        self,
+        *,
+        dataset_name: str,
+        search: Optional[str],
+        page_size: int,
+        limit: Optional[int] = None,
+        prefetch: int = EXPORT_PREFETCH_PAGES,
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Get up to `limit` data store series, in pages of `page_size`.
+
+        Unlike get_data_store_series, pages are fetched asynchronously,
+        up to `prefetch` pages ahead.
+        """
+        my_iter = AsyncPaginationIterator(
+            partial(
+                self.context.dataset.get_data_store_import_series,
+                self.org_id,
+                dataset_name,
+                search,
+            ),
+            concurrency=page_size,
+            limit=limit,
+            prefetch=prefetch,
+        )
+        try:
+            async for ds_import_series in my_iter:
+                yield ds_import_series
+        finally:
+            await my_iter.aclose()
+
     async def export_to_files(
         self,
         dataset_name: str,
         path: str,
         page_size: int = MAX_CONCURRENCY,
         number: Optional[int] = None,
-        search: Optional[str] = None,  # pylint: disable=unused-argument
+        search: Optional[str] = None,
+        overwrite: bool = False,
+        max_requests: Optional[int] = None,
+        max_bytes: Optional[int] = None,
     ) -> None:
         """Export dataset to folder.
 
+        An interrupted export can be resumed by running it again,
+        series that were completed (and whose files are intact) are skipped.
+
         Args
         ----
         dataset_name: str
@@ -62,118 +110,231 @@ class Export:
             Number of series to export in total.
         search: str
             Search string to filter the series to export.
+        overwrite: bool
+            Discard any previous export in path and start over.
+        max_requests: Optional[int]
+            Maximum number of HTTP requests in flight across all series,
+            instances and frames (default: config.export_max_requests).
+        max_bytes: Optional[int]
+            Maximum number of downloaded bytes held in flight
+            (default: config.export_max_bytes).
         """
+        # pylint: disable=too-many-locals,too-many-statements
         try:
             console = Console()
             console.print(
                 f"[bold green][\u2713] Saving dataset {dataset_name} to {path}"
             )
             dataset_root = f"{path}/{dataset_name}"
-            json_path = f"{dataset_root}/series.json"
-            if os.path.exists(json_path):
-                console.print(
-                    f"[bold yellow][\u26A0] Warning: {json_path} already exists. It will be overwritten."
-                )
-                os.remove(json_path)
-
-            ds_import_series_list: List[Dict[str, str]] = []
-            # Save the files in chunks of page_size
-            for ds_import_series in self.get_data_store_series(
-                dataset_name=dataset_name,
-                search=search,
-                page_size=number or MAX_CONCURRENCY,
-            ):
-                ds_import_series_list.append(ds_import_series)
-                if len(ds_import_series_list) >= page_size:
-                    await self.save_series_data_chunk(
-                        dataset_name,
-                        page_size,
-                        dataset_root,
-                        json_path,
-                        ds_import_series_list,
+            os.makedirs(dataset_root, exist_ok=True)
+            manifest = SeriesManifest(dataset_root)
+            completed: Set[str] = set()
+            if overwrite:
+                json_path = manifest.legacy_path
+                if os.path.exists(json_path):
+                    console.print(
+                        f"[bold yellow][\u26A0] Warning: {json_path} already exists. It will be overwritten."
                     )
-                    ds_import_series_list = []
-
-            if ds_import_series_list:
-                await self.save_series_data_chunk(
-                    dataset_name,
-                    page_size,
-                    dataset_root,
-                    json_path,
-                    ds_import_series_list,
+                    os.remove(json_path)
+                manifest.reset()
+            elif completed := self.resume_export(manifest):
+                console.print(
+                    f"[bold green][\u2713] Resuming export, skipping {len(completed)} completed series"
                 )
+
+            window = max(1, min(page_size, MAX_CONCURRENCY))
+            budget = ConcurrencyBudget(
+                max_requests or config.export_max_requests,
+                max_bytes or config.export_max_bytes,
+            )
+            pending: Set["asyncio.Task[Dict]"] = set()
+            errors: List[BaseException] = []
+            progress = tqdm.tqdm(
+                desc="Exporting series", total=number, leave=config.log_info
+            )
+
+            def _journal(done: Set["asyncio.Task[Dict]"]) -> None:
+                """Append the series that completed to the manifest."""
+                entries = []
+                for task in done:
+                    if task.exception():
+                        errors.append(task.exception())  # type: ignore
+                    else:
+                        entries.append(task.result())
+                manifest.append(entries)
+                progress.set_postfix_str(download_bandwidth.describe(), refresh=False)
+                progress.update(len(done))
+
+            # One pooled session is shared by every series of this export run,
+            # sized for the budget so that the pool does not limit it further.
+            # Keep a steady window of series in flight, while the next
+            # listing page is prefetched in the background.
+            # DICOM files are assembled in the executor, off the event loop.
+            # Series, instances and frames all draw from the same budget.
+            with create_executor(config.export_executor) as executor:
+                async with create_session(
+                    budget.max_requests, budget.max_requests
+                ) as aiosession:
+                    try:
+                        async for ds_import_series in self.iter_data_store_series(
+                            dataset_name=dataset_name,
+                            search=search,
+                            page_size=EXPORT_PAGE_SIZE,
+                            limit=number,
+                        ):
+                            if ds_import_series["seriesId"] in completed:
+                                progress.update(1)
+                                continue
+                            while len(pending) >= window and not errors:
+                                done, pending = await asyncio.wait(
+                                    pending, return_when=asyncio.FIRST_COMPLETED
+                                )
+                                _journal(done)
+                            if errors:
+                                break
+                            pending.add(
+                                asyncio.create_task(
+                                    self.save_series_data(
+                                        dataset_name,
+                                        dataset_root,
+                                        ds_import_series,
+                                        aiosession,
+                                        overwrite,
+                                        executor,
+                                        budget,
+                                    )
+                                )
+                            )
+                    finally:
+                        # Let the series in flight finish, so they are journaled
+                        if pending:
+                            _journal((await asyncio.wait(pending))[0])
+                        progress.close()
+
+            if errors:
+                raise errors[0]
+
+            # Convert the manifest to the legacy series.json once at the end
+            manifest.to_json()
+            manifest.reset()
         except Exception as error:  # pylint: disable=broad-except
             console.print(f"[bold red][\u2717] Error: {error}")
+            console.print(
+                "[bold yellow][\u26A0] Run the export again to resume from where it stopped."
+            )
+
+    @staticmethod
+    def resume_export(manifest: SeriesManifest) -> Set[str]:
+        """Load the series completed by a previous export of the dataset.
 
-    async def save_series_data_chunk(
+        The manifest (or the series.json of a finished export) is verified,
+        series with missing or truncated files are dropped from it and
+        their truncated files removed, so that they are exported again.
+        Partial files left by an interrupted export (`.part` files and
+        spooled frames) are removed.
+
+        Args
+        ----
+        manifest: SeriesManifest
+            Manifest of the dataset being exported.
+
+        Returns
+        -------
+        Set[str]
+            IDs of the completed series.
+        """
+        Export.remove_partial_files(os.path.dirname(manifest.path))
+        entries = list(manifest) or manifest.load_legacy()
+        valid: Dict[str, Dict] = {}
+        for entry in entries:
+            invalid_items = manifest.invalid_items(entry)
+            for item in invalid_items:
+                if os.path.isfile(item):
+                    os.remove(item)
+            if not invalid_items and entry.get("seriesId"):
+                valid[entry["seriesId"]] = entry
+        manifest.compact(list(valid.values()))
+        return set(valid)
+
+    @staticmethod
+    def remove_partial_files(dataset_root: str) -> None:
+        """Remove the partial files of an interrupted export of the dataset.
+
+        Files are written to `.part` files (renamed once complete), and
+        frames handed to a process pool are spooled to hidden `.frame` files,
+        in the series folders.
+        """
+        folders = [dataset_root] + [
+            entry.path for entry in os.scandir(dataset_root) if entry.is_dir()
+        ]
+        for folder in folders:
+            for entry in os.scandir(folder):
+                if entry.is_file() and (
+                    entry.name.endswith(".part")
+                    or (entry.name.startswith(".") and entry.name.endswith(".frame"))
+                ):
+                    os.remove(entry.path)
+
+    @property
+    def base_url(self) -> str:
+        """Get the AltaDB base URL, used to resolve altadb:/// URLs."""
+        base_url = self.context.client.url.strip()
+        if base_url.endswith("/graphql/"):
+            base_url = base_url[:-8]
+        if base_url.endswith("api/"):
+            base_url = base_url.rstrip("api/")
+        return base_url
+
+    async def save_series_data(
         self,
         dataset_name: str,
-        max_concurrency: int,
         dataset_root: str,
-        json_path: str,
-        ds_import_series_list: List[Dict[str, str]],
-    ) -> None:
-        """Store data for the given series imports.
+        ds_import: Dict[str, str],
+        aiosession: Optional[aiohttp.ClientSession] = None,
+        overwrite: bool = True,
+        executor: Optional[Executor] = None,
+        budget: Optional[ConcurrencyBudget] = None,
+    ) -> Dict:
+        """Store data for a single series import.
 
         Args
         ----
         dataset_name: str
             Name of the dataset.
-        max_concurrency: int
-            Number of series to export in parallel.
         dataset_root: str
             Path to the dataset root folder.
-        json_path: str
-            Path to the series.json file.
-        ds_import_series_list: List[Dict]
-            List of series to export.
+        ds_import: Dict
+            Series to export.
+        aiosession: Optional[aiohttp.ClientSession]
+            Session shared across the export run.
+        overwrite: bool
+            Download the instances that already exist on disk again.
+        executor: Optional[Executor]
+            Executor used to assemble and write the DICOM files.
+        budget: Optional[ConcurrencyBudget]
+            Request and bytes-in-flight budget shared across the export run.
 
+        Returns
+        -------
+        Dict
+            Manifest entry of the exported series.
         """
-        base_url = self.context.client.url.strip()
-        if base_url.endswith("/graphql/"):
-            base_url = base_url[:-8]
-        if base_url.endswith("api/"):
-            base_url = base_url.rstrip("api/")
-        coros = [
-            save_dicom_series(
-                ds_import_series["url"],
-                os.path.join(dataset_root, ds_import_series["seriesId"]),
-                base_url,
-                self.context.client.headers,
-            )
-            for ds_import_series in ds_import_series_list
-        ]
-        file_paths_list = await gather_with_concurrency(
-            max_concurrency,
-            coros,
-            progress_bar_name=f"Exporting {len(ds_import_series_list)} series",
-            keep_progress_bar=True,
+        file_paths = await save_dicom_series(
+            ds_import["url"],
+            os.path.join(dataset_root, ds_import["seriesId"]),
+            self.base_url,
+            self.context.client.headers,
+            aiosession,
+            overwrite,
+            executor,
+            budget,
         )
-        new_series = []
-        # Save the series data to the series.json file
-        for ds_import, file_paths in zip(ds_import_series_list, file_paths_list):
-            new_series.append(
-                {
-                    "dataset": dataset_name,
-                    "seriesId": ds_import["seriesId"],
-                    "importId": ds_import["importId"],
-                    "createdAt": ds_import["createdAt"],
-                    "createdBy": ds_import["createdBy"],
-                    "items": file_paths,
-                }
-            )
-        if new_series:
-            series = []
-            if os.path.exists(json_path):
-                with open(json_path, "r", encoding="utf-8") as series_file:
-                    series = json.load(series_file)
-
-            with open(json_path, "w+", encoding="utf-8") as series_file:
-                json.dump(
-                    [
-                        *series,
-                        *new_series,
-                    ],
-                    series_file,
-                    indent=2,
-                )
+        return {
+            "dataset": dataset_name,
+            "seriesId": ds_import["seriesId"],
+            "importId": ds_import["importId"],
+            "createdAt": ds_import["createdAt"],
+            "createdBy": ds_import["createdBy"],
+            "items": file_paths,
+            "sizes": [os.path.getsize(file_path) for file_path in file_paths],
+        }
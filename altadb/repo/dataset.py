@@ -2,9 +2,31 @@
 
 from typing import List, Dict, Optional, Tuple
 
+import aiohttp
+
 from altadb.common.client import AltaDBClient
 from altadb.common.dataset import DatasetRepoInterface
 
+DATA_STORE_IMPORTS_QUERY = """
+    query dataStoreImports($orgId: UUID!, $dataStore: String!, $first: Int, $after: String, $createdBy: CustomUUID, $createdAfter: DateTime, $createdBefore: DateTime){
+        dataStoreImports(orgId: $orgId, dataStore: $dataStore, first: $first, after: $after, createdBy: $createdBy, createdAfter: $createdAfter, createdBefore: $createdBefore){
+            entries{
+                orgId
+                datastore
+                name
+                importId
+                createdAt
+                createdBy
+                status
+                updatedAt
+                taskCount
+                failureLogs
+            }
+            cursor
+        }
+    }
+"""
+
 
 class DatasetRepo(DatasetRepoInterface):
     """Class to manage interaction with dataset APIs."""
@@ -117,36 +139,48 @@ class DatasetRepo(DatasetRepoInterface):
         current_user: Dict = result["me"]
         return current_user
 
-    def get_data_store_imports(
-        self, org_id: str, data_store: str
-    ) -> Tuple[List[Dict], str]:
-        """Get data store import."""
-        query_string = """
-            query dataStoreImports($orgId: UUID!, $dataStore: String!, $first: Int, $after: String, $createdBy: CustomUUID, $createdAfter: DateTime, $createdBefore: DateTime){
-                dataStoreImports(orgId: $orgId, dataStore: $dataStore, first: $first, after: $after, createdBy: $createdBy, createdAfter: $createdAfter, createdBefore: $createdBefore){
-                    entries{
-                        orgId
-                        datastore
-                        name
-                        importId
-                        createdAt
-                        createdBy
-                        status
-                        updatedAt
-                        taskCount
-                        failureLogs
-                    }
-                    cursor
-                }
-            }
-        """
-        query_variables = {
+    @staticmethod
+    def _data_store_imports_variables(
+        org_id: str, data_store: str, first: int, cursor: Optional[str]
+    ) -> Dict:
+        return {
             "orgId": org_id,
             "dataStore": data_store,
-            "first": 20,
-            "after": None,
+            "first": first,
+            "after": cursor,
         }
-        result = self.client.execute_query(query_string, query_variables)
+
+    def get_data_store_imports(
+        self,
+        org_id: str,
+        data_store: str,
+        first: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], str]:
+        """Get data store imports."""
+        result = self.client.execute_query(
+            DATA_STORE_IMPORTS_QUERY,
+            self._data_store_imports_variables(org_id, data_store, first, cursor),
+        )
+        return (
+            result["dataStoreImports"]["entries"],
+            result["dataStoreImports"]["cursor"],
+        )
+
+    async def get_data_store_imports_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        first: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], str]:
+        """Get data store imports, without blocking the event loop."""
+        result = await self.client.execute_query_async(
+            aio_session,
+            DATA_STORE_IMPORTS_QUERY,
+            self._data_store_imports_variables(org_id, data_store, first, cursor),
+        )
         return (
             result["dataStoreImports"]["entries"],
             result["dataStoreImports"]["cursor"],
@@ -2,9 +2,31 @@
 
 from typing import List, Dict, Optional, Tuple
 
+import aiohttp
+
 from altadb.common.client import AltaDBClient
 from altadb.common.upload import UploadControllerInterface
 
+IMPORT_FILES_QUERY = """
+    mutation importFiles($orgId: UUID!, $dataStore: String!, $files: [ImportJobFileInput!]!, $importName: String, $importId: UUID) {
+        importFiles(orgId: $orgId, dataStore: $dataStore, files: $files, importName: $importName, importId: $importId) {
+            dataStoreImport {
+               importId
+            }
+            urls
+        }
+    }
+"""
+
+PROCESS_IMPORT_QUERY = """
+    mutation processImport($orgId: UUID!, $dataStore: String!, $importId: UUID!, $totalFiles: Int) {
+        processImport(orgId: $orgId, dataStore: $dataStore, importId: $importId, totalFiles: $totalFiles) {
+            ok
+            message
+        }
+    }
+"""
+
 
 class UploadRepo(UploadControllerInterface):
     """Class to manage interaction with upload APIs."""
@@ -13,36 +35,58 @@ class UploadRepo(UploadControllerInterface):
         """Construct Upload."""
         self.client = client
 
-    def import_files(
-        self,
+    @staticmethod
+    def _import_files_variables(
         org_id: str,
         data_store: str,
-        import_name: Optional[str] = None,
-        import_id: Optional[str] = None,
-        files: Optional[List[Dict[str, str]]] = None,
-    ) -> Tuple[str, List[str]]:
-        """Import files into a dataset."""
-        files = files or []
+        import_name: Optional[str],
+        import_id: Optional[str],
+        files: Optional[List[Dict[str, str]]],
+    ) -> Dict:
         if not any([import_id, import_name]):
             raise ValueError("Either import_id or import_name must be provided")
-        query_string = """
-            mutation importFiles($orgId: UUID!, $dataStore: String!, $files: [ImportJobFileInput!]!, $importName: String, $importId: UUID) {
-                importFiles(orgId: $orgId, dataStore: $dataStore, files: $files, importName: $importName, importId: $importId) {
-                    dataStoreImport {
-                       importId
-                    }
-                    urls
-                }
-            }
-        """
-        query_variables = {
+        return {
             "orgId": org_id,
             "dataStore": data_store,
-            "files": files,
+            "files": files or [],
             "importName": import_name,
             "importId": import_id,
         }
-        result: Dict = self.client.execute_query(query_string, query_variables)
+
+    def import_files(
+        self,
+        org_id: str,
+        data_store: str,
+        import_name: Optional[str] = None,
+        import_id: Optional[str] = None,
+        files: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[str, List[str]]:
+        """Import files into a dataset."""
+        query_variables = self._import_files_variables(
+            org_id, data_store, import_name, import_id, files
+        )
+        result: Dict = self.client.execute_query(IMPORT_FILES_QUERY, query_variables)
+        return (
+            result["importFiles"]["dataStoreImport"]["importId"],
+            result["importFiles"]["urls"],
+        )
+
+    async def import_files_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        import_name: Optional[str] = None,
+        import_id: Optional[str] = None,
+        files: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[str, List[str]]:
+        """Import files into a dataset, without blocking the event loop."""
+        query_variables = self._import_files_variables(
+            org_id, data_store, import_name, import_id, files
+        )
+        result: Dict = await self.client.execute_query_async(
+            aio_session, IMPORT_FILES_QUERY, query_variables
+        )
         return (
             result["importFiles"]["dataStoreImport"]["importId"],
             result["importFiles"]["urls"],
@@ -56,19 +100,31 @@ class UploadRepo(UploadControllerInterface):
         total_files: int,
     ) -> bool:
         """Process import."""
-        query_string = """
-            mutation processImport($orgId: UUID!, $dataStore: String!, $importId: UUID!, $totalFiles: Int) {
-                processImport(orgId: $orgId, dataStore: $dataStore, importId: $importId, totalFiles: $totalFiles) {
-                    ok
-                    message
-                }
-            }
-            """
         query_variables = {
             "orgId": org_id,
             "dataStore": data_store,
             "importId": import_id,
             "totalFiles": total_files,
         }
-        result = self.client.execute_query(query_string, query_variables)
+        result = self.client.execute_query(PROCESS_IMPORT_QUERY, query_variables)
+        return bool(result["processImport"]["ok"])
+
+    async def process_import_async(
+        self,
+        aio_session: aiohttp.ClientSession,
+        org_id: str,
+        data_store: str,
+        import_id: str,
+        total_files: int,
+    ) -> bool:
+        """Process import, without blocking the event loop."""
+        query_variables = {
+            "orgId": org_id,
+            "dataStore": data_store,
+            "importId": import_id,
+            "totalFiles": total_files,
+        }
+        result = await self.client.execute_query_async(
+            aio_session, PROCESS_IMPORT_QUERY, query_variables
+        )
         return bool(result["processImport"]["ok"])
@@ -0,0 +1,87 @@
+"""De-duplication of files before they are uploaded."""
+
+from typing import Iterable, Iterator, NamedTuple, Optional, Set
+
+from altadb.upload.index import ScannedFile, UploadIndex
+from altadb.utils.common_utils import hash_file_sha256
+from altadb.utils.dicom_utils import read_sop_instance_uid
+
+
+class FileDigest(NamedTuple):
+    """Identity of a file's content."""
+
+    path: str
+    size: int
+    content_hash: Optional[str]
+    sop_instance_uid: Optional[str]
+
+
+class Deduplicator:
+    """Skip files whose content is already uploaded, or about to be.
+
+    A file is a duplicate when its content hash or SOPInstanceUID matches
+    a file uploaded to the dataset in an earlier import (per the upload
+    index) or earlier in this upload (e.g. symlinks, copies and re-exported
+    studies). Files are digested (hashed and their header peeked) by the
+    scan threads, and checked for duplicates in scan order.
+
+    :param index: Upload index of the dataset.
+    """
+
+    def __init__(self, index: UploadIndex) -> None:
+        """Construct Deduplicator."""
+        self.index = index
+        self.skipped = 0
+        self.skipped_bytes = 0
+        self._hashes: Set[str] = set()
+        self._uids: Set[str] = set()
+
+    def digest(self, file: ScannedFile) -> Optional[FileDigest]:
+        """Hash a new or changed file and read its SOPInstanceUID.
+
+        Returns None for files that are unchanged since they were uploaded.
+        """
+        if not self.index.changed(file):
+            return None
+        state = self.index.pending(file.path)
+        if state is None:
+            # Unreadable, let the upload report it
+            return FileDigest(file.path, 0, None, None)
+        content_hash = state.content_hash or hash_file_sha256(file.path)
+        sop_instance_uid = read_sop_instance_uid(file.path)
+        self.index.set_digest(file.path, content_hash, sop_instance_uid)
+        return FileDigest(file.path, state.size, content_hash, sop_instance_uid)
+
+    def _seen_instance(self, sop_instance_uid: Optional[str]) -> bool:
+        if not sop_instance_uid:
+            return False
+        return sop_instance_uid in self._uids or self.index.has_instance(
+            sop_instance_uid
+        )
+
+    def _seen_content(self, content_hash: Optional[str]) -> bool:
+        if not content_hash:
+            return False
+        return content_hash in self._hashes or self.index.has_content(content_hash)
+
+    def is_duplicate(self, digest: FileDigest) -> bool:
+        """Check if a file is a duplicate, and remember it if it is not."""
+        if self._seen_instance(digest.sop_instance_uid) or self._seen_content(
+            digest.content_hash
+        ):
+            return True
+        if digest.sop_instance_uid:
+            self._uids.add(digest.sop_instance_uid)
+        if digest.content_hash:
+            self._hashes.add(digest.content_hash)
+        return False
+
+    def unique(self, digests: Iterable[FileDigest]) -> Iterator[str]:
+        """Yield the files that are not duplicates, in order."""
+        for digest in digests:
+            if self.is_duplicate(digest):
+                self.index.discard(digest.path)
+                self.skipped += 1
+                self.skipped_bytes += digest.size
+            else:
+                yield digest.path
@@ -0,0 +1,280 @@
+"""Local index of uploaded files, so that rescans only upload changed files."""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from altadb.utils.common_utils import config_path, hash_file_sha256
+
+
+class FileState(NamedTuple):
+    """State of a file when it was scanned."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+    content_hash: Optional[str] = None
+    sop_instance_uid: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, path: str) -> "FileState":
+        """Get the (stat) state of a file, without its content hash."""
+        stat = os.stat(path)
+        return cls(stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def same_stat(self, other: "FileState") -> bool:
+        """Check if the stat of two states match."""
+        return (self.size, self.mtime_ns, self.inode) == (
+            other.size,
+            other.mtime_ns,
+            other.inode,
+        )
+
+
+class ScannedFile(NamedTuple):
+    """File being scanned, with its stat and its indexed state (if any)."""
+
+    path: str
+    state: Optional[FileState]  # None if it can't be stat'ed
+    indexed: Optional[FileState]
+
+
+class UploadIndex:
+    """Index of the files uploaded to a dataset, stored in SQLite under config_path().
+
+    A file is skipped when its size, mtime and inode match the index,
+    so a rescan is a stat pass over unchanged files. When only its size
+    matches (e.g. the file was touched or copied back), the content hash
+    decides. Files are not hashed before their upload, unless their size
+    matches, their hash is computed while they are uploaded.
+    Files are only considered uploaded once their import has been processed.
+
+    :param org_id: Organization ID.
+    :param data_store: Dataset name.
+    :param db_path: SQLite database path (default: upload_index.sqlite3 under config_path()).
+    """
+
+    def __init__(
+        self, org_id: str, data_store: str, db_path: Optional[str] = None
+    ) -> None:
+        """Construct UploadIndex."""
+        self.org_id = org_id
+        self.data_store = data_store
+        self.db_path = db_path or os.path.join(config_path(), "upload_index.sqlite3")
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self.skipped = 0
+        self.skipped_bytes = 0
+        self._pending: Dict[str, FileState] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                org_id TEXT NOT NULL,
+                data_store TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                sop_instance_uid TEXT,
+                import_id TEXT NOT NULL,
+                processed INTEGER NOT NULL DEFAULT 0,
+                updated_at INTEGER NOT NULL,
+                PRIMARY KEY (org_id, data_store, path)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS files_import ON files (import_id)"
+        )
+        if "sop_instance_uid" not in {
+            column[1] for column in self._conn.execute("PRAGMA table_info(files)")
+        }:
+            self._conn.execute("ALTER TABLE files ADD COLUMN sop_instance_uid TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS files_content "
+            + "ON files (org_id, data_store, content_hash)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS files_instance "
+            + "ON files (org_id, data_store, sop_instance_uid)"
+        )
+        self._conn.commit()
+
+    def __enter__(self) -> "UploadIndex":
+        """Enter the index context."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Close the index."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, path: str) -> Optional[FileState]:
+        """Get the indexed state of a file, if it was uploaded and processed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, content_hash, sop_instance_uid FROM files "
+                + "WHERE org_id = ? AND data_store = ? AND path = ? AND processed = 1",
+                (self.org_id, self.data_store, path),
+            ).fetchone()
+        return FileState(*row) if row else None
+
+    def has_content(self, content_hash: str) -> bool:
+        """Check if a file with this content was uploaded and processed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM files WHERE org_id = ? AND data_store = ? "
+                + "AND content_hash = ? AND processed = 1 LIMIT 1",
+                (self.org_id, self.data_store, content_hash),
+            ).fetchone()
+        return row is not None
+
+    def has_instance(self, sop_instance_uid: str) -> bool:
+        """Check if a file with this SOPInstanceUID was uploaded and processed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM files WHERE org_id = ? AND data_store = ? "
+                + "AND sop_instance_uid = ? AND processed = 1 LIMIT 1",
+                (self.org_id, self.data_store, sop_instance_uid),
+            ).fetchone()
+        return row is not None
+
+    def set_digest(
+        self, path: str, content_hash: str, sop_instance_uid: Optional[str]
+    ) -> None:
+        """Set the content hash and SOPInstanceUID of a new or changed file."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._pending:
+                self._pending[path] = self._pending[path]._replace(
+                    content_hash=content_hash, sop_instance_uid=sop_instance_uid
+                )
+
+    def pending(self, path: str) -> Optional[FileState]:
+        """Get the scanned state of a new or changed file, until it is recorded."""
+        with self._lock:
+            return self._pending.get(os.path.abspath(path))
+
+    def discard(self, path: str) -> None:
+        """Forget the scanned state of a file that will not be uploaded."""
+        with self._lock:
+            self._pending.pop(os.path.abspath(path), None)
+
+    def scan(self, path: str) -> ScannedFile:
+        """Stat a file and look it up in the index, once for all the checks."""
+        path = os.path.abspath(path)
+        try:
+            state = FileState.from_path(path)
+        except OSError:
+            return ScannedFile(path, None, None)
+        return ScannedFile(path, state, self.lookup(path))
+
+    def unchanged(self, file: ScannedFile) -> bool:
+        """Check if the stat of a file matches the index, without reading it."""
+        if file.state and file.indexed and file.indexed.same_stat(file.state):
+            self._skip(file.state)
+            return True
+        return False
+
+    def changed(self, file: ScannedFile) -> bool:
+        """Check if a file is new or changed since it was uploaded.
+
+        The content is only hashed when the stat differs from the index but
+        the size matches, the state of changed files is kept until they are
+        recorded.
+        """
+        if file.state is None:
+            # Let the upload report the file
+            return True
+        if self.unchanged(file):
+            return False
+
+        state, indexed = file.state, file.indexed
+        if indexed and indexed.content_hash and indexed.size == state.size:
+            try:
+                state = state._replace(content_hash=hash_file_sha256(file.path))
+            except OSError:
+                return True
+            if indexed.content_hash == state.content_hash:
+                self._update_stat(file.path, state)
+                self._skip(state)
+                return False
+
+        with self._lock:
+            self._pending[file.path] = state
+        return True
+
+    def _update_stat(self, path: str, state: FileState) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, inode = ?, updated_at = ? "
+                + "WHERE org_id = ? AND data_store = ? AND path = ?",
+                (
+                    state.size,
+                    state.mtime_ns,
+                    state.inode,
+                    int(time.time()),
+                    self.org_id,
+                    self.data_store,
+                    path,
+                ),
+            )
+            self._conn.commit()
+
+    def _skip(self, state: FileState) -> None:
+        with self._lock:
+            self.skipped += 1
+            self.skipped_bytes += state.size
+
+    def record(self, files: Iterable[Tuple[str, str]], import_id: str) -> None:
+        """Record uploaded files, pending the processing of their import.
+
+        Files are given with the SHA-256 of their content, computed while
+        they were uploaded, unless it is already known (see Deduplicator).
+        """
+        with self._lock:
+            rows = []
+            for path, content_hash in files:
+                path = os.path.abspath(path)
+                state = self._pending.pop(path, None)
+                if state is None:
+                    continue
+                rows.append(
+                    (
+                        self.org_id,
+                        self.data_store,
+                        path,
+                        state.size,
+                        state.mtime_ns,
+                        state.inode,
+                        state.content_hash or content_hash,
+                        state.sop_instance_uid,
+                        import_id,
+                        int(time.time()),
+                    )
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (org_id, data_store, path, size, mtime_ns, "
+                + "inode, content_hash, sop_instance_uid, import_id, processed, updated_at) "
+                + "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def processed(self, import_id: str) -> None:
+        """Mark the files of an import as uploaded, once it has been processed."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET processed = 1 WHERE import_id = ?", (import_id,)
+            )
+            self._conn.commit()
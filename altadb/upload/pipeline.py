@@ -0,0 +1,274 @@
+"""Staged upload pipeline: scan -> batch -> presign -> upload."""
+
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from altadb.common.constants import MAX_FILE_BATCH_SIZE, SCAN_CHUNK_SIZE
+from altadb.utils.async_utils import AdaptiveLimiter
+from altadb.utils.logging import logger
+
+ItemType = TypeVar("ItemType")  # pylint: disable=invalid-name
+
+
+class PipelineStopped(Exception):
+    """Raised in the scan thread when the pipeline is stopped."""
+
+
+class StageStats:
+    """Number of items a pipeline stage processed, and its throughput.
+
+    :param name: Name of the stage.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Construct StageStats."""
+        self.name = name
+        self.items = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def add(self, count: int = 1) -> None:
+        """Count processed items."""
+        if self.started is None:
+            self.started = time.monotonic()
+        self.items += count
+
+    def done(self) -> None:
+        """Mark the stage as drained."""
+        self.finished = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Get the number of items processed per second."""
+        if self.started is None:
+            return 0.0
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.items / max(elapsed, 1e-6)
+
+    def __str__(self) -> str:
+        """Stage throughput."""
+        return f"{self.name} {self.items} ({self.rate:.0f}/s)"
+
+
+class SizeScheduler(Generic[ItemType]):
+    """Hand out presigned items largest first, to whichever uploader is free.
+
+    Uploaders pull one item at a time instead of owning static batches, so
+    a few large files cannot hold up the tail while other uploaders idle
+    (longest-processing-time first, rebalanced on every pull).
+    """
+
+    def __init__(self) -> None:
+        """Construct SizeScheduler."""
+        self._heap: List[Tuple[int, int, ItemType, str]] = []
+        self._order = itertools.count()
+        self._closed = False
+        self._changed = asyncio.Condition()
+
+    def __len__(self) -> int:
+        """Get the number of items waiting for an uploader."""
+        return len(self._heap)
+
+    async def put(self, items: Sequence[Tuple[ItemType, str, int]]) -> None:
+        """Schedule items, with their presigned URL and size."""
+        async with self._changed:
+            for item, url, size in items:
+                heapq.heappush(self._heap, (-size, next(self._order), item, url))
+            self._changed.notify_all()
+
+    async def get(self) -> Optional[Tuple[ItemType, str]]:
+        """Get the largest waiting item, None once closed and drained."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._heap or self._closed)
+            if not self._heap:
+                return None
+            _, _, item, url = heapq.heappop(self._heap)
+            self._changed.notify_all()
+            return item, url
+
+    async def wait_below(self, count: int) -> None:
+        """Wait until fewer than count items are waiting."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self._heap) < count)
+
+    async def close(self) -> None:
+        """Stop the uploaders once the waiting items are drained."""
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+
+class UploadPipeline(Generic[ItemType]):
+    """Upload items through stages connected by bounded queues.
+
+    The blocking scan runs in a thread and feeds chunks of items to the
+    batcher, which groups them in batches of `batch_size` for the
+    presigner, which keeps about one batch of presigned items ahead of the
+    `concurrency` uploaders, which pull items largest first (see
+    SizeScheduler). Uploads start as soon as the first batch is scanned,
+    and the bounded queues stop the scan from running too far ahead of
+    the uploads. Every upload holds a slot of an AdaptiveLimiter, which
+    starts with all the uploaders active, and backs off while uploads are
+    throttled (429, 5xx or timeouts, reported by upload_content).
+
+    :param presign: Coroutine function returning the presigned URLs of a batch.
+    :param upload: Coroutine function uploading an item to its presigned URL.
+    :param concurrency: Number of items uploaded in parallel.
+    :param batch_size: Number of items per batch.
+    :param queue_size: Number of chunks/batches buffered between stages.
+    :param size: Function returning the size of an item (stat during the scan).
+    :param limiter: Limiter of the active uploaders, shared between pipelines.
+    """
+
+    def __init__(
+        self,
+        presign: Callable[[List[ItemType]], Awaitable[List[str]]],
+        upload: Callable[[ItemType, str], Awaitable[bool]],
+        concurrency: int,
+        batch_size: int = MAX_FILE_BATCH_SIZE,
+        queue_size: int = 2,
+        size: Callable[[ItemType], int] = lambda _: 0,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ) -> None:
+        """Construct UploadPipeline."""
+        # pylint: disable=too-many-arguments
+        self.presign = presign
+        self.upload = upload
+        self.size = size
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.limiter = limiter or AdaptiveLimiter(self.concurrency, self.concurrency)
+        self.stats: Dict[str, StageStats] = {
+            name: StageStats(name) for name in ("scan", "presign", "upload")
+        }
+
+    def describe(self) -> str:
+        """Describe the throughput of every stage."""
+        return ", ".join(
+            [str(stats) for stats in self.stats.values()]
+            + [f"window {self.limiter.window}"]
+        )
+
+    async def run(self, items: Iterator[ItemType]) -> List[bool]:
+        """Run the items through the pipeline, until every stage has drained.
+
+        Args
+        ----
+        items: Iterator[ItemType]
+            Items to upload, the iterator may block (e.g. walk a directory).
+
+        Returns
+        -------
+        List[bool]
+            Upload status of every item.
+        """
+        # pylint: disable=too-many-locals,too-many-statements
+        loop = asyncio.get_running_loop()
+        stopping = threading.Event()
+        scanned: "asyncio.Queue[Optional[List[ItemType]]]" = asyncio.Queue(
+            self.queue_size
+        )
+        batches: "asyncio.Queue[Optional[List[ItemType]]]" = asyncio.Queue(
+            self.queue_size
+        )
+        scheduler: SizeScheduler[ItemType] = SizeScheduler()
+        results: List[bool] = []
+
+        def put_scanned(chunk: Optional[List[ItemType]]) -> None:
+            """Hand a chunk to the event loop, waiting while the queue is full."""
+            future = asyncio.run_coroutine_threadsafe(scanned.put(chunk), loop)
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError as error:
+                    if stopping.is_set():
+                        future.cancel()
+                        raise PipelineStopped() from error
+
+        def scan() -> None:
+            chunk: List[ItemType] = []
+            try:
+                for item in items:
+                    chunk.append(item)
+                    if len(chunk) >= SCAN_CHUNK_SIZE:
+                        self.stats["scan"].add(len(chunk))
+                        put_scanned(chunk)
+                        chunk = []
+                self.stats["scan"].add(len(chunk))
+                self.stats["scan"].done()
+                put_scanned(chunk)
+                put_scanned(None)
+            except PipelineStopped:
+                pass
+
+        async def batch() -> None:
+            pending: List[ItemType] = []
+            while (chunk := await scanned.get()) is not None:
+                pending.extend(chunk)
+                while len(pending) >= self.batch_size:
+                    await batches.put(pending[: self.batch_size])
+                    pending = pending[self.batch_size :]
+            if pending:
+                await batches.put(pending)
+            await batches.put(None)
+
+        async def presign() -> None:
+            while (items_batch := await batches.get()) is not None:
+                await scheduler.wait_below(self.batch_size)
+                urls = await self.presign(items_batch)
+                self.stats["presign"].add(len(items_batch))
+                if len(urls) != len(items_batch):
+                    logger.error(
+                        f"Presigned {len(urls)} URLs for {len(items_batch)} files, "
+                        + f"dropped {len(items_batch)} files"
+                    )
+                    results.extend(False for _ in items_batch)
+                    continue
+                await scheduler.put(
+                    [
+                        (item, url, self.size(item))
+                        for item, url in zip(items_batch, urls)
+                    ]
+                )
+            self.stats["presign"].done()
+            await scheduler.close()
+
+        async def upload() -> None:
+            while (item_url := await scheduler.get()) is not None:
+                async with self.limiter.slot():
+                    results.append(await self.upload(*item_url))
+                self.stats["upload"].add()
+
+        tasks = [
+            asyncio.ensure_future(loop.run_in_executor(None, scan)),
+            asyncio.ensure_future(batch()),
+            asyncio.ensure_future(presign()),
+            *(asyncio.ensure_future(upload()) for _ in range(self.concurrency)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.debug(f"Uploads done: {self.limiter!r}")
+        self.stats["upload"].done()
+        return results
@@ -0,0 +1,103 @@
+"""Adaptive sizing of the presign requests."""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+from altadb.common.constants import MAX_FILE_BATCH_SIZE, PRESIGN_GROW_AFTER
+from altadb.common.errors import RequestTooLargeError
+from altadb.utils.logging import logger
+
+ItemType = TypeVar("ItemType")  # pylint: disable=invalid-name
+
+
+class AdaptiveBatchSize:
+    """Number of files per presign request, learned from the server's limits.
+
+    Requests that are too large (HTTP 413, or a timeout) are bisected, and
+    the size grows again after `grow_after` successful requests in a row,
+    halfway to the smallest size known to be too large. Once it reaches
+    that ceiling, the ceiling is probed again after a longer run of
+    successes, in case the server limits were raised.
+
+    :param maximum: Largest number of files per request.
+    :param grow_after: Number of successful requests before growing.
+    """
+
+    def __init__(
+        self, maximum: int = MAX_FILE_BATCH_SIZE, grow_after: int = PRESIGN_GROW_AFTER
+    ) -> None:
+        """Construct AdaptiveBatchSize."""
+        self.maximum = max(1, maximum)
+        self.grow_after = max(1, grow_after)
+        self.size = self.maximum
+        self.ceiling = self.maximum  # Largest size not known to be too large
+        self.good = 0  # Largest size known to succeed
+        self._successes = 0
+
+    def on_success(self, count: int) -> None:
+        """Grow the size after enough successful requests in a row."""
+        self.good = max(self.good, count)
+        self._successes += 1
+        if self._successes % self.grow_after:
+            return
+        if self.size >= self.ceiling and self._successes % (4 * self.grow_after) == 0:
+            self.ceiling = min(self.maximum, self.ceiling + max(1, self.ceiling // 2))
+        self.size = (self.size + self.ceiling + 1) // 2
+
+    def on_too_large(self, count: int) -> None:
+        """Bisect the size after a request of count files was too large."""
+        self._successes = 0
+        self.ceiling = max(1, min(self.ceiling, count - 1))
+        self.good = min(self.good, self.ceiling)
+        self.size = max(1, min(self.ceiling, max(self.good, count // 2)))
+        logger.debug(f"Presign request of {count} files too large, now {self.size}")
+
+
+_batch_sizes: Dict[str, AdaptiveBatchSize] = {}
+_batch_sizes_lock = threading.Lock()
+
+
+def presign_batch_size(endpoint: str) -> AdaptiveBatchSize:
+    """Get the presign batch size learned for an endpoint (for this process)."""
+    with _batch_sizes_lock:
+        if endpoint not in _batch_sizes:
+            _batch_sizes[endpoint] = AdaptiveBatchSize()
+        return _batch_sizes[endpoint]
+
+
+def is_too_large_error(error: BaseException) -> bool:
+    """Check if a request failed for being too large (HTTP 413 or timeout).
+
+    The client raises both without retrying them (see AltaDBClient).
+    """
+    return isinstance(error, (RequestTooLargeError, TimeoutError, asyncio.TimeoutError))
+
+
+async def presign_in_batches(
+    presign: Callable[[List[ItemType]], Awaitable[List[str]]],
+    items: List[ItemType],
+    batch_size: AdaptiveBatchSize,
+) -> List[str]:
+    """Presign items in as few requests as the server allows.
+
+    Requests that are too large are bisected and retried, a single item
+    that is still too large fails.
+    """
+    urls: List[str] = []
+    idx = 0
+    while idx < len(items):
+        batch = items[idx : idx + batch_size.size]
+        try:
+            batch_urls = await presign(batch)
+        except Exception as error:  # pylint: disable=broad-except
+            if len(batch) == 1 or not is_too_large_error(error):
+                raise
+            batch_size.on_too_large(len(batch))
+            continue
+        if len(batch_urls) != len(batch):
+            return []
+        batch_size.on_success(len(batch))
+        urls.extend(batch_urls)
+        idx += len(batch)
+    return urls
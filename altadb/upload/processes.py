@@ -0,0 +1,306 @@
+"""Upload from several processes, each with its own event loop and session."""
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from altadb.common.constants import (
+    UPLOAD_WORKER_CHUNK_SIZE,
+    UPLOAD_WORKER_REPORT_INTERVAL,
+)
+from altadb.common.context import AltaDBContext
+from altadb.config import config
+from altadb.utils.logging import logger
+
+FileEntry = Dict[str, str]
+# (worker, kind, payload), kind is "progress", "uploaded" or "done"
+WorkerMessage = Tuple[int, str, Any]
+
+
+class WorkerSettings(NamedTuple):
+    """Everything a worker process needs to upload files to an import."""
+
+    api_key: str
+    secret: str
+    url: str
+    org_id: str
+    dataset: str
+    import_id: str
+    import_name: Optional[str]
+    concurrency: int
+    record: bool  # Report the uploaded files, for the upload index
+    config: Dict[str, Any]
+
+    @classmethod
+    def create(
+        cls,
+        context: AltaDBContext,
+        org_id: str,
+        dataset: str,
+        import_id: str,
+        import_name: Optional[str],
+        concurrency: int,
+        record: bool,
+        workers: int,
+    ) -> "WorkerSettings":
+        """Create the settings of the workers of an upload.
+
+        The upload bandwidth limits are shared between the workers.
+        """
+        # pylint: disable=too-many-arguments
+        upload_bandwidth = config.upload_bandwidth
+        return cls(
+            context.client.api_key,
+            context.client.secret_key,
+            context.client.url,
+            org_id,
+            dataset,
+            import_id,
+            import_name,
+            concurrency,
+            record,
+            {
+                "debug": config.debug,
+                "verify_ssl": config.verify_ssl,
+                "log_level": config.log_level,
+                "upload_bandwidth": (
+                    max(1, upload_bandwidth // workers) if upload_bandwidth else None
+                ),
+                "bandwidth_schedule": [
+                    (start, end, max(1, rate // workers) if rate else rate)
+                    for start, end, rate in config.bandwidth_schedule
+                ],
+            },
+        )
+
+    def create_context(self) -> AltaDBContext:
+        """Create the context of a worker process, and apply the config."""
+        # pylint: disable=import-outside-toplevel
+        from altadb.repo import DatasetRepo, UploadRepo
+
+        for key, value in self.config.items():
+            setattr(config, key, value)
+
+        context = AltaDBContext(self.api_key, self.secret, self.url)
+        context.client.url = self.url  # Already resolved by the parent
+        context.dataset = DatasetRepo(context.client)
+        context.upload = UploadRepo(context.client)
+        return context
+
+
+class WorkerReporter:
+    """Report the progress of a worker process to the parent, in batches.
+
+    :param worker: Worker number.
+    :param results: Queue read by the parent.
+    :param record: Report the uploaded files, not only their number.
+    """
+
+    def __init__(
+        self, worker: int, results: "Queue[WorkerMessage]", record: bool
+    ) -> None:
+        """Construct WorkerReporter."""
+        self.worker = worker
+        self.results = results
+        self.record = record
+        self._uploaded = 0
+        self._files: List[Tuple[str, str]] = []
+        self._reported = time.monotonic()
+        self._lock = threading.Lock()
+
+    def uploaded(self, path: str, content_hash: str) -> None:
+        """Count an uploaded file, with the SHA-256 of its content."""
+        with self._lock:
+            self._uploaded += 1
+            if self.record:
+                self._files.append((path, content_hash))
+        if time.monotonic() - self._reported >= UPLOAD_WORKER_REPORT_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """Report the files uploaded since the last report."""
+        with self._lock:
+            uploaded, self._uploaded = self._uploaded, 0
+            files, self._files = self._files, []
+            self._reported = time.monotonic()
+        if uploaded:
+            self.results.put((self.worker, "progress", uploaded))
+        if files:
+            self.results.put((self.worker, "uploaded", files))
+
+    def done(self, status: bool) -> None:
+        """Report the end of the worker, and whether all its files were uploaded."""
+        self.flush()
+        self.results.put((self.worker, "done", status))
+
+
+WorkerTarget = Callable[
+    [WorkerSettings, Iterator[FileEntry], WorkerReporter], Coroutine[Any, Any, bool]
+]
+
+
+def _iter_tasks(tasks: "Queue[Optional[List[FileEntry]]]") -> Iterator[FileEntry]:
+    while (chunk := tasks.get()) is not None:
+        yield from chunk
+
+
+def run_worker(
+    target: WorkerTarget,
+    worker: int,
+    settings: WorkerSettings,
+    tasks: "Queue[Optional[List[FileEntry]]]",
+    results: "Queue[WorkerMessage]",
+) -> None:
+    """Upload the files fed to a worker process, in its own event loop."""
+    reporter = WorkerReporter(worker, results, settings.record)
+    try:
+        status = asyncio.run(target(settings, _iter_tasks(tasks), reporter))
+    except Exception as error:  # pylint: disable=broad-except
+        logger.error(f"Upload worker {worker} failed: {error}")
+        status = False
+    reporter.done(status)
+
+
+class UploadWorkers:
+    """Shard files across worker processes, and aggregate their reports.
+
+    Files are fed to the workers in chunks through a bounded queue, so that
+    faster workers take more of them, while the files are still being
+    scanned. Worker processes are spawned (not forked, the parent runs
+    threads and an event loop), scripts using them must be guarded with
+    `if __name__ == "__main__":`.
+
+    :param target: Coroutine uploading the files of a worker.
+    :param settings: Worker settings.
+    :param workers: Number of worker processes.
+    """
+
+    def __init__(
+        self, target: WorkerTarget, settings: WorkerSettings, workers: int
+    ) -> None:
+        """Construct UploadWorkers."""
+        self.target = target
+        self.settings = settings
+        self.workers = max(1, workers)
+        self.files = 0
+
+    def _feed(
+        self,
+        files: Iterator[FileEntry],
+        tasks: "Queue[Optional[List[FileEntry]]]",
+        stop: threading.Event,
+    ) -> None:
+        def put(chunk: Optional[List[FileEntry]]) -> bool:
+            while not stop.is_set():
+                try:
+                    tasks.put(chunk, timeout=UPLOAD_WORKER_REPORT_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        chunk: List[FileEntry] = []
+        for file in files:
+            chunk.append(file)
+            self.files += 1
+            if len(chunk) >= UPLOAD_WORKER_CHUNK_SIZE:
+                if not put(chunk):
+                    return
+                chunk = []
+        if chunk and not put(chunk):
+            return
+        for _ in range(self.workers):
+            if not put(None):
+                return
+
+    def _check_crashed(
+        self, processes: Dict[int, BaseProcess], running: Set[int]
+    ) -> bool:
+        """Forget the workers that exited without reporting their end."""
+        crashed = {
+            worker
+            for worker in running
+            if not processes[worker].is_alive() and processes[worker].exitcode
+        }
+        for worker in crashed:
+            logger.error(
+                f"Upload worker {worker} exited with code {processes[worker].exitcode}"
+            )
+        running -= crashed
+        return not crashed
+
+    async def run(
+        self,
+        files: Iterator[FileEntry],
+        on_progress: Callable[[int], None],
+        on_uploaded: Optional[Callable[[List[Tuple[str, str]]], None]] = None,
+    ) -> bool:
+        """Upload the files, return True if all of them were uploaded.
+
+        The number of files fed to the workers is available in `files`.
+        """
+        # pylint: disable=too-many-locals
+        context = multiprocessing.get_context("spawn")
+        tasks: "Queue[Optional[List[FileEntry]]]" = context.Queue(2 * self.workers)
+        results: "Queue[WorkerMessage]" = context.Queue()
+        processes: Dict[int, BaseProcess] = {
+            worker: context.Process(
+                target=run_worker,
+                args=(self.target, worker, self.settings, tasks, results),
+                name=f"altadb-upload-{worker}",
+                daemon=True,
+            )
+            for worker in range(self.workers)
+        }
+        for process in processes.values():
+            process.start()
+
+        def get() -> Optional[WorkerMessage]:
+            try:
+                return results.get(timeout=UPLOAD_WORKER_REPORT_INTERVAL)
+            except queue.Empty:
+                return None
+
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        feeder = loop.run_in_executor(None, self._feed, files, tasks, stop)
+        running = set(processes)
+        status = True
+        try:
+            while running:
+                if (message := await loop.run_in_executor(None, get)) is None:
+                    status = self._check_crashed(processes, running) and status
+                    continue
+                worker, kind, payload = message
+                if kind == "progress":
+                    on_progress(payload)
+                elif kind == "uploaded" and on_uploaded:
+                    await loop.run_in_executor(None, on_uploaded, payload)
+                elif kind == "done":
+                    running.discard(worker)
+                    status = status and payload
+        finally:
+            # Unblock the feeder if workers are gone, before waiting for it
+            stop.set()
+            await feeder
+            for worker in running:
+                processes[worker].terminate()
+            for process in processes.values():
+                await loop.run_in_executor(None, process.join)
+        return status
@@ -1,26 +1,135 @@
 """Public interface to upload module."""
 
+import asyncio
+import itertools
 import os
-from typing import Callable, Dict, List, Optional
+from contextlib import ExitStack
+from functools import partial
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import aiohttp
 import tqdm  # type: ignore
 
-from altadb.common.constants import MAX_FILE_BATCH_SIZE, MAX_UPLOAD_CONCURRENCY
+from altadb.common.constants import (
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_FILE_BATCH_SIZE,
+    MAX_FILE_UPLOADS,
+    MAX_UPLOAD_CONCURRENCY,
+)
 from altadb.common.context import AltaDBContext
 
-from altadb.utils.async_utils import gather_with_concurrency
+from altadb.upload.dedup import Deduplicator
+from altadb.upload.index import UploadIndex
+from altadb.upload.pipeline import UploadPipeline
+from altadb.upload.presign import presign_batch_size, presign_in_batches
+from altadb.upload.processes import UploadWorkers, WorkerReporter, WorkerSettings
+from altadb.upload.scan import UploadScanner
+from altadb.upload.wait import ImportWaiter
+from altadb.utils.archives import ArchiveMember, ArchiveReader, is_archive
+from altadb.utils.bandwidth import upload_bandwidth
 from altadb.utils.logging import logger, log_error
 from altadb.utils.files import (
     DICOM_FILE_TYPES,
-    find_files_recursive,
     get_file_type,
+    iter_files_recursive,
+    upload_content,
+    upload_file,
     upload_files,
 )
+from altadb.utils.session import create_session
 
 SUPPORTED_UPLOAD_FILE_TYPES = [
     *list(DICOM_FILE_TYPES.keys()),
 ]
 
+# File entry, and the archive member to upload it from (None for a file)
+UploadItem = Tuple[Dict[str, str], Optional[ArchiveMember]]
+
+
+def file_entry(file: str) -> Dict[str, str]:
+    """Describe a file to upload."""
+    try:
+        size = os.path.getsize(file)
+    except OSError:
+        size = 0  # Reported by the upload
+    return {
+        "filePath": os.path.basename(file),
+        "abs_file_path": file,
+        "fileType": "application/dicom",
+        "size": str(size),
+    }
+
+
+def member_entry(member: ArchiveMember) -> Dict[str, str]:
+    """Describe an archive member to upload."""
+    return {
+        "filePath": os.path.basename(member.name),
+        "abs_file_path": member.path,
+        "fileType": "application/dicom",
+        "size": str(member.size),
+    }
+
+
+def upload_concurrency(concurrency: int) -> int:
+    """Get the number of files uploaded in parallel, for a given concurrency."""
+    return max(1, min(MAX_UPLOAD_CONCURRENCY, concurrency)) * MAX_FILE_UPLOADS
+
+
+def create_upload_session(concurrency: int) -> aiohttp.ClientSession:
+    """Create the session of an upload, with a connection for every uploader.
+
+    The presigned uploads all go to the same storage host, a smaller pool
+    would leave most uploaders waiting for a connection. Requests to the
+    API host have their own connections on top of them.
+    """
+    uploaders = upload_concurrency(concurrency)
+    return create_session(uploaders + MAX_CONNECTIONS_PER_HOST, uploaders)
+
+
+async def _upload_worker(
+    settings: WorkerSettings, files: Iterator[Dict[str, str]], reporter: WorkerReporter
+) -> bool:
+    """Upload the files fed to a worker process (see UploadWorkers).
+
+    Return True if every file of the worker was uploaded. A worker that
+    crashes does not report its end, the files of the chunks it was fed are
+    not retried by the other workers, and the upload fails without
+    finalizing the import.
+    """
+    upload = Upload(settings.create_context(), settings.org_id, settings.dataset)
+
+    async def _uploaded(path: str, content_hash: str) -> None:
+        reporter.uploaded(path, content_hash)
+
+    async with create_upload_session(settings.concurrency) as aiosession:
+        pipeline, results = (
+            await upload._upload_items(  # pylint: disable=protected-access
+                aiosession,
+                settings.dataset,
+                settings.import_id,
+                settings.import_name,
+                settings.concurrency,
+                ((file, None) for file in files),
+                _uploaded,
+            )
+        )
+    logger.debug(f"Upload worker {reporter.worker} stages: {pipeline.describe()}")
+    if not all(results):
+        logger.error(
+            f"Upload worker {reporter.worker}: {results.count(False)} of "
+            + f"{len(results)} files were not uploaded"
+        )
+    return all(results)
+
 
 class Upload:
     """Primary interface for uploading to a dataset."""
@@ -30,6 +139,7 @@ class Upload:
         self.context = context
         self.org_id = org_id
         self.dataset = dataset
+        self._import_waiter: Optional[ImportWaiter] = None
 
     async def upload_files(
         self,
@@ -37,81 +147,352 @@ class Upload:
         path: str,
         import_name: Optional[str] = None,
         concurrency: int = MAX_UPLOAD_CONCURRENCY,
-    ) -> None:
-        """Upload files."""
-        files: List[str] = []
+        incremental: bool = False,
+        dedupe: bool = False,
+        workers: int = 1,
+    ) -> Optional[str]:
+        """Upload files.
+
+        Files are uploaded while the path is still being scanned, through
+        a pipeline of scan, presign and upload stages.
+
+        Args
+        ----
+        dataset: str
+            Dataset name.
+        path: str
+            File, directory, or zip/tar archive (.zip, .tar, .tar.gz, .tgz,
+            .tar.bz2, .tar.xz) to upload. The DICOM files of an archive are
+            uploaded straight from it, without extracting it.
+        import_name: Optional[str] = None
+            Import name.
+        concurrency: int = MAX_UPLOAD_CONCURRENCY
+            Number of batches uploaded in parallel.
+        incremental: bool = False
+            Only upload files that are new or changed since a previous upload
+            to the dataset, according to a local index (see UploadIndex).
+        dedupe: bool = False
+            Skip files whose content was uploaded to the dataset before, or
+            duplicates another file (or SOPInstanceUID) of this upload.
+            Implies `incremental`.
+            Neither applies to the files of an archive.
+        workers: int = 1
+            Number of processes uploading the files, each with its own event
+            loop and session (see UploadWorkers), to use more than one core.
+            The files of an archive are uploaded by a single process.
+
+        Returns
+        -------
+        Optional[str]
+            Import ID, None if nothing was uploaded.
+            Use `wait_for_import` to wait for the import to be processed.
+        """
+        # pylint: disable=too-many-arguments
+        with ExitStack() as stack:
+            archive: Optional[ArchiveReader] = None
+            index: Optional[UploadIndex] = None
+            if path and is_archive(path):
+                archive = stack.enter_context(
+                    ArchiveReader(path, set(DICOM_FILE_TYPES.keys()))
+                )
+                if incremental or dedupe:
+                    logger.warning(f"Uploading all the files of archive {path}")
+                if workers > 1:
+                    logger.warning(f"Uploading archive {path} with a single process")
+            elif incremental or dedupe:
+                index = stack.enter_context(UploadIndex(self.org_id, dataset))
+            import_id = await self._upload_files(
+                dataset,
+                path,
+                import_name,
+                concurrency,
+                archive or index,
+                Deduplicator(index) if index and dedupe else None,
+                workers,
+            )
+        return import_id
+
+    @staticmethod
+    def _find_files(path: str) -> Optional[Iterator[str]]:
         if not path:
             logger.warning("No file path provided")
-            return
+            return None
         if not os.path.exists(path):
             logger.warning(f"Provided path {path} does not exist.")
-            return
+            return None
         if os.path.isdir(path):
-            _files = find_files_recursive(
-                path, set(DICOM_FILE_TYPES.keys()), multiple=False
+            return iter_files_recursive(path, set(DICOM_FILE_TYPES.keys()))
+        file_type = get_file_type(path)[0]
+        if file_type in SUPPORTED_UPLOAD_FILE_TYPES:
+            return iter([path])
+        logger.warning(f"File {path} is not supported")
+        return iter([])
+
+    def _scan_items(
+        self,
+        path: str,
+        source: Union[ArchiveReader, UploadIndex, None],
+        dedup: Optional[Deduplicator],
+    ) -> Optional[Tuple[Union[ArchiveReader, UploadScanner], Iterator[UploadItem]]]:
+        if isinstance(source, ArchiveReader):
+            # Sized from the archive, to upload the largest files first
+            return source, (
+                (member_entry(member), member) for member in source.members()
             )
-            files = [_file[0] for _file in _files if _file]
+        if (files := self._find_files(path)) is None:
+            return None
+        scanner = UploadScanner(source, dedup)
+        # Sized while scanning, to upload the largest files first
+        return scanner, ((file_entry(file), None) for file in scanner.scan(files))
 
-        else:
-            file_type = get_file_type(path)[0]
-            if file_type in SUPPORTED_UPLOAD_FILE_TYPES:
-                files = [path]
+    async def _upload_files(
+        self,
+        dataset: str,
+        path: str,
+        import_name: Optional[str],
+        concurrency: int,
+        source: Union[ArchiveReader, UploadIndex, None],
+        dedup: Optional[Deduplicator],
+        workers: int,
+    ) -> Optional[str]:
+        # pylint: disable=too-many-arguments,too-many-locals
+        index = source if isinstance(source, UploadIndex) else None
+        if (scanned := self._scan_items(path, source, dedup)) is None:
+            return None
+        scanner, items = scanned
+
+        # Do not create an import before knowing there is something to upload
+        loop = asyncio.get_running_loop()
+        first_item = await loop.run_in_executor(None, next, items, None)
+        if first_item is None:
+            if scanner.skipped:
+                scanner.log_skipped()
+                logger.info(f"No new or changed DICOM files in path {path}")
             else:
-                logger.warning(f"File {path} is not supported")
-        if not files:
-            logger.warning(f"No files found in path {path}")
-            return
-
-        # Now that we have the files list, let us generate the presigned URLs
-        files_list: List[Dict[str, str]] = []
-        for file in files:
-            files_list.append(
-                {
-                    "filePath": os.path.basename(file),
-                    "abs_file_path": file,
-                    "fileType": "application/dicom",
-                }
+                logger.warning(f"No files found in path {path}")
+            return None
+        items = itertools.chain([first_item], items)
+
+        progress_bar = tqdm.tqdm(desc="Uploading all files")
+
+        async with create_upload_session(concurrency) as aiosession:
+            import_id, _ = await self.context.upload.import_files_async(
+                aiosession,
+                org_id=self.org_id,
+                data_store=dataset,
+                import_name=import_name,
             )
+            if not import_id:
+                log_error("Unable to import", True)
 
-        import_id, _ = self.context.upload.import_files(
-            org_id=self.org_id,
-            data_store=dataset,
-            import_name=import_name,
-        )
-        if not import_id:
-            log_error("Unable to import", True)
+            uploaded: List[Tuple[str, str]] = []
 
-        progress_bar = tqdm.tqdm(desc="Uploading all files", total=len(files_list))
+            async def _record_uploaded(
+                path: Optional[str] = None, content_hash: str = ""
+            ) -> None:
+                if path:
+                    uploaded.append((path, content_hash))
+                if index and (len(uploaded) >= MAX_FILE_BATCH_SIZE or not path):
+                    files = uploaded[:]
+                    uploaded.clear()
+                    await loop.run_in_executor(None, index.record, files, import_id)
 
-        def _upload_callback(*_):
-            progress_bar.update(1)
+            try:
+                if workers > 1 and isinstance(scanner, UploadScanner):
+                    upload_workers = UploadWorkers(
+                        _upload_worker,
+                        WorkerSettings.create(
+                            self.context,
+                            self.org_id,
+                            dataset,
+                            import_id,
+                            import_name,
+                            concurrency,
+                            index is not None,
+                            workers,
+                        ),
+                        workers,
+                    )
+                    upload_status = await upload_workers.run(
+                        (file for file, _ in items),
+                        progress_bar.update,
+                        partial(index.record, import_id=import_id) if index else None,
+                    )
+                    total_files = upload_workers.files
+                    logger.info(f"Uploaded with {upload_workers.workers} processes")
+                else:
+                    pipeline, results = await self._upload_items(
+                        aiosession,
+                        dataset,
+                        import_id,
+                        import_name,
+                        concurrency,
+                        items,
+                        _record_uploaded if index else None,
+                        progress_bar,
+                    )
+                    await _record_uploaded()
+                    upload_status = all(results)
+                    if not upload_status:
+                        logger.error(
+                            f"{results.count(False)} of {len(results)} files "
+                            + "were not uploaded"
+                        )
+                    total_files = pipeline.stats["scan"].items
+                    logger.info(f"Upload stages: {pipeline.describe()}")
+            finally:
+                progress_bar.close()
+            scanner.log_skipped()
 
-        # Upload files to presigned URLs
-        upload_status = await gather_with_concurrency(
-            min(5, concurrency),
-            [
-                self.upload_files_intermediate_function(
-                    dataset=dataset,
-                    import_name=import_name,
-                    import_id=import_id,
-                    files_paths=files_list[i : i + MAX_FILE_BATCH_SIZE],
-                    upload_callback=_upload_callback,
+            # Do not finalize an import missing some of its files
+            if not upload_status:
+                log_error("Error uploading files", True)
+
+            # Every file has been uploaded (by every process), finalize once
+            mutation_status = await self.context.upload.process_import_async(
+                aiosession,
+                org_id=self.org_id,
+                data_store=dataset,
+                import_id=import_id,
+                total_files=total_files,
+            )
+
+        if not mutation_status:
+            log_error("Error finalizing the import", True)
+        if index:
+            index.processed(import_id)
+        return import_id
+
+    async def _upload_items(
+        self,
+        aiosession: aiohttp.ClientSession,
+        dataset: str,
+        import_id: str,
+        import_name: Optional[str],
+        concurrency: int,
+        items: Iterator[UploadItem],
+        on_uploaded: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        progress_bar: Optional[tqdm.tqdm] = None,
+    ) -> Tuple[UploadPipeline[UploadItem], List[bool]]:
+        """Upload items to an import, through the presign and upload stages."""
+        # pylint: disable=too-many-arguments
+
+        async def _presign(batch: List[UploadItem]) -> List[str]:
+            return await self.presign_files(
+                aiosession, dataset, import_id, import_name, [f for f, _ in batch]
+            )
+
+        async def _upload(item: UploadItem, url: str) -> bool:
+            file, member = item
+            if member:
+                # Decompressed from the archive on worker threads
+                return await upload_content(
+                    aiosession,
+                    member.path,
+                    member.open_content,
+                    member.size,
+                    url,
+                    get_file_type(member.name)[-1],
+                    _upload_callback,
+                    read_in_thread=True,
                 )
-                for i in range(0, len(files_list), MAX_FILE_BATCH_SIZE)
-            ],
+            # Hashed while it is uploaded, for the upload index
+            content_hashes: List[str] = []
+            status = await upload_file(
+                aiosession,
+                file["abs_file_path"],
+                url,
+                get_file_type(file["abs_file_path"])[-1],
+                _upload_callback,
+                content_hashes.append if on_uploaded else None,
+            )
+            if status and on_uploaded:
+                await on_uploaded(file["abs_file_path"], "".join(content_hashes))
+            return status
+
+        pipeline: UploadPipeline[UploadItem] = UploadPipeline(
+            _presign,
+            _upload,
+            upload_concurrency(concurrency),
+            size=lambda item: int(item[0]["size"]),
         )
 
-        if not upload_status:
-            log_error("Error uploading files", True)
+        def _upload_callback(*_):
+            if progress_bar is not None:
+                progress_bar.set_postfix_str(
+                    f"{pipeline.describe()}, {upload_bandwidth.describe()}",
+                    refresh=False,
+                )
+                progress_bar.update(1)
+
+        return pipeline, await pipeline.run(items)
 
-        mutation_status = self.context.upload.process_import(
-            org_id=self.org_id,
-            data_store=dataset,
-            import_id=import_id,
-            total_files=len(files),
+    async def wait_for_import(
+        self,
+        import_id: str,
+        dataset: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """Wait for an import to be processed by the server.
+
+        Concurrent waits (e.g. with asyncio.gather) share a single status
+        query per poll, polled with a jittered backoff.
+
+        Args
+        ----
+        import_id: str
+            Import ID, as returned by `upload_files`.
+        dataset: Optional[str] = None
+            Dataset name (default: the dataset of this object).
+        timeout: Optional[float] = None
+            Maximum time to wait (seconds), raises asyncio.TimeoutError.
+
+        Returns
+        -------
+        Dict
+            The import, once its status is CREATION_SUCCESS, CREATION_PARTIAL
+            or CREATION_FAILURE (see `failureLogs`).
+        """
+        if self._import_waiter is None:
+            self._import_waiter = ImportWaiter(self.context, self.org_id)
+        return await self._import_waiter.wait(
+            dataset or self.dataset, import_id, timeout
+        )
+
+    async def presign_files(
+        self,
+        aiosession: aiohttp.ClientSession,
+        dataset: str,
+        import_id: str,
+        import_name: Optional[str],
+        files_paths: List[Dict[str, str]],
+    ) -> List[str]:
+        """Generate the presigned URLs of a batch of files.
+
+        The files are presigned in as few requests as the server accepts,
+        requests that are too large (HTTP 413 or timeout) are split.
+        """
+
+        async def _presign(batch: List[Dict[str, str]]) -> List[str]:
+            _, presigned_urls = await self.context.upload.import_files_async(
+                aiosession,
+                org_id=self.org_id,
+                data_store=dataset,
+                import_name=import_name,
+                import_id=import_id,
+                files=[
+                    {
+                        "filePath": file["filePath"],
+                        "fileType": file["fileType"],
+                    }
+                    for file in batch
+                ],
+            )
+            return presigned_urls
+
+        return await presign_in_batches(
+            _presign, files_paths, presign_batch_size(self.context.client.url)
         )
-        if not mutation_status:
-            log_error("Error finalizing the import", True)
 
     async def upload_files_intermediate_function(
         self,
@@ -120,23 +501,26 @@ class Upload:
         import_name: Optional[str] = None,
         files_paths: Optional[List[Dict[str, str]]] = None,
         upload_callback: Optional[Callable] = None,
+        aiosession: Optional[aiohttp.ClientSession] = None,
+        presigned_urls: Optional[List[str]] = None,
     ) -> bool:
-        """Upload files to presigned URLs."""
-        # Generate presigned URLs for concurrency number of files at a time
+        """Upload files to presigned URLs.
+
+        The presigned URLs of the files are generated, unless provided.
+        """
+        # pylint: disable=too-many-arguments
         files_paths = files_paths or []
-        _, presigned_urls = self.context.upload.import_files(
-            org_id=self.org_id,
-            data_store=dataset,
-            import_name=import_name,
-            import_id=import_id,
-            files=[
-                {
-                    "filePath": file["filePath"],
-                    "fileType": file["fileType"],
-                }
-                for file in files_paths
-            ],
-        )
+        if presigned_urls is None:
+            # Generate presigned URLs for concurrency number of files at a time
+            if aiosession is None:
+                async with create_session() as own_session:
+                    presigned_urls = await self.presign_files(
+                        own_session, dataset, import_id, import_name, files_paths
+                    )
+            else:
+                presigned_urls = await self.presign_files(
+                    aiosession, dataset, import_id, import_name, files_paths
+                )
 
         if not presigned_urls:
             return False
@@ -153,5 +537,6 @@ class Upload:
             progress_bar_name="Batch Progress",
             keep_progress_bar=False,
             upload_callback=upload_callback,
+            aiosession=aiosession,
         )
         return all(results)
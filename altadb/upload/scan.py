@@ -0,0 +1,94 @@
+"""Selection of the scanned files to upload."""
+
+import threading
+from typing import Iterable, Iterator, Optional
+
+from altadb.common.constants import SCAN_WORKERS
+from altadb.upload.dedup import Deduplicator, FileDigest
+from altadb.upload.index import UploadIndex
+from altadb.utils.common_utils import format_size
+from altadb.utils.files import is_dicom_file, map_files, needs_dicom_check
+from altadb.utils.logging import logger
+
+
+class UploadScanner:
+    """Select the scanned files to upload, on a pool of threads.
+
+    Files are checked in order of cost: files unchanged since a previous
+    upload (a stat), then files without extension that are not DICOM (a 132
+    byte read), then unchanged content of files of the same size, and
+    duplicates (a full read, see UploadIndex and Deduplicator).
+
+    :param index: Upload index of the dataset, to skip unchanged files.
+    :param dedup: Deduplicator, to skip duplicate files.
+    :param workers: Number of threads checking files.
+    """
+
+    def __init__(
+        self,
+        index: Optional[UploadIndex] = None,
+        dedup: Optional[Deduplicator] = None,
+        workers: int = SCAN_WORKERS,
+    ) -> None:
+        """Construct UploadScanner."""
+        self.index = index
+        self.dedup = dedup
+        self.workers = max(1, workers)
+        self.not_dicom = 0
+        self._lock = threading.Lock()
+
+    @property
+    def skipped(self) -> int:
+        """Get the number of scanned files that are skipped."""
+        return (
+            self.not_dicom
+            + (self.index.skipped if self.index else 0)
+            + (self.dedup.skipped if self.dedup else 0)
+        )
+
+    def check(self, path: str) -> Optional[FileDigest]:
+        """Check a file, return None if it should not be uploaded."""
+        scanned = self.index.scan(path) if self.index else None
+        if self.index and scanned and self.index.unchanged(scanned):
+            return None
+        try:
+            if needs_dicom_check(path) and not is_dicom_file(path):
+                with self._lock:
+                    self.not_dicom += 1
+                return None
+        except OSError:
+            # Let the upload report the file
+            pass
+        if self.dedup and scanned:
+            return self.dedup.digest(scanned)
+        if self.index and scanned and not self.index.changed(scanned):
+            return None
+        return FileDigest(path, 0, None, None)
+
+    def scan(self, files: Iterable[str]) -> Iterator[str]:
+        """Yield the files to upload, in order."""
+        digests = (
+            digest
+            for digest in map_files(self.check, files, self.workers)
+            if digest is not None
+        )
+        if self.dedup:
+            yield from self.dedup.unique(digests)
+        else:
+            yield from (digest.path for digest in digests)
+
+    def log_skipped(self) -> None:
+        """Log the skipped files."""
+        if self.not_dicom:
+            logger.info(f"Skipped {self.not_dicom} files that are not DICOM")
+        if self.index:
+            logger.info(
+                f"Skipped {self.index.skipped} unchanged files "
+                + f"({format_size(self.index.skipped_bytes)})"
+            )
+        if self.dedup:
+            logger.info(
+                f"Skipped {self.dedup.skipped} duplicate files, "
+                + f"saving {format_size(self.dedup.skipped_bytes)} "
+                + f"({self.dedup.skipped_bytes} bytes)"
+            )
@@ -0,0 +1,149 @@
+"""Wait for imports to be processed by the server."""
+
+import asyncio
+import random
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from altadb.common.constants import (
+    IMPORT_POLL_MAX_DELAY,
+    IMPORT_POLL_MIN_DELAY,
+    IMPORT_STATUS_PAGE_SIZE,
+    IMPORT_TERMINAL_STATUSES,
+)
+from altadb.common.context import AltaDBContext
+from altadb.utils.logging import logger
+from altadb.utils.session import create_session
+
+
+class ImportWaiter:
+    """Wait for imports to reach a terminal status.
+
+    All the imports being waited for are watched by a single poller, which
+    lists the imports of each dataset (one paginated query per dataset) with
+    a jittered exponential backoff between polls, and resolves every waiter
+    as soon as its import reaches a terminal status. The poller stops when
+    nothing is waited for.
+
+    :param context: AltaDB context.
+    :param org_id: Organization ID.
+    :param min_delay: Delay (seconds) before the first poll.
+    :param max_delay: Maximum delay (seconds) between polls.
+    """
+
+    def __init__(
+        self,
+        context: AltaDBContext,
+        org_id: str,
+        min_delay: float = IMPORT_POLL_MIN_DELAY,
+        max_delay: float = IMPORT_POLL_MAX_DELAY,
+    ) -> None:
+        """Construct ImportWaiter."""
+        self.context = context
+        self.org_id = org_id
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self._waiters: Dict[str, Dict[str, List["asyncio.Future[Dict]"]]] = {}
+        self._poller: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def wait(
+        self, data_store: str, import_id: str, timeout: Optional[float] = None
+    ) -> Dict:
+        """Wait for an import to reach a terminal status, and return it.
+
+        Args
+        ----
+        data_store: str
+            Dataset name.
+        import_id: str
+            Import ID.
+        timeout: Optional[float] = None
+            Maximum time to wait (seconds), raises asyncio.TimeoutError.
+
+        Returns
+        -------
+        Dict
+            The import, with its `status` and `failureLogs`.
+        """
+        future: "asyncio.Future[Dict]" = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(data_store, {}).setdefault(import_id, []).append(
+            future
+        )
+
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.ensure_future(self._poll(self._wakeup))
+        elif self._wakeup:
+            # Poll the new import soon, instead of after the current backoff
+            self._wakeup.set()
+
+        # A timeout cancels the future, and the import is not polled anymore
+        return await asyncio.wait_for(future, timeout)
+
+    def _forget_done(self) -> None:
+        for data_store, waiters in list(self._waiters.items()):
+            for import_id, futures in list(waiters.items()):
+                futures[:] = [future for future in futures if not future.done()]
+                if not futures:
+                    del waiters[import_id]
+            if not waiters:
+                del self._waiters[data_store]
+
+    async def _poll(self, wakeup: asyncio.Event) -> None:
+        delay = self.min_delay
+        try:
+            async with create_session() as aiosession:
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            wakeup.wait(), random.uniform(delay / 2, delay)
+                        )
+                        delay = self.min_delay
+                    except asyncio.TimeoutError:
+                        delay = min(self.max_delay, delay * 1.5)
+                    wakeup.clear()
+
+                    self._forget_done()
+                    if not self._waiters:
+                        return
+                    for data_store, waiters in list(self._waiters.items()):
+                        await self._poll_data_store(aiosession, data_store, waiters)
+        except Exception as error:  # pylint: disable=broad-except
+            for waiters in self._waiters.values():
+                for futures in waiters.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(error)
+            self._waiters.clear()
+
+    async def _poll_data_store(
+        self,
+        aiosession: aiohttp.ClientSession,
+        data_store: str,
+        waiters: Dict[str, List["asyncio.Future[Dict]"]],
+    ) -> None:
+        """List the imports of a dataset, until all the pending ones are seen."""
+        pending = set(waiters)
+        cursor: Optional[str] = None
+        while pending:
+            imports, cursor = await self.context.dataset.get_data_store_imports_async(
+                aiosession,
+                self.org_id,
+                data_store,
+                IMPORT_STATUS_PAGE_SIZE,
+                cursor,
+            )
+            for import_ in imports:
+                import_id = import_.get("importId")
+                if import_id not in pending:
+                    continue
+                pending.discard(import_id)
+                logger.debug(f"Import {import_id}: {import_.get('status')}")
+                if import_.get("status") in IMPORT_TERMINAL_STATUSES:
+                    for future in waiters[import_id]:
+                        if not future.done():
+                            future.set_result(import_)
+            if not cursor:
+                break
@@ -0,0 +1,231 @@
+"""Read the files of zip and tar archives, without extracting them."""
+
+import io
+import os
+import tarfile
+import tempfile
+import threading
+import zipfile
+from contextlib import ExitStack
+from functools import partial
+from typing import IO, Any, Callable, Iterator, NamedTuple, Optional, Set, Union
+
+from altadb.common.constants import (
+    ARCHIVE_SPOOL_SIZE,
+    DOWNLOAD_CHUNK_SIZE,
+    SCAN_WORKERS,
+)
+from altadb.utils.files import (
+    has_file_type,
+    is_dicom_stream,
+    map_files,
+    needs_dicom_check,
+)
+from altadb.utils.logging import logger
+
+ZIP_EXTENSIONS = (".zip",)
+TAR_EXTENSIONS = (".tar",)
+COMPRESSED_TAR_EXTENSIONS = (".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS + TAR_EXTENSIONS + COMPRESSED_TAR_EXTENSIONS
+
+
+def is_archive(path: str) -> bool:
+    """Check if a path is a zip or (possibly compressed) tar archive."""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+class ArchiveMember(NamedTuple):
+    """File of an archive, opened (again) with open_content."""
+
+    path: str  # Archive path joined with the member name, for reporting
+    name: str
+    size: int
+    open_content: Callable[[], IO[bytes]]
+
+
+class _FileRange(io.RawIOBase):
+    """Read-only stream of a range of bytes of a file, e.g. a tar member."""
+
+    def __init__(self, path: str, offset: int, size: int) -> None:
+        """Construct _FileRange."""
+        super().__init__()
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._file.seek(offset)
+        self._left = size
+
+    def readable(self) -> bool:
+        """Return True, the range is readable."""
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        """Read the range into buffer, up to its end."""
+        count = self._file.readinto(memoryview(buffer)[: min(len(buffer), self._left)])
+        self._left -= count
+        return count
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+        super().close()
+
+
+def _open_range(path: str, offset: int, size: int) -> IO[bytes]:
+    return io.BufferedReader(_FileRange(path, offset, size))
+
+
+class _SpoolReader(io.RawIOBase):
+    """Read-only stream of a spooled file from its start, leaving it open."""
+
+    def __init__(self, spool: IO[bytes]) -> None:
+        """Construct _SpoolReader."""
+        super().__init__()
+        self._spool = spool
+        self._spool.seek(0)
+
+    def readable(self) -> bool:
+        """Return True, the spool is readable."""
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        """Read the spool into buffer."""
+        data = self._spool.read(len(buffer))
+        memoryview(buffer)[: len(data)] = data
+        return len(data)
+
+
+def _open_spool(spool: IO[bytes]) -> IO[bytes]:
+    return io.BufferedReader(_SpoolReader(spool))
+
+
+class ArchiveReader:
+    """Read the DICOM files of an archive, without extracting it.
+
+    Zip and uncompressed tar archives are read with random access: members
+    without extension are checked for a DICOM preamble on a pool of threads
+    (see UploadScanner), and every upload
+    streams its member from the archive. Compressed tar archives can only be
+    read in order, so each DICOM member is spooled (by the thread iterating
+    the members) and uploaded from there, at most a few batches ahead of
+    the uploads. Spools hold up to ARCHIVE_SPOOL_SIZE bytes in memory, and
+    larger members in temporary files, removed once they are uploaded.
+
+    :param path: Archive path.
+    :param file_types: Allowed file types (extensions) of the members.
+    :param workers: Number of threads checking members.
+    """
+
+    def __init__(
+        self, path: str, file_types: Set[str], workers: int = SCAN_WORKERS
+    ) -> None:
+        """Construct ArchiveReader."""
+        self.path = path
+        self.file_types = file_types
+        self.workers = max(1, workers)
+        self.not_dicom = 0
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+        self._archive: Optional[Union[zipfile.ZipFile, tarfile.TarFile]] = None
+
+    def __enter__(self) -> "ArchiveReader":
+        """Open the archive."""
+        lower_path = self.path.lower()
+        if lower_path.endswith(ZIP_EXTENSIONS):
+            self._archive = self._stack.enter_context(zipfile.ZipFile(self.path))
+        elif lower_path.endswith(TAR_EXTENSIONS):
+            self._archive = self._stack.enter_context(tarfile.open(self.path, "r:"))
+        else:
+            # Stream mode, compressed tar archives can't be read out of order
+            self._archive = self._stack.enter_context(tarfile.open(self.path, "r|*"))
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Close the archive."""
+        self._stack.close()
+        self._archive = None
+
+    @property
+    def skipped(self) -> int:
+        """Get the number of members that are skipped."""
+        return self.not_dicom
+
+    def log_skipped(self) -> None:
+        """Log the skipped members."""
+        if self.not_dicom:
+            logger.info(f"Skipped {self.not_dicom} files that are not DICOM")
+
+    def _check(self, member: ArchiveMember) -> Optional[ArchiveMember]:
+        if not needs_dicom_check(member.name):
+            return member
+        with member.open_content() as content:
+            if is_dicom_stream(content):
+                return member
+        with self._lock:
+            self.not_dicom += 1
+        return None
+
+    def _random_access_members(self) -> Iterator[ArchiveMember]:
+        if isinstance(self._archive, zipfile.ZipFile):
+            for info in self._archive.infolist():
+                if not info.is_dir() and has_file_type(info.filename, self.file_types):
+                    yield ArchiveMember(
+                        os.path.join(self.path, info.filename),
+                        info.filename,
+                        info.file_size,
+                        partial(self._archive.open, info),
+                    )
+        elif isinstance(self._archive, tarfile.TarFile):
+            for tar_info in self._archive:
+                if tar_info.isfile() and has_file_type(tar_info.name, self.file_types):
+                    yield ArchiveMember(
+                        os.path.join(self.path, tar_info.name),
+                        tar_info.name,
+                        tar_info.size,
+                        partial(
+                            _open_range, self.path, tar_info.offset_data, tar_info.size
+                        ),
+                    )
+
+    def _streamed_members(self) -> Iterator[ArchiveMember]:
+        assert isinstance(self._archive, tarfile.TarFile)
+        for tar_info in self._archive:
+            if not tar_info.isfile() or not has_file_type(
+                tar_info.name, self.file_types
+            ):
+                continue
+            source = self._archive.extractfile(tar_info)
+            if source is None:
+                continue
+            # Closed (and removed) once the member is no longer referenced
+            # pylint: disable-next=consider-using-with
+            spool: IO[bytes] = tempfile.SpooledTemporaryFile(  # type: ignore
+                max_size=ARCHIVE_SPOOL_SIZE
+            )
+            with source:
+                while chunk := source.read(DOWNLOAD_CHUNK_SIZE):
+                    spool.write(chunk)
+            spool.seek(0)
+            if needs_dicom_check(tar_info.name) and not is_dicom_stream(spool):
+                spool.close()
+                self.not_dicom += 1
+                continue
+            yield ArchiveMember(
+                os.path.join(self.path, tar_info.name),
+                tar_info.name,
+                tar_info.size,
+                partial(_open_spool, spool),
+            )
+
+    def members(self) -> Iterator[ArchiveMember]:
+        """Yield the DICOM members of the archive, in order."""
+        if self._archive is None:
+            raise ValueError(f"Archive {self.path} is not open")
+        if isinstance(self._archive, tarfile.TarFile) and self.path.lower().endswith(
+            COMPRESSED_TAR_EXTENSIONS
+        ):
+            yield from self._streamed_members()
+            return
+        for member in map_files(
+            self._check, self._random_access_members(), self.workers
+        ):
+            if member is not None:
+                yield member
@@ -1,11 +1,38 @@
 """Async utils."""
 
 import asyncio
-from typing import Any, Awaitable, Coroutine, List, Tuple, TypeVar, Optional, Iterable
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+    Optional,
+    Iterable,
+    Union,
+)
+import aiohttp
 import tqdm.asyncio  # type: ignore
 
-from altadb.common.constants import MAX_CONCURRENCY
+from altadb.common.constants import (
+    DOWNLOAD_CHUNK_SIZE,
+    MAX_CONCURRENCY,
+    MAX_CONCURRENCY_WINDOW,
+)
 from altadb.config import config
+from altadb.utils.logging import logger
 
 ReturnType = TypeVar("ReturnType")  # pylint: disable=invalid-name
 
@@ -15,24 +42,315 @@ async def return_value(value: ReturnType) -> ReturnType:
     return value
 
 
+def create_executor(kind: str, max_workers: Optional[int] = None) -> Executor:
+    """Create a process or thread pool executor for CPU bound work."""
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers)
+    return ThreadPoolExecutor(max_workers, thread_name_prefix="altadb")
+
+
+class ConcurrencyBudget:
+    """Request and bytes-in-flight budget shared by nested gathers.
+
+    The export nests series, instances and frames, each with its own
+    concurrency limit. Every level draws from a single budget instead:
+    HTTP requests hold one of `max_requests` slots while they run, and new
+    units of work (e.g. instances) are only admitted while the bytes they
+    are expected to hold fit under `max_bytes`. A unit reserves the mean
+    size of the units completed so far, and is accounted for its actual
+    size once it grows beyond it. An admitted unit can always complete,
+    and a unit is always admitted when nothing else is in flight, so the
+    budget never deadlocks. Waiters are served in FIFO order.
+
+    :param max_requests: Maximum number of HTTP requests in flight.
+    :param max_bytes: Maximum number of bytes in flight.
+    """
+
+    def __init__(self, max_requests: int, max_bytes: int) -> None:
+        """Construct ConcurrencyBudget."""
+        self.max_requests = max(1, max_requests)
+        self.max_bytes = max(1, max_bytes)
+        self.requests = 0
+        self.units = 0
+        self.bytes_in_flight = 0
+        self.unit_estimate = DOWNLOAD_CHUNK_SIZE
+        self._request_waiters: Deque["asyncio.Future[int]"] = deque()
+        self._unit_waiters: Deque["asyncio.Future[int]"] = deque()
+
+    def __repr__(self) -> str:
+        """Budget usage."""
+        return (
+            f"{self.__class__.__name__}(requests={self.requests}/{self.max_requests}, "
+            f"bytes={self.bytes_in_flight}/{self.max_bytes}, units={self.units})"
+        )
+
+    def _can_request(self) -> bool:
+        return self.requests < self.max_requests
+
+    def _can_admit(self) -> bool:
+        return (
+            not self.units
+            or self.bytes_in_flight + self.unit_estimate <= self.max_bytes
+        )
+
+    def _wake(self) -> None:
+        """Grant slots to the waiters, in order, while the budget allows."""
+        while self._request_waiters and self._can_request():
+            future = self._request_waiters.popleft()
+            if not future.done():
+                self.requests += 1
+                future.set_result(0)
+        while self._unit_waiters and self._can_admit():
+            future = self._unit_waiters.popleft()
+            if not future.done():
+                self.units += 1
+                self.bytes_in_flight += self.unit_estimate
+                future.set_result(self.unit_estimate)
+
+    async def _acquire(
+        self,
+        waiters: Deque["asyncio.Future[int]"],
+        available: Callable[[], bool],
+        release: Callable[[int], None],
+    ) -> Optional[int]:
+        """Wait for a slot, return None when it is available right away.
+
+        Otherwise the slot is granted by _wake, and its reservation returned.
+        """
+        if available() and not waiters:
+            return None
+        future: "asyncio.Future[int]" = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                release(future.result())  # Granted while being cancelled
+            elif future in waiters:
+                waiters.remove(future)
+            raise
+
+    def _release_request(self, _: int = 0) -> None:
+        self.requests -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of an HTTP request."""
+        if (
+            await self._acquire(
+                self._request_waiters, self._can_request, self._release_request
+            )
+            is None
+        ):
+            self.requests += 1
+        try:
+            yield
+        finally:
+            self._release_request()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Callable[[int], None]]:
+        """Admit a unit of work, yield a callback accounting its received bytes.
+
+        The bytes of the unit are released when it exits.
+        """
+
+        def release(reserved: int, held: int = 0) -> None:
+            self.units -= 1
+            self.bytes_in_flight -= max(held, reserved)
+            self._wake()
+
+        reserved = await self._acquire(self._unit_waiters, self._can_admit, release)
+        if reserved is None:
+            reserved = self.unit_estimate
+            self.units += 1
+            self.bytes_in_flight += reserved
+
+        held = 0
+
+        def add_bytes(size: int) -> None:
+            nonlocal held
+            self.bytes_in_flight += max(held + size, reserved) - max(held, reserved)
+            held += size
+
+        try:
+            yield add_bytes
+        finally:
+            release(reserved, held)
+            if held:
+                self.unit_estimate = max(
+                    DOWNLOAD_CHUNK_SIZE, (self.unit_estimate + held) // 2
+                )
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """Check if an error signals an overloaded server or link (429, 5xx, timeout)."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, asyncio.TimeoutError)
+
+
+class AdaptiveLimiter:
+    """Additive increase, multiplicative decrease (AIMD) concurrency limiter.
+
+    The window grows by one slot for every window's worth of tasks that
+    complete with a healthy latency (within `latency_tolerance` times the
+    best latency seen recently), and is multiplied by `backoff` when tasks
+    fail with a 429, a 5xx or a timeout, at most once per latency period
+    so a burst of failures only counts once. The current window is
+    exposed as `window`, for monitoring.
+
+    :param initial: Initial window.
+    :param maximum: Maximum window, at most MAX_CONCURRENCY_WINDOW.
+    :param minimum: Minimum window.
+    :param backoff: Factor the window is multiplied by on congestion.
+    :param latency_tolerance: Latency (relative to the best) considered healthy.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        """Construct AdaptiveLimiter."""
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, min(maximum, MAX_CONCURRENCY_WINDOW))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.base_latency: Optional[float] = None
+        self.congestion_events = 0
+        self._window = float(min(max(initial, self.minimum), self.maximum))
+        self._last_decrease = 0.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    def __repr__(self) -> str:
+        """Limiter state."""
+        return (
+            f"{self.__class__.__name__}(window={self.window}, "
+            f"in_flight={self.in_flight}, congestion_events={self.congestion_events})"
+        )
+
+    @property
+    def window(self) -> int:
+        """Get the current concurrency window."""
+        return int(self._window)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.window:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def on_success(self, latency: float) -> None:
+        """Widen the window after a task completed with a healthy latency."""
+        if self.base_latency is None or latency < self.base_latency:
+            self.base_latency = latency
+        else:
+            # Let the baseline follow slow changes of the link
+            self.base_latency += (latency - self.base_latency) * 0.01
+        if latency <= self.base_latency * self.latency_tolerance:
+            window = self.window
+            self._window = min(self.maximum, self._window + 1 / self._window)
+            if self.window > window:
+                logger.debug(f"Concurrency window widened to {self.window}")
+            self._wake()
+
+    def on_congestion(self) -> None:
+        """Shrink the window after a 429, a 5xx or a timeout."""
+        now = time.monotonic()
+        if now - self._last_decrease < (self.base_latency or 0):
+            return
+        self._last_decrease = now
+        self.congestion_events += 1
+        self._window = max(self.minimum, self._window * self.backoff)
+        logger.debug(f"Congestion, concurrency window reduced to {self.window}")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot of the window while running a task."""
+        if self.in_flight < self.window and not self._waiters:
+            self.in_flight += 1
+        else:
+            future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.in_flight -= 1
+                    self._wake()
+                elif future in self._waiters:
+                    self._waiters.remove(future)
+                raise
+
+        token = _current_limiter.set(self)
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as error:
+            if is_congestion_error(error):
+                self.on_congestion()
+            raise
+        else:
+            self.on_success(time.monotonic() - start)
+        finally:
+            _current_limiter.reset(token)
+            self.in_flight -= 1
+            self._wake()
+
+
+_current_limiter: ContextVar[Optional[AdaptiveLimiter]] = ContextVar(
+    "altadb_limiter", default=None
+)
+
+
+def signal_congestion(error: Optional[BaseException] = None) -> None:
+    """Report congestion to the limiter of the running gather task.
+
+    Meant for errors that are retried (and so never reach the gather),
+    when no error is given, congestion is reported unconditionally.
+    """
+    limiter = _current_limiter.get()
+    if limiter is not None and (error is None or is_congestion_error(error)):
+        limiter.on_congestion()
+
+
 async def gather_with_concurrency(
     max_concurrency: int,
     tasks: Iterable[Awaitable[ReturnType]],
     progress_bar_name: Optional[str] = None,
     keep_progress_bar: bool = True,
     return_exceptions: bool = False,
+    limiter: Optional[AdaptiveLimiter] = None,
 ) -> List[ReturnType]:
-    """Utilizes a Semaphore to limit concurrency to n."""
-    # pylint: disable=too-many-locals
+    """Run the tasks with an adaptive concurrency of up to max_concurrency.
+
+    The window starts at (at most) MAX_CONCURRENCY, widens while tasks
+    complete with a healthy latency, up to max_concurrency (at most
+    MAX_CONCURRENCY_WINDOW), and backs off on 429s, 5xx responses and
+    timeouts (see AdaptiveLimiter). Pass a limiter to share it across
+    calls, or to monitor its window.
+    """
+    # pylint: disable=too-many-locals,too-many-arguments
     if not tasks:
         return []
 
-    max_concurrency = max(1, min(max_concurrency, MAX_CONCURRENCY))
+    max_concurrency = max(1, max_concurrency)
+    if limiter is None and max_concurrency > 1:
+        limiter = AdaptiveLimiter(
+            min(max_concurrency, MAX_CONCURRENCY), max_concurrency
+        )
 
     if not config.log_info:
         keep_progress_bar = False
 
-    if max_concurrency == 1:
+    if limiter is None:
         output: List[ReturnType] = []
         progress = (
             tqdm.tqdm(tasks, desc=progress_bar_name, leave=keep_progress_bar)
@@ -49,17 +367,18 @@ async def gather_with_concurrency(
                     raise exc
         return output
 
-    semaphore = asyncio.Semaphore(max_concurrency)
-
     async def sem_task(task: Awaitable[ReturnType]) -> ReturnType:
-        async with semaphore:
+        async with limiter.slot():  # type: ignore
             return await task
 
     coros = [sem_task(task) for task in tasks]
     if not progress_bar_name:
-        return await asyncio.gather(  # type: ignore
-            *coros, return_exceptions=return_exceptions
-        )
+        try:
+            return await asyncio.gather(  # type: ignore
+                *coros, return_exceptions=return_exceptions
+            )
+        finally:
+            logger.debug(f"Gather done: {limiter!r}")
 
     async def ordered_coroutine(
         idx: int, task: Coroutine[Any, Any, ReturnType]
@@ -83,4 +402,137 @@ async def gather_with_concurrency(
 
         result.append((idx, value))
 
+    logger.debug(f"{progress_bar_name} done: {limiter!r}")
     return [res[1] for res in sorted(result, key=lambda x: x[0])]
+
+
+async def iter_with_concurrency(
+    max_concurrency: int,
+    factories: Union[
+        Iterable[Callable[[], Awaitable[ReturnType]]],
+        AsyncIterable[Callable[[], Awaitable[ReturnType]]],
+    ],
+    progress_bar_name: Optional[str] = None,
+    keep_progress_bar: bool = True,
+    return_exceptions: bool = False,
+    limiter: Optional[AdaptiveLimiter] = None,
+    ordered: bool = False,
+    reorder_buffer: Optional[int] = None,
+    total: Optional[int] = None,
+) -> AsyncIterator[ReturnType]:
+    """Stream the results of lazily created tasks, run by a pool of workers.
+
+    Unlike gather_with_concurrency, the tasks are created from `factories`
+    (an iterator or async iterator of callables returning awaitables) only
+    when a worker is free, so memory stays proportional to the concurrency
+    instead of the number of tasks. Concurrency adapts as in
+    gather_with_concurrency (see AdaptiveLimiter).
+
+    Results are yielded as they complete, or in the order of the factories
+    when `ordered`, in which case workers stay at most `reorder_buffer`
+    (default: twice max_concurrency) tasks ahead of the oldest pending one.
+    """
+    # pylint: disable=too-many-locals,too-many-arguments,too-many-statements
+    # aiter/anext builtins need Python 3.10
+    # pylint: disable=unnecessary-dunder-call
+    max_concurrency = max(1, max_concurrency)
+    if limiter is None:
+        limiter = AdaptiveLimiter(
+            min(max_concurrency, MAX_CONCURRENCY), max_concurrency
+        )
+    reorder_buffer = max(1, reorder_buffer or 2 * max_concurrency)
+
+    if isinstance(factories, AsyncIterable):
+        source: Union[
+            Iterator[Callable[[], Awaitable[ReturnType]]],
+            AsyncIterator[Callable[[], Awaitable[ReturnType]]],
+        ] = factories.__aiter__()
+    else:
+        source = iter(factories)
+
+    source_lock = asyncio.Lock()
+    reorder_space = asyncio.Condition()
+    results: "asyncio.Queue[Optional[Tuple[int, bool, Any]]]" = asyncio.Queue(
+        max_concurrency
+    )
+    next_index = 0
+    emitted = 0
+
+    async def next_factory() -> Optional[Tuple[int, Callable]]:
+        """Take the next factory from the source, None once exhausted."""
+        nonlocal next_index
+        async with source_lock:
+            if ordered:
+                async with reorder_space:
+                    await reorder_space.wait_for(
+                        lambda: next_index < emitted + reorder_buffer  # type: ignore
+                    )
+            try:
+                if isinstance(source, AsyncIterator):
+                    factory = await source.__anext__()
+                else:
+                    factory = next(source)
+            except (StopIteration, StopAsyncIteration):
+                return None
+            next_index += 1
+            return next_index - 1, factory
+
+    async def worker() -> None:
+        while (item := await next_factory()) is not None:
+            idx, factory = item
+            try:
+                async with limiter.slot():  # type: ignore
+                    value = await factory()
+            except Exception as exc:  # pylint: disable=broad-except
+                await results.put((idx, False, exc))
+            else:
+                await results.put((idx, True, value))
+
+    async def run_workers() -> None:
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Failure of the factories iterator itself
+            await results.put((-1, False, exc))
+        finally:
+            # Stop the other workers before the end of the results
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        await results.put(None)
+
+    progress = (
+        tqdm.tqdm(
+            desc=progress_bar_name,
+            total=total,
+            leave=keep_progress_bar and config.log_info,
+        )
+        if progress_bar_name
+        else None
+    )
+    pending: Dict[int, Any] = {}
+    runner = asyncio.create_task(run_workers())
+    try:
+        while (result := await results.get()) is not None:
+            idx, success, value = result
+            if not success and (idx < 0 or not return_exceptions):
+                raise value
+            if progress:
+                progress.update(1)
+            if not ordered:
+                yield value
+                continue
+            pending[idx] = value
+            while emitted in pending:
+                value = pending.pop(emitted)
+                emitted += 1
+                async with reorder_space:
+                    reorder_space.notify_all()
+                yield value
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        if progress:
+            progress.close()
+        logger.debug(f"{progress_bar_name or 'Tasks'} done: {limiter!r}")
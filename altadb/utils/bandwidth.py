@@ -0,0 +1,132 @@
+"""Process-wide bandwidth limits for uploads and downloads."""
+
+import asyncio
+import datetime
+import threading
+import time
+from collections import deque
+from typing import IO, Any, AsyncIterator, Callable, Deque, Optional, Tuple
+
+import aiohttp
+
+from altadb.common.constants import DOWNLOAD_CHUNK_SIZE
+from altadb.config import config
+from altadb.utils.common_utils import BandwidthSchedule, format_rate
+
+
+class TokenBucket:
+    """Token bucket limiting the rate of a transfer direction.
+
+    Chunks are admitted as they are read or written, and may borrow
+    tokens: a consumer that overdraws the bucket sleeps off its debt, so
+    concurrent transfers share the rate fairly. The rate is resolved on
+    every chunk, so changes (and scheduled rates) apply at runtime.
+
+    :param rate: Callable returning the rate in bytes/s, None for no limit.
+    :param schedule: Callable returning the bandwidth schedule.
+    :param burst: Seconds of rate that can be consumed in a burst.
+    """
+
+    def __init__(
+        self,
+        rate: Callable[[], Optional[int]],
+        schedule: Callable[[], BandwidthSchedule] = list,
+        burst: float = 1.0,
+    ) -> None:
+        """Construct TokenBucket."""
+        self._rate = rate
+        self._schedule = schedule
+        self.burst = burst
+        self.transferred = 0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._samples: Deque[Tuple[float, int]] = deque(maxlen=10)
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> Optional[int]:
+        """Get the rate in bytes/s currently in effect (None for no limit)."""
+        now = datetime.datetime.now().time()
+        for start, end, rate in self._schedule():
+            if start <= now < end or (end <= start and (now >= start or now < end)):
+                return rate
+        return self._rate()
+
+    def _take(self, size: int) -> float:
+        """Take size tokens, return the time to wait for the overdraft."""
+        rate = self.rate
+        with self._lock:
+            now = time.monotonic()
+            self.transferred += size
+            if not self._samples or now - self._samples[-1][0] >= 0.5:
+                self._samples.append((now, self.transferred))
+            if not rate:
+                self._tokens = 0.0
+                self._updated = now
+                return 0.0
+            self._tokens = min(
+                rate * self.burst, self._tokens + (now - self._updated) * rate
+            )
+            self._updated = now
+            self._tokens -= size
+            return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    async def consume(self, size: int) -> None:
+        """Wait until size bytes can be transferred."""
+        delay = self._take(size)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def throughput(self) -> float:
+        """Get the bytes per second transferred over the last few seconds."""
+        if not self._samples:
+            return 0.0
+        since, transferred = self._samples[0]
+        return (self.transferred - transferred) / max(time.monotonic() - since, 1e-6)
+
+    def describe(self) -> str:
+        """Describe the throughput and limit, for progress output."""
+        rate = self.rate
+        limit = format_rate(rate) if rate else "no limit"
+        return f"{format_rate(self.throughput())} ({limit})"
+
+
+async def throttled_chunks(
+    file_: IO[bytes],
+    bucket: TokenBucket,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    in_thread: bool = False,
+    digest: Optional[Any] = None,
+) -> AsyncIterator[bytes]:
+    """Yield the content of a file in chunks, at the rate allowed by the bucket.
+
+    With in_thread, chunks are read on a worker thread (e.g. decompressed).
+    The chunks are added to digest (a hashlib object), if any.
+    """
+    loop = asyncio.get_running_loop()
+    while chunk := (
+        await loop.run_in_executor(None, file_.read, chunk_size)
+        if in_thread
+        else file_.read(chunk_size)
+    ):
+        if digest is not None:
+            digest.update(chunk)
+        await bucket.consume(len(chunk))
+        yield chunk
+
+
+async def read_throttled(content: aiohttp.StreamReader, bucket: TokenBucket) -> bytes:
+    """Read a response body, at the rate allowed by the bucket."""
+    chunks = []
+    async for chunk in content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+        await bucket.consume(len(chunk))
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+download_bandwidth = TokenBucket(
+    lambda: config.download_bandwidth, lambda: config.bandwidth_schedule
+)
+upload_bandwidth = TokenBucket(
+    lambda: config.upload_bandwidth, lambda: config.bandwidth_schedule
+)
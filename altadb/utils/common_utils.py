@@ -1,9 +1,11 @@
 """Common utility functions."""
 
 import os
+import re
 import shutil
 import hashlib
-from typing import Union
+import datetime
+from typing import List, Optional, Tuple, Union
 
 
 def config_path() -> str:
@@ -32,3 +34,66 @@ def hash_sha256(message: Union[str, bytes]) -> str:
     sha256 = hashlib.sha256()
     sha256.update(message.encode() if isinstance(message, str) else message)
     return sha256.hexdigest()
+
+
+def hash_file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return SHA256 of the content of a file, read in chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file_:
+        while chunk := file_.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+BandwidthSchedule = List[Tuple[datetime.time, datetime.time, Optional[int]]]
+
+
+def parse_rate(rate: Optional[str]) -> Optional[int]:
+    """Parse a rate in bytes per second, e.g. `500K`, `10M`, `1.5G`.
+
+    Empty, `0` or `off` mean no limit (None).
+    """
+    if rate is None or not str(rate).strip() or str(rate).strip().lower() == "off":
+        return None
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMG]?)(?:i?B)?(?:/s)?\s*", str(rate), re.I)
+    if not match:
+        raise ValueError(f"Invalid bandwidth: {rate}")
+    value = int(float(match.group(1)) * UNITS[match.group(2).upper()])
+    return value or None
+
+
+def parse_schedule(schedule: Optional[str]) -> BandwidthSchedule:
+    """Parse a bandwidth schedule, e.g. `22:00-06:00=off;08:00-18:00=10M`.
+
+    Each entry applies a rate (or no limit) between two local times,
+    entries may wrap around midnight, the first matching entry wins.
+    """
+    entries: BandwidthSchedule = []
+    for entry in (schedule or "").split(";"):
+        if not entry.strip():
+            continue
+        period, _, rate = entry.partition("=")
+        start, _, end = period.partition("-")
+        entries.append(
+            (
+                datetime.time.fromisoformat(start.strip()),
+                datetime.time.fromisoformat(end.strip()),
+                parse_rate(rate),
+            )
+        )
+    return entries
+
+
+def format_size(size: float) -> str:
+    """Format a size in bytes."""
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit]:
+            return f"{size / UNITS[unit]:.1f}{unit}B"
+    return f"{size:.0f}B"
+
+
+def format_rate(rate: float) -> str:
+    """Format a rate in bytes per second."""
+    return f"{format_size(rate)}/s"
@@ -1,7 +1,52 @@
 """Utility functions for DICOM files."""
 
+import gzip
+import os
+import shutil
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
 import pydicom
+import pydicom.charset
 import pydicom.dataset
+import pydicom.errors
+import pydicom.filebase
+import pydicom.filewriter
+import pydicom.uid
+
+from altadb.common.constants import DOWNLOAD_CHUNK_SIZE, MAX_HEADER_TEMPLATES
+
+# Registers the AltaDB transfer syntaxes (e.g. HTJ2K) with pydicom
+import altadb.utils.transfer_syntax  # noqa: F401 pylint: disable=unused-import
+
+PIXEL_DATA_TAG = 0x7FE00010
+ITEM_TAG = b"\xfe\xff\x00\xe0"
+SEQUENCE_DELIMITER = b"\xfe\xff\xdd\xe0\x00\x00\x00\x00"
+UNDEFINED_LENGTH = 0xFFFFFFFF
+
+
+def read_sop_instance_uid(path: str) -> Optional[str]:
+    """Read the SOPInstanceUID of a (possibly gzipped) DICOM file from its header.
+
+    Returns None if the file is not a readable DICOM file.
+    """
+    try:
+        with open(path, "rb") as file_:
+            gzipped = file_.read(2) == b"\x1f\x8b"
+        with gzip.open(path, "rb") if gzipped else open(path, "rb") as file_:
+            dataset = pydicom.dcmread(
+                file_,
+                stop_before_pixels=True,
+                defer_size=1024,
+                specific_tags=["SOPInstanceUID"],
+            )
+    except (OSError, EOFError, ValueError, pydicom.errors.InvalidDicomError):
+        return None
+
+    uid = dataset.get("SOPInstanceUID")
+    return str(uid) if uid else None
 
 
 def move_group2_to_file_meta(dataset: pydicom.Dataset) -> pydicom.Dataset:
@@ -21,3 +66,293 @@ def move_group2_to_file_meta(dataset: pydicom.Dataset) -> pydicom.Dataset:
             del dataset[elem.tag]
 
     return dataset
+
+
+def dataset_encoding(transfer_syntax: pydicom.uid.UID) -> Tuple[bool, bool]:
+    """Return (is_implicit_VR, is_little_endian) used to encode the dataset body.
+
+    Unknown (e.g. HTJ2K) syntaxes are encapsulated, i.e. explicit VR little endian.
+    """
+    if transfer_syntax == pydicom.uid.ImplicitVRLittleEndian:
+        return True, True
+    if transfer_syntax == pydicom.uid.ExplicitVRBigEndian:
+        return False, False
+    return False, True
+
+
+def _frame_size(frame: BinaryIO) -> int:
+    """Return the size of a frame file object and rewind it."""
+    frame.seek(0, os.SEEK_END)
+    size = frame.tell()
+    frame.seek(0)
+    return size
+
+
+def _encode_dataset(
+    dataset: pydicom.Dataset, is_implicit_vr: bool, is_little_endian: bool
+) -> Tuple[bytes, bytes]:
+    """Encode the elements preceding and following PixelData."""
+    encoding = dataset.get("SpecificCharacterSet", pydicom.charset.default_encoding)
+    encoded: List[bytes] = []
+    for part in (dataset[:PIXEL_DATA_TAG], dataset[PIXEL_DATA_TAG + 1 :]):  # type: ignore
+        fp_ = pydicom.filebase.DicomBytesIO()
+        fp_.is_implicit_VR = is_implicit_vr
+        fp_.is_little_endian = is_little_endian
+        pydicom.filewriter.write_dataset(fp_, part, encoding)
+        encoded.append(fp_.getvalue())
+    return encoded[0], encoded[1]
+
+
+def _write_encapsulated_file(
+    destination_file: str,
+    file_meta: pydicom.dataset.FileMetaDataset,
+    header: bytes,
+    trailer: bytes,
+    frames: List[BinaryIO],
+    is_implicit_vr: bool,
+) -> int:
+    """Write the encoded header, the encapsulated frames and the trailer."""
+    sizes = [_frame_size(frame) for frame in frames]
+    offsets: List[int] = []
+    position = 0
+    for size in sizes:
+        offsets.append(position)
+        position += 8 + size + (size % 2)
+
+    partial_file = destination_file + ".part"
+    with open(partial_file, "wb") as raw_fp:
+        fp_ = pydicom.filebase.DicomFileLike(raw_fp)
+        fp_.write(b"\x00" * 128 + b"DICM")
+        pydicom.filewriter.write_file_meta_info(fp_, file_meta, enforce_standard=True)
+        fp_.write(header)
+
+        # Encapsulated PixelData with a basic offset table
+        if is_implicit_vr:
+            fp_.write(struct.pack("<HHL", 0x7FE0, 0x0010, UNDEFINED_LENGTH))
+        else:
+            fp_.write(
+                struct.pack("<HH2sHL", 0x7FE0, 0x0010, b"OB", 0, UNDEFINED_LENGTH)
+            )
+        fp_.write(ITEM_TAG + struct.pack("<L", 4 * len(offsets)))
+        fp_.write(struct.pack(f"<{len(offsets)}L", *offsets))
+        for frame, size in zip(frames, sizes):
+            fp_.write(ITEM_TAG + struct.pack("<L", size + (size % 2)))
+            shutil.copyfileobj(frame, raw_fp, DOWNLOAD_CHUNK_SIZE)
+            if size % 2:
+                fp_.write(b"\x00")
+        fp_.write(SEQUENCE_DELIMITER)
+
+        fp_.write(trailer)
+        total = raw_fp.tell()
+
+    os.replace(partial_file, destination_file)
+    return total
+
+
+def write_encapsulated_dicom(
+    destination_file: str,
+    dataset: pydicom.Dataset,
+    frames: List[BinaryIO],
+) -> int:
+    """Write a DICOM file, streaming the encapsulated frames from file objects.
+
+    The preamble, file meta and the dataset elements preceding PixelData are
+    written first, each frame is then copied as an encapsulated item in chunks
+    of DOWNLOAD_CHUNK_SIZE, so the frames never need to be held in memory.
+    The file is written to a `.part` file and renamed once complete.
+
+    Args
+    ----
+    destination_file: str
+        Destination file to save the DICOM dataset.
+    dataset: pydicom.Dataset
+        Dataset (with file_meta) to write, any PixelData in it is ignored.
+    frames: List[BinaryIO]
+        Readable and seekable file objects holding the compressed frames.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+    """
+    file_meta = dataset.file_meta
+    if "MediaStorageSOPClassUID" not in file_meta and "SOPClassUID" in dataset:
+        file_meta.MediaStorageSOPClassUID = dataset.SOPClassUID
+    if "MediaStorageSOPInstanceUID" not in file_meta and "SOPInstanceUID" in dataset:
+        file_meta.MediaStorageSOPInstanceUID = dataset.SOPInstanceUID
+    is_implicit_vr, is_little_endian = dataset_encoding(file_meta.TransferSyntaxUID)
+    header, trailer = _encode_dataset(dataset, is_implicit_vr, is_little_endian)
+    return _write_encapsulated_file(
+        destination_file, file_meta, header, trailer, frames, is_implicit_vr
+    )
+
+
+class SeriesHeaderTemplate:
+    """Encoded header elements shared by the instances of a series.
+
+    Most of the metadata (patient, study, series, equipment modules) is
+    identical for every instance of a series. Every element of the first
+    instance is encoded once, following instances reuse the encoded bytes of
+    the elements whose JSON value is unchanged, and only encode the rest.
+
+    :param transfer_syntax: Transfer syntax UID of the series.
+    """
+
+    def __init__(self, transfer_syntax: str) -> None:
+        """Construct SeriesHeaderTemplate."""
+        self.is_implicit_vr, self.is_little_endian = dataset_encoding(
+            pydicom.uid.UID(transfer_syntax)
+        )
+        self.elements: Dict[str, Tuple[Dict, bytes]] = {}
+        self.character_set: Optional[Dict] = None
+        self.lock = threading.Lock()
+
+    def _encode_element(self, tag: str, value: Dict, encodings: Any) -> bytes:
+        """Encode a single element from its DICOM JSON value."""
+        fp_ = pydicom.filebase.DicomBytesIO()
+        fp_.is_implicit_VR = self.is_implicit_vr
+        fp_.is_little_endian = self.is_little_endian
+        element = pydicom.Dataset.from_json({tag: value})[int(tag, 16)]
+        pydicom.filewriter.write_data_element(fp_, element, encodings)
+        return fp_.getvalue()
+
+    def encode(self, instance_metadata: Dict) -> Tuple[bytes, bytes]:
+        """Encode the elements preceding and following PixelData of an instance."""
+        character_set = instance_metadata.get("00080005")
+        encodings = (
+            pydicom.Dataset.from_json({"00080005": character_set}).SpecificCharacterSet
+            if character_set
+            else pydicom.charset.default_encoding
+        )
+        with self.lock:
+            if not self.elements:
+                self.character_set = character_set
+            reusable = self.character_set == character_set
+            first = not self.elements
+
+        header: List[bytes] = []
+        trailer: List[bytes] = []
+        for tag_int, tag in sorted(
+            (int(tag, 16), tag) for tag in instance_metadata if tag[:4] != "0002"
+        ):
+            # Do not write retired Group Length (see PS3.5, 7.2)
+            if tag_int == PIXEL_DATA_TAG or (
+                tag_int & 0xFFFF == 0 and tag_int >> 16 > 6
+            ):
+                continue
+            value = instance_metadata[tag]
+            cached = self.elements.get(tag) if reusable else None
+            if cached and cached[0] == value:
+                encoded = cached[1]
+            else:
+                encoded = self._encode_element(tag, value, encodings)
+                if first:
+                    self.elements[tag] = (value, encoded)
+            (header if tag_int < PIXEL_DATA_TAG else trailer).append(encoded)
+
+        return b"".join(header), b"".join(trailer)
+
+
+_HEADER_TEMPLATES: "OrderedDict[Tuple[str, str], SeriesHeaderTemplate]" = OrderedDict()
+_HEADER_TEMPLATES_LOCK = threading.Lock()
+
+
+def get_header_template(series_key: str, transfer_syntax: str) -> SeriesHeaderTemplate:
+    """Get the (least recently used cached) header template of a series."""
+    key = (series_key, transfer_syntax)
+    with _HEADER_TEMPLATES_LOCK:
+        template = _HEADER_TEMPLATES.get(key)
+        if template is None:
+            template = _HEADER_TEMPLATES[key] = SeriesHeaderTemplate(transfer_syntax)
+            while len(_HEADER_TEMPLATES) > MAX_HEADER_TEMPLATES:
+                _HEADER_TEMPLATES.popitem(last=False)
+        else:
+            _HEADER_TEMPLATES.move_to_end(key)
+        return template
+
+
+def _file_meta_from_json(
+    instance_metadata: Dict, transfer_syntax: str
+) -> pydicom.dataset.FileMetaDataset:
+    """Build the file meta of an instance from its group 2 JSON elements."""
+    file_meta = pydicom.dataset.FileMetaDataset(
+        pydicom.Dataset.from_json(
+            {
+                tag: value
+                for tag, value in instance_metadata.items()
+                if tag[:4] == "0002"
+            }
+        )
+    )
+    file_meta.TransferSyntaxUID = pydicom.uid.UID(transfer_syntax)
+    for meta_keyword, tag in (
+        ("MediaStorageSOPClassUID", "00080016"),
+        ("MediaStorageSOPInstanceUID", "00080018"),
+    ):
+        if meta_keyword not in file_meta and instance_metadata.get(tag, {}).get(
+            "Value"
+        ):
+            setattr(file_meta, meta_keyword, instance_metadata[tag]["Value"][0])
+    return file_meta
+
+
+def assemble_dicom_file(
+    instance_metadata: Dict,
+    transfer_syntax: str,
+    frames: List[Union[str, BinaryIO]],
+    destination_file: str,
+    series_key: Optional[str] = None,
+) -> int:
+    """Build a DICOM file from its JSON metadata and write it with its frames.
+
+    This is CPU bound, and meant to run in an executor. The arguments are
+    picklable when the frames are paths, so it can run in a process pool.
+
+    Args
+    ----
+    instance_metadata: Dict
+        DICOM JSON metadata of the instance.
+    transfer_syntax: str
+        Transfer syntax UID of the frames.
+    frames: List[Union[str, BinaryIO]]
+        Paths or file objects of the compressed frames.
+    destination_file: str
+        Destination file to save the DICOM dataset.
+    series_key: Optional[str]
+        Key identifying the series of the instance (e.g. its folder).
+        When provided, the encoded header elements shared by the instances
+        of the series are reused (see SeriesHeaderTemplate).
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+    """
+    frame_files: List[BinaryIO] = []
+    opened: List[BinaryIO] = []
+    try:
+        for frame in frames:
+            if isinstance(frame, str):
+                frame = open(frame, "rb")  # pylint: disable=consider-using-with
+                opened.append(frame)
+            frame_files.append(frame)
+
+        if series_key is None:
+            ds_file = pydicom.Dataset.from_json(instance_metadata)
+            ds_file.TransferSyntaxUID = pydicom.uid.UID(transfer_syntax)
+            move_group2_to_file_meta(ds_file)
+            return write_encapsulated_dicom(destination_file, ds_file, frame_files)
+
+        template = get_header_template(series_key, transfer_syntax)
+        header, trailer = template.encode(instance_metadata)
+        return _write_encapsulated_file(
+            destination_file,
+            _file_meta_from_json(instance_metadata, transfer_syntax),
+            header,
+            trailer,
+            frame_files,
+            template.is_implicit_vr,
+        )
+    finally:
+        for frame_file in opened:
+            frame_file.close()
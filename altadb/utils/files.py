@@ -2,34 +2,73 @@
 
 import os
 import gzip
-from typing import Any, Callable, Dict, List, Optional, Tuple, Set
+import hashlib
+import tempfile
+import zlib
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Set,
+    TypeVar,
+)
 
 import asyncio
 import aiohttp
 
-import pydicom
-import pydicom.dataset
-import pydicom.encaps
-import pydicom.tag
-import pydicom.uid
-
 from yarl import URL
-from tenacity import Retrying, RetryError
-from tenacity.retry import retry_if_not_exception_type
+from tenacity import AsyncRetrying, RetryCallState, Retrying, RetryError
+from tenacity.retry import retry_if_exception, retry_if_not_exception_type
 from tenacity.stop import stop_after_attempt
 from tenacity.wait import wait_random_exponential
 from natsort import natsorted, ns
 
 from altadb.common.constants import (
     DEFAULT_URL,
+    DICOM_PREAMBLE_SIZE,
+    DOWNLOAD_CHUNK_SIZE,
+    EXPORT_FRAME_SPOOL_SIZE,
     MAX_CONCURRENCY,
     MAX_FILE_BATCH_SIZE,
     MAX_FILE_UPLOADS,
     MAX_RETRY_ATTEMPTS,
+    REQUEST_TIMEOUT,
+    SCAN_WORKERS,
+    UPLOAD_SPOOL_SIZE,
+)
+from altadb.utils.async_utils import (
+    ConcurrencyBudget,
+    gather_with_concurrency,
+    iter_with_concurrency,
+    signal_congestion,
+)
+from altadb.utils.bandwidth import (
+    download_bandwidth,
+    read_throttled,
+    throttled_chunks,
+    upload_bandwidth,
 )
-from altadb.utils.async_utils import gather_with_concurrency
-from altadb.utils.dicom_utils import move_group2_to_file_meta
+from altadb.utils.dicom_utils import assemble_dicom_file
 from altadb.utils.logging import log_error, logger
+from altadb.utils.session import create_session
 from altadb.config import config
 
 
@@ -72,6 +111,14 @@ FILE_TYPES = {
 ALL_FILE_TYPES = {"*": "*/*"}
 
 
+def file_extension(file_path: str) -> str:
+    """Return the lowercase extension of a file (of the uncompressed file for .gz)."""
+    file_path, file_ext = os.path.splitext(file_path.lower())
+    if file_ext == ".gz":
+        file_path, file_ext = os.path.splitext(file_path)
+    return file_ext.lstrip(".")
+
+
 def get_file_type(file_path: str) -> Tuple[str, str]:
     """
     Return file type.
@@ -82,10 +129,7 @@ def get_file_type(file_path: str) -> Tuple[str, str]:
         file_ext: png, jpeg, jpg etc.
         file_type: this is the MIME file type e.g. image/png
     """
-    file_path, file_ext = os.path.splitext(file_path.lower())
-    if file_ext == ".gz":
-        file_path, file_ext = os.path.splitext(file_path)
-    file_ext = file_ext.lstrip(".")
+    file_ext = file_extension(file_path)
 
     if file_ext not in FILE_TYPES:
         raise ValueError(
@@ -94,40 +138,102 @@ def get_file_type(file_path: str) -> Tuple[str, str]:
     return file_ext, FILE_TYPES[file_ext]
 
 
-def find_files_recursive(
-    root: str, file_types: Set[str], multiple: bool = False
-) -> List[List[str]]:
-    """Find files recursively in a directory, that belong to a list of allowed file types."""
-    if not os.path.isdir(root):
-        return []
+def is_dicomdir(file_path: str) -> bool:
+    """Check if a file is a DICOMDIR (the index of a DICOM media, not an instance)."""
+    return os.path.basename(file_path).upper() == "DICOMDIR"
+
 
-    items = []
+def has_file_type(item: str, file_types: Set[str]) -> bool:
+    """Check if a file name belongs to a list of allowed file types (or .gz of them).
+
+    Files without extension have the "" file type, e.g. DICOM files named by UID,
+    except DICOMDIR files.
+    """
+    if "*" in file_types:
+        return True
+    return file_extension(item) in file_types and not is_dicomdir(item)
+
+
+def needs_dicom_check(file_path: str) -> bool:
+    """Check if a file must be checked to be DICOM, i.e. it has no extension.
+
+    Files with a DICOM extension are uploaded as such, even without a preamble.
+    """
+    return not file_extension(file_path)
+
+
+MapItem = TypeVar("MapItem")
+MapResult = TypeVar("MapResult")
+
+_ENTRY_DIR, _ENTRY_FILE, _ENTRY_OTHER = range(3)
+
+DirListing = List[Tuple[str, str, int]]
+
+
+def _scan_dir(path: str) -> DirListing:
+    """List a directory, with the type of every (non-hidden) entry.
+
+    The types come from the directory listing itself where the filesystem
+    provides them, otherwise the stat calls happen here, in the scan worker.
+    """
+    listing: DirListing = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                kind = _ENTRY_DIR
+            elif entry.is_file():
+                kind = _ENTRY_FILE
+            else:
+                kind = _ENTRY_OTHER
+            listing.append((entry.name, entry.path, kind))
+    return listing
+
+
+def _scan_dir_now(path: str) -> "Future[DirListing]":
+    """List a directory in the calling thread."""
+    future: "Future[DirListing]" = Future()
+    try:
+        future.set_result(_scan_dir(path))
+    except Exception as error:  # pylint: disable=broad-except
+        future.set_exception(error)
+    return future
+
+
+def _walk_dir(
+    listing: "Future[DirListing]",
+    file_types: Set[str],
+    multiple: bool,
+    submit: Callable[[str], "Future[DirListing]"],
+    prefetch: int,
+) -> Iterator[List[str]]:
+    """Walk a listed directory, scanning the next few subdirectories ahead."""
+    # pylint: disable=too-many-locals
+    entries = listing.result()
+    subdirs = iter([path for _, path, kind in entries if kind == _ENTRY_DIR])
+    scanned: Deque["Future[DirListing]"] = deque()
+
+    def scan_ahead() -> None:
+        while len(scanned) < prefetch and (path := next(subdirs, None)) is not None:
+            scanned.append(submit(path))
+
+    scan_ahead()
     list_items = []
     discard_list_items = False
 
-    for item in os.listdir(root):
-        if item.startswith("."):
-            continue
-        path = os.path.join(root, item)
-        if os.path.isdir(path):
-            items.extend(find_files_recursive(path, file_types, multiple))
+    for name, path, kind in entries:
+        if kind == _ENTRY_DIR:
+            subdir = scanned.popleft()
+            scan_ahead()
+            yield from _walk_dir(subdir, file_types, multiple, submit, prefetch)
             discard_list_items = True
-        elif os.path.isfile(path) and (  # pylint: disable=too-many-boolean-expressions
-            "*" in file_types
-            or (
-                item.rsplit(".", 1)[-1].lower() in file_types
-                or (
-                    "." in item
-                    and item.rsplit(".", 1)[-1].lower() == "gz"
-                    and item.rsplit(".", 2)[-2].lower() in file_types
-                )
-            )
-        ):
+        elif kind == _ENTRY_FILE and has_file_type(name, file_types):
             if multiple:
                 if not discard_list_items:
                     list_items.append(path)
             else:
-                items.append([path])
+                yield [path]
         else:
             discard_list_items = True
 
@@ -135,9 +241,59 @@ def find_files_recursive(
         not discard_list_items
         and len({item.rsplit(".", 1)[-1].lower() for item in list_items}) == 1
     ):
-        items.append(list(natsorted(list_items, alg=ns.IGNORECASE)))  # type: ignore
+        yield list(natsorted(list_items, alg=ns.IGNORECASE))  # type: ignore
 
-    return items
+
+def walk_files(
+    root: str, file_types: Set[str], multiple: bool = False, workers: int = SCAN_WORKERS
+) -> Iterator[List[str]]:
+    """Yield the files of a directory tree as they are found, in find_files_recursive order.
+
+    Directories are listed with os.scandir by a pool of `workers` threads,
+    a few subdirectories ahead of the walk, which hides the latency of
+    network filesystems. Use `workers=1` to scan in the calling thread.
+
+    Args
+    ------------
+    root: str
+        Directory to walk.
+    file_types: Set[str]
+        Allowed file types (extensions), "*" for any.
+    multiple: bool = False
+        Group the files of leaf directories holding a single file type.
+    workers: int = SCAN_WORKERS
+        Number of threads scanning directories.
+    """
+    if not os.path.isdir(root):
+        return
+
+    with ExitStack() as stack:
+        submit: Callable[[str], "Future[DirListing]"] = _scan_dir_now
+        if workers > 1:
+            pool = stack.enter_context(
+                ThreadPoolExecutor(workers, thread_name_prefix="altadb-scan")
+            )
+            submit = partial(pool.submit, _scan_dir)
+        yield from _walk_dir(submit(root), file_types, multiple, submit, 2 * workers)
+
+
+def iter_files_recursive(
+    root: str, file_types: Set[str], workers: int = SCAN_WORKERS
+) -> Iterator[str]:
+    """Yield files recursively as they are found, in find_files_recursive order.
+
+    Unlike find_files_recursive, files are not grouped, and consumers can
+    start processing them before the whole tree has been walked.
+    """
+    for files in walk_files(root, file_types, workers=workers):
+        yield from files
+
+
+def find_files_recursive(
+    root: str, file_types: Set[str], multiple: bool = False, workers: int = SCAN_WORKERS
+) -> List[List[str]]:
+    """Find files recursively in a directory, that belong to a list of allowed file types."""
+    return list(walk_files(root, file_types, multiple, workers))
 
 
 def uniquify_path(path: str) -> str:
@@ -161,81 +317,227 @@ def is_gzipped_data(data: bytes) -> bool:
     return data[:2] == b"\x1f\x8b"
 
 
-def is_dicom_file(file_name: str) -> bool:
-    """Check if data is dicom."""
-    with open(file_name, "rb") as fp_:
-        data = fp_.read()
+def gzip_file(
+    open_content: Callable[[], IO[bytes]],
+    destination: BinaryIO,
+    digest: Optional[Any] = None,
+) -> None:
+    """Write the gzip compressed content of a file to destination, in chunks.
 
+    The (uncompressed) content is added to digest (a hashlib object), if any.
+    """
+    with open_content() as source, gzip.GzipFile(
+        fileobj=destination, mode="wb"
+    ) as compressed:
+        while chunk := source.read(DOWNLOAD_CHUNK_SIZE):
+            if digest is not None:
+                digest.update(chunk)
+            compressed.write(chunk)
+
+
+def is_dicom_stream(stream: IO[bytes]) -> bool:
+    """Check if a (possibly gzipped) stream is DICOM, from its preamble.
+
+    Only the 132 bytes of the preamble are read (decompressed from the
+    start of the stream for gzipped content), the stream does not need
+    to be seekable, e.g. an archive member.
+    """
+    data = stream.read(DICOM_PREAMBLE_SIZE)
     if is_gzipped_data(data):
-        data = gzip.decompress(data)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        compressed, data = data, b""
+        try:
+            while compressed and len(data) < DICOM_PREAMBLE_SIZE:
+                data += decompressor.decompress(
+                    compressed, DICOM_PREAMBLE_SIZE - len(data)
+                )
+                if decompressor.eof:
+                    break
+                compressed = decompressor.unconsumed_tail or stream.read(
+                    DOWNLOAD_CHUNK_SIZE
+                )
+        except zlib.error:
+            return False
 
     return data[128:132] == b"\x44\x49\x43\x4d"
 
 
-async def upload_files(
-    files: List[Tuple[str, str, str]],
-    progress_bar_name: Optional[str] = "Uploading files",
-    keep_progress_bar: bool = True,
-    upload_callback: Optional[Callable] = None,
-) -> List[bool]:
-    """Upload files from local path to url (file path, presigned url, file type)."""
+def is_dicom_file(file_name: str) -> bool:
+    """Check if a (possibly gzipped) file is DICOM, from its preamble."""
+    with open(file_name, "rb") as fp_:
+        return is_dicom_stream(fp_)
 
-    async def _upload_file(
-        session: aiohttp.ClientSession, path: str, url: str, file_type: str
-    ) -> bool:
-        if not path or not url or not file_type:
-            return False
 
-        with open(path, mode="rb") as file_:
-            data = file_.read()
+def map_files(
+    func: Callable[[MapItem], MapResult],
+    files: Iterable[MapItem],
+    workers: int = SCAN_WORKERS,
+) -> Iterator[MapResult]:
+    """Apply func to files in a pool of threads, a few files ahead, in order.
 
-        status: int = 0
+    Used to classify/hash files while they are being scanned.
+    """
+    files = iter(files)
+    with ThreadPoolExecutor(workers, thread_name_prefix="altadb-scan") as pool:
+        results: Deque["Future[MapResult]"] = deque()
+        while True:
+            while len(results) < 2 * workers and (path := next(files, None)):
+                results.append(pool.submit(func, path))
+            if not results:
+                break
+            yield results.popleft().result()
+
+
+async def upload_file(
+    session: aiohttp.ClientSession,
+    path: str,
+    url: str,
+    file_type: str,
+    upload_callback: Optional[Callable] = None,
+    on_digest: Optional[Callable[[str], None]] = None,
+) -> bool:
+    """Upload a file from local path to a presigned url, streaming it from disk.
+
+    on_digest is called with the SHA-256 of the file, computed while it is
+    uploaded, once the upload succeeds.
+    """
+    if not path or not url or not file_type:
+        return False
+    return await upload_content(
+        session,
+        path,
+        lambda: open(path, mode="rb"),  # pylint: disable=consider-using-with
+        os.path.getsize(path),
+        url,
+        file_type,
+        upload_callback,
+        on_digest=on_digest,
+    )
+
+
+async def upload_content(
+    session: aiohttp.ClientSession,
+    name: str,
+    open_content: Callable[[], IO[bytes]],
+    size: int,
+    url: str,
+    file_type: str,
+    upload_callback: Optional[Callable] = None,
+    read_in_thread: bool = False,
+    on_digest: Optional[Callable[[str], None]] = None,
+) -> bool:
+    """Upload content to a presigned url, streaming it from open_content().
+
+    The content is opened again for every attempt, e.g. an archive member
+    (read_in_thread: decompressed on a worker thread, not the event loop).
+    on_digest is called with the SHA-256 of the content, once uploaded.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    status: int = 0
+    response_error: Optional[aiohttp.ClientResponseError] = None
+
+    headers = {"Content-Type": file_type}
+    # No total timeout, a throttled upload of a large file can take a while
+    timeout = aiohttp.ClientTimeout(
+        total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT
+    )
+    with open_content() as file_:
+        compress = (
+            not is_gzipped_data(file_.read(2)) and file_type != DICOM_FILE_TYPES[""]
+        )
 
-        headers = {"Content-Type": file_type}
-        if not is_gzipped_data(data) and file_type != DICOM_FILE_TYPES[""]:
+    digest = hashlib.sha256() if on_digest else None
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE) as compressed:
+        if compress:
+            # Compressed once up front, so that Content-Length is known
             headers["Content-Encoding"] = "gzip"
-            data = gzip.compress(data)
+            await asyncio.get_running_loop().run_in_executor(
+                None, gzip_file, open_content, compressed, digest
+            )
+        headers["Content-Length"] = str(compressed.tell() if compress else size)
 
         try:
-            for attempt in Retrying(
+            async for attempt in AsyncRetrying(
                 reraise=True,
                 stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
                 wait=wait_random_exponential(min=5, max=30),
                 retry=retry_if_not_exception_type(KeyboardInterrupt),
+                before_sleep=signal_retry_congestion,
             ):
-                with attempt:
+                with attempt, ExitStack() as stack:
+                    # Every attempt streams the content from the start
+                    compressed.seek(0)
+                    source: IO[bytes] = compressed  # type: ignore
+                    if not compress:
+                        source = stack.enter_context(open_content())
+                        digest = hashlib.sha256() if on_digest else None
                     request_params: Dict[str, Any] = {
                         "headers": headers,
-                        "data": data,
+                        "timeout": timeout,
+                        "data": throttled_chunks(
+                            source,
+                            upload_bandwidth,
+                            in_thread=read_in_thread and not compress,
+                            digest=None if compress else digest,
+                        ),
                     }
                     if not config.verify_ssl:
                         request_params["ssl"] = False
                     async with session.put(url, **request_params) as response:
                         status = response.status
+                        if status >= 500 or status == 429:
+                            response.raise_for_status()  # Retry
+        except aiohttp.ClientResponseError as error:
+            # Reported below, from the status of the last attempt, but a
+            # 429 or 5xx is congestion for the limiter of the running gather
+            signal_congestion(error)
+            response_error = error
         except RetryError as error:
             raise Exception("Unknown problem occurred") from error
 
-        if status == 200:
-            if upload_callback:
-                upload_callback()
-            return True
-        raise ConnectionError(f"Error in uploading {path} to AltaDB")
+    if status == 200:
+        if on_digest and digest is not None:
+            on_digest(digest.hexdigest())
+        if upload_callback:
+            upload_callback()
+        return True
+    raise ConnectionError(f"Error in uploading {name} to AltaDB") from response_error
 
-    conn = aiohttp.TCPConnector()
-    async with aiohttp.ClientSession(connector=conn) as session:
-        coros = [
-            _upload_file(session, path, url, file_type)
-            for path, url, file_type in files
-        ]
-        uploaded = await gather_with_concurrency(
-            MAX_FILE_UPLOADS,
-            coros,
-            progress_bar_name,
-            keep_progress_bar,
-        )
 
-    await asyncio.sleep(0.250)  # give time to close ssl connections
-    return uploaded
+async def upload_files(
+    files: List[Tuple[str, str, str]],
+    progress_bar_name: Optional[str] = "Uploading files",
+    keep_progress_bar: bool = True,
+    upload_callback: Optional[Callable] = None,
+    aiosession: Optional[aiohttp.ClientSession] = None,
+) -> List[bool]:
+    """Upload files from local path to url (file path, presigned url, file type).
+
+    Pass a shared aiosession to reuse connections across calls,
+    otherwise a new session is created (and closed) for this call.
+    """
+    if aiosession is None:
+        async with create_session(limit_per_host=MAX_FILE_UPLOADS) as own_session:
+            uploaded = await upload_files(
+                files,
+                progress_bar_name,
+                keep_progress_bar,
+                upload_callback,
+                own_session,
+            )
+        await asyncio.sleep(0.250)  # give time to close ssl connections
+        return uploaded
+
+    coros = [
+        upload_file(aiosession, path, url, file_type, upload_callback)
+        for path, url, file_type in files
+    ]
+    return await gather_with_concurrency(
+        MAX_FILE_UPLOADS,
+        coros,
+        progress_bar_name,
+        keep_progress_bar,
+    )
 
 
 async def download_files(
@@ -277,7 +579,9 @@ async def download_files(
                     ) as response:
                         if response.status == 200:
                             headers = dict(response.headers)
-                            data = await response.read()
+                            data = await read_throttled(
+                                response.content, download_bandwidth
+                            )
         except RetryError as error:
             log_error(error)
             raise Exception("Unknown problem occurred") from error
@@ -329,11 +633,122 @@ async def download_files(
     return [(path if isinstance(path, str) else None) for path in paths]
 
 
+def is_retryable_download_error(error: BaseException) -> bool:
+    """Check if a failed download is worth retrying."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status in (408, 429)
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def signal_retry_congestion(retry_state: RetryCallState) -> None:
+    """Report the error of a failed attempt to the running gather's limiter."""
+    if retry_state.outcome is not None:
+        signal_congestion(retry_state.outcome.exception())
+
+
+async def download_to_file(
+    session: aiohttp.ClientSession,
+    url: str,
+    file_: BinaryIO,
+    budget: Optional[ConcurrencyBudget] = None,
+    add_bytes: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Stream the content at url into file_, retrying failed attempts.
+
+    The response status is checked and the received size is validated
+    against Content-Length. When a transfer breaks, the next attempt
+    only requests the missing bytes (HTTP Range), and starts over if
+    the server does not honour the range.
+
+    Args
+    ------------
+    session: aiohttp.ClientSession
+        aiohttp ClientSession to be used for the HTTP requests.
+    url: str
+        URL (e.g. presigned) of the content.
+    file_: BinaryIO
+        Writable (and seekable) file object the content is written to.
+    budget: Optional[ConcurrencyBudget]
+        Budget the request slots are drawn from.
+    add_bytes: Optional[Callable[[int], None]]
+        Called with the number of bytes received (negative when discarded).
+
+    Returns
+    ------------
+    int
+        Number of bytes written.
+    """
+    # pylint: disable=too-many-locals
+    budget = budget or ConcurrencyBudget(1, 1)
+    add_bytes = add_bytes or (lambda size: None)
+    start = file_.tell()
+    resumable = True
+
+    def discard(position: int) -> None:
+        """Drop the content received after position."""
+        add_bytes(position - file_.seek(0, os.SEEK_END))  # type: ignore
+        file_.seek(position)
+        file_.truncate()
+
+    timeout = aiohttp.ClientTimeout(
+        total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT
+    )
+    request_params: Dict[str, Any] = {} if config.verify_ssl else {"ssl": False}
+
+    async for attempt in AsyncRetrying(
+        reraise=True,
+        stop=stop_after_attempt(MAX_RETRY_ATTEMPTS),
+        wait=wait_random_exponential(min=1, max=10),
+        retry=retry_if_exception(is_retryable_download_error),
+        before_sleep=signal_retry_congestion,
+    ):
+        with attempt:
+            received = file_.tell() - start if resumable else 0
+            discard(start + received)
+            headers = {"Range": f"bytes={received}-"} if received else {}
+            async with budget.request(), session.get(
+                url, headers=headers, timeout=timeout, **request_params
+            ) as response:
+                if response.status != 206:
+                    response.raise_for_status()
+                    received = 0
+                    discard(start)
+                elif not response.headers.get("Content-Range", "").startswith(
+                    f"bytes {received}-"
+                ):
+                    raise aiohttp.ClientPayloadError(
+                        f"Unexpected Content-Range from {response.url.host}"
+                    )
+
+                # Sizes of encoded (e.g. gzip) content can't be checked or resumed
+                resumable = "Content-Encoding" not in response.headers
+                expected = (
+                    received + response.content_length
+                    if resumable and response.content_length is not None
+                    else None
+                )
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    await download_bandwidth.consume(len(chunk))
+                    file_.write(chunk)
+                    add_bytes(len(chunk))
+
+                size = file_.tell() - start
+                if expected is not None and size != expected:
+                    raise aiohttp.ClientPayloadError(
+                        f"Received {size} of {expected} bytes from {response.url.host}"
+                    )
+    return file_.tell() - start
+
+
 async def save_dicom_series(
     altadb_meta_content_url: str,
     series_dir: str,
     base_url: str = DEFAULT_URL,
     headers: Optional[Dict[str, str]] = None,
+    aiosession: Optional[aiohttp.ClientSession] = None,
+    overwrite: bool = True,
+    executor: Optional[Executor] = None,
+    budget: Optional[ConcurrencyBudget] = None,
 ) -> List[str]:
     """Save DICOM files using AltaDB URLs.
     Given an AltaDB URL containing the metadata and image frames.
@@ -353,6 +768,21 @@ async def save_dicom_series(
     headers: Optional[Dict[str, str]]
         Headers to be used for the HTTP requests.
         If the altaDB_meta_content_url is unsigned, the headers should contain the authorization token.
+    aiosession: Optional[aiohttp.ClientSession]
+        Session to be used for the HTTP requests.
+        Pass a shared session to reuse connections across series,
+        otherwise a new session is created (and closed) for this series.
+    overwrite: bool
+        Overwrite the DICOM files that already exist in series_dir.
+        When False, only the missing instances are downloaded.
+    executor: Optional[Executor]
+        Executor (thread or process pool) used to assemble and write the
+        DICOM files, so that the event loop only does I/O.
+        Defaults to the event loop's default executor.
+    budget: Optional[ConcurrencyBudget]
+        Request and bytes-in-flight budget shared with the other series
+        of the export. Defaults to a budget for this series only,
+        sized from config.export_max_requests and config.export_max_bytes.
 
     Returns
     ------------
@@ -360,6 +790,23 @@ async def save_dicom_series(
         List of the saved DICOM files relative to the dataset root.
     """
     # pylint: disable=too-many-locals
+    if budget is None:
+        budget = ConcurrencyBudget(config.export_max_requests, config.export_max_bytes)
+    if aiosession is None:
+        async with create_session(
+            budget.max_requests, budget.max_requests
+        ) as own_session:
+            return await save_dicom_series(
+                altadb_meta_content_url,
+                series_dir,
+                base_url,
+                headers,
+                own_session,
+                overwrite,
+                executor,
+                budget,
+            )
+
     os.makedirs(series_dir, exist_ok=True)
 
     async def save_dicom_dataset(
@@ -384,56 +831,59 @@ async def save_dicom_series(
         aiosession: aiohttp.ClientSession
             aiohttp ClientSession to be used for the HTTP requests.
         """
+        # Frames are handed to a process pool by path, to threads as file objects
+        to_path = isinstance(executor, ProcessPoolExecutor)
 
         async def get_image_content(
             aiosession: aiohttp.ClientSession, image_url: str
-        ) -> bytes:
-            """Get image content."""
-            async with aiosession.get(image_url) as response:
-                return await response.content.read()
-
-        frame_contents = await gather_with_concurrency(
-            MAX_FILE_BATCH_SIZE,
-            [
-                get_image_content(aiosession, image_url=image_frame_url)
-                for image_frame_url in presigned_image_urls
-            ],
-        )
-
-        ds_file = pydicom.Dataset.from_json(instance_metadata)
-        ds_file.TransferSyntaxUID = pydicom.uid.UID(
-            instance_frames_metadata[0]["metaData"]["00020010"]["Value"][0]
-        )
-
-        move_group2_to_file_meta(ds_file)
-
-        ds_file.PixelData = pydicom.encaps.encapsulate(frame_contents)
-
-        # PATCH/START: add HTJ2KLosslessRPCL to pydicom
-        from pydicom.uid import (  # pylint: disable=import-outside-toplevel
-            UID_dictionary,
-            AllTransferSyntaxes,
-            JPEG2000TransferSyntaxes,
-        )
-
-        HTJ2KLosslessRPCL = pydicom.uid.UID(  # pylint: disable=invalid-name
-            "1.2.840.10008.1.2.4.202"
-        )
-        AllTransferSyntaxes.append(HTJ2KLosslessRPCL)
-        JPEG2000TransferSyntaxes.append(HTJ2KLosslessRPCL)
-        UID_dictionary[HTJ2KLosslessRPCL] = (
-            "High-Throughput JPEG 2000 with RPCL Options Image Compression (Lossless Only)",
-            "Transfer Syntax",
-            "",
-            "",
-            "HTJ2KLosslessRPCL",
-        )
-        # PATCH/END: add HTJ2KLosslessRPCL to pydicom
+        ) -> BinaryIO:
+            """Stream image content into a (spooled) temporary file.
+
+            Frames stay in memory up to EXPORT_FRAME_SPOOL_SIZE, bounded by the
+            bytes in flight of the budget, only larger frames go to disk.
+            """
+            spool = (
+                tempfile.NamedTemporaryFile(  # pylint: disable=consider-using-with
+                    dir=series_dir, prefix=".", suffix=".frame", delete=False
+                )
+                if to_path
+                else tempfile.SpooledTemporaryFile(  # pylint: disable=consider-using-with
+                    max_size=EXPORT_FRAME_SPOOL_SIZE, dir=series_dir
+                )
+            )
+            frame_contents.append(spool)  # type: ignore
+            await download_to_file(
+                aiosession, image_url, spool, budget, add_bytes  # type: ignore
+            )
+            if to_path:
+                spool.close()
+            return spool  # type: ignore
 
-        if ds_file.file_meta.TransferSyntaxUID == HTJ2KLosslessRPCL:
-            ds_file.is_little_endian = True
-            ds_file.is_implicit_VR = False
-        ds_file.save_as(destination_file, write_like_original=False)
+        frame_contents: List[BinaryIO] = []
+        # The frames are held until the instance is written, count them in flight
+        async with budget.admit() as add_bytes:
+            try:
+                frames = await gather_with_concurrency(
+                    MAX_FILE_BATCH_SIZE,
+                    [
+                        get_image_content(aiosession, image_url=image_frame_url)
+                        for image_frame_url in presigned_image_urls
+                    ],
+                )
+                await asyncio.get_running_loop().run_in_executor(
+                    executor,
+                    assemble_dicom_file,
+                    instance_metadata,
+                    instance_frames_metadata[0]["metaData"]["00020010"]["Value"][0],
+                    [frame.name if to_path else frame for frame in frames],
+                    destination_file,
+                    series_dir,
+                )
+            finally:
+                for frame_content in frame_contents:
+                    frame_content.close()
+                    if to_path and os.path.isfile(frame_content.name):
+                        os.remove(frame_content.name)
         logger.debug(f"Saved DICOM dataset to {destination_file}")
 
     res: List[str] = []
@@ -444,43 +894,49 @@ async def save_dicom_series(
             "altadb://", "https://"
         )
 
-    async with aiohttp.ClientSession() as aiosession:
-        async with aiosession.get(altadb_meta_content_url, headers=headers) as response:
-            res_json = await response.json()
-            frameid_url_map: Dict[str, str] = {
-                frame["id"]: frame["path"] for frame in res_json.get("imageFrames", [])
-            }
-
-            tasks = []
-            metadata_url = res_json["metaData"]
-            instances: List[Dict[str, Any]] = []
-            async with aiosession.get(metadata_url) as response:
-                response.raise_for_status()
-                instances = (await response.json())["instances"]
-            for instance in instances:
-                frame_ids = [frame["id"] for frame in instance["frames"]]
-                image_frames_urls = [
-                    frameid_url_map[frame_id] for frame_id in frame_ids
-                ]
-                file_from_dataset_root = os.path.join(
-                    series_dir, f"{instance['frames'][0]['id']}.dcm"
-                )
-                tasks.append(
-                    save_dicom_dataset(
-                        instance["metaData"],
-                        instance["frames"],
-                        image_frames_urls,
-                        file_from_dataset_root,
-                        aiosession,
-                    )
-                )
-                res.append(file_from_dataset_root)
-
-            await gather_with_concurrency(
-                MAX_CONCURRENCY,
-                tasks,
-                f"Saving series {series_dir.split('/')[-1]}",
-                keep_progress_bar=False,
+    async with budget.request(), aiosession.get(
+        altadb_meta_content_url, headers=headers
+    ) as response:
+        res_json = await response.json()
+    frameid_url_map: Dict[str, str] = {
+        frame["id"]: frame["path"] for frame in res_json.get("imageFrames", [])
+    }
+
+    tasks: List[Callable[[], Awaitable[None]]] = []
+    metadata_url = res_json["metaData"]
+    instances: List[Dict[str, Any]] = []
+    async with budget.request(), aiosession.get(metadata_url) as response:
+        response.raise_for_status()
+        instances = (await response.json())["instances"]
+    for instance in instances:
+        frame_ids = [frame["id"] for frame in instance["frames"]]
+        image_frames_urls = [frameid_url_map[frame_id] for frame_id in frame_ids]
+        file_from_dataset_root = os.path.join(
+            series_dir, f"{instance['frames'][0]['id']}.dcm"
+        )
+        res.append(file_from_dataset_root)
+        if not overwrite and os.path.isfile(file_from_dataset_root):
+            # Files are renamed into place once complete
+            continue
+        tasks.append(
+            partial(
+                save_dicom_dataset,
+                instance["metaData"],
+                instance["frames"],
+                image_frames_urls,
+                file_from_dataset_root,
+                aiosession,
             )
+        )
+
+    # Coroutines are only created once a worker is free to run them
+    async for _ in iter_with_concurrency(
+        MAX_CONCURRENCY,
+        tasks,
+        f"Saving series {series_dir.split('/')[-1]}",
+        keep_progress_bar=False,
+        total=len(tasks),
+    ):
+        pass
 
     return res
@@ -1,5 +1,6 @@
 """A utility iterator to handle default AltaDB pagination behavior."""
 
+import asyncio
 from typing import Any, Dict, List, Optional, Callable, Tuple
 
 
@@ -88,3 +89,106 @@ class PaginationIterator:
             return entry
 
         raise StopIteration
+
+
+class AsyncPaginationIterator:
+    """Async Pagination Iterator with prefetching.
+
+    Pages are fetched in a background task (the blocking `func` runs in the
+    default executor), up to `prefetch` pages ahead of the consumer,
+    so the next page is ready by the time the current one is processed.
+
+    :param func: Function to call to get the next batch of data.
+    :param concurrency: Number of items to fetch in a single DB call.
+    :param limit: Maximum number of data points to fetch.
+    :param prefetch: Maximum number of pages fetched ahead of the consumer.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[int, Optional[str]], Tuple[List[Dict], Optional[str]]],
+        concurrency: int = 10,
+        limit: Optional[int] = None,
+        prefetch: int = 1,
+    ) -> None:
+        """Construct Async Pagination Iterator."""
+        self.func = func
+        self.concurrency = concurrency
+        self.limit = limit
+        self.prefetch = max(1, prefetch)
+
+        self.total = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._producer: Optional[asyncio.Task] = None
+        self._datapoints_batch: List[Dict] = []
+        self._datapoints_batch_index = 0
+        self._exhausted = False
+
+    def __aiter__(self) -> "AsyncPaginationIterator":
+        """Get async iterator."""
+        return self
+
+    def __len__(self) -> int:
+        """Get length of iteration."""
+        return self.total
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        """Fetch pages until the cursor is exhausted or the limit is reached."""
+        loop = asyncio.get_running_loop()
+        cursor: Optional[str] = None
+        fetched = 0
+        try:
+            while self.limit is None or fetched < self.limit:
+                datapoints_batch, cursor, *_ = await loop.run_in_executor(
+                    None,
+                    self.func,
+                    (
+                        max(0, min(self.concurrency, self.limit - fetched))
+                        if self.limit is not None
+                        else self.concurrency
+                    ),
+                    cursor,
+                )
+                if self.limit is not None:
+                    datapoints_batch = datapoints_batch[: max(0, self.limit - fetched)]
+                fetched += len(datapoints_batch)
+                if datapoints_batch:
+                    await queue.put(datapoints_batch)
+                if not cursor:
+                    break
+        except Exception as error:  # pylint: disable=broad-except
+            await queue.put(error)
+        await queue.put(None)
+
+    async def __anext__(self) -> Dict:
+        """Get next batch of labels / datapoint."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.prefetch)
+            self._producer = asyncio.create_task(self._produce(self._queue))
+
+        while self._datapoints_batch_index >= len(self._datapoints_batch):
+            if self._exhausted:
+                raise StopAsyncIteration
+            batch = await self._queue.get()
+            if batch is None:
+                self._exhausted = True
+                raise StopAsyncIteration
+            if isinstance(batch, Exception):
+                raise batch
+            self._datapoints_batch = batch
+            self._datapoints_batch_index = 0
+            self.total += len(batch)
+
+        entry = self._datapoints_batch[self._datapoints_batch_index]
+        self._datapoints_batch_index += 1
+        return entry
+
+    async def aclose(self) -> None:
+        """Stop prefetching."""
+        if self._producer and not self._producer.done():
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
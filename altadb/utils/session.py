@@ -0,0 +1,38 @@
+"""Shared aiohttp session helpers."""
+
+import aiohttp
+
+from altadb.common.constants import (
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    MAX_CONNECTIONS,
+    MAX_CONNECTIONS_PER_HOST,
+)
+
+
+def create_connector(
+    limit: int = MAX_CONNECTIONS,
+    limit_per_host: int = MAX_CONNECTIONS_PER_HOST,
+) -> aiohttp.TCPConnector:
+    """Create a pooled TCP connector with keep-alive and DNS caching."""
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+
+
+def create_session(
+    limit: int = MAX_CONNECTIONS,
+    limit_per_host: int = MAX_CONNECTIONS_PER_HOST,
+) -> aiohttp.ClientSession:
+    """Create a client session that owns a pooled connector.
+
+    The session is meant to be shared by every request of a long running
+    operation (e.g. an export), so that TCP/TLS connections are reused.
+    """
+    return aiohttp.ClientSession(
+        connector=create_connector(limit, limit_per_host), connector_owner=True
+    )
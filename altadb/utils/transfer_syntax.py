@@ -0,0 +1,102 @@
+"""Registry of the transfer syntaxes used by AltaDB."""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import pydicom
+import pydicom.config
+import pydicom.uid
+
+
+class TransferSyntax(NamedTuple):
+    """Transfer syntax registered with pydicom."""
+
+    uid: str
+    name: str
+    keyword: str
+    jpeg2000: bool = False
+
+
+HTJ2KLosslessRPCL = TransferSyntax(
+    "1.2.840.10008.1.2.4.202",
+    "High-Throughput JPEG 2000 with RPCL Options Image Compression (Lossless Only)",
+    "HTJ2KLosslessRPCL",
+    jpeg2000=True,
+)
+
+ALTADB_TRANSFER_SYNTAXES: Sequence[TransferSyntax] = (HTJ2KLosslessRPCL,)
+
+_REGISTERED: Dict[str, pydicom.uid.UID] = {}
+
+
+def register_transfer_syntax(syntax: TransferSyntax) -> pydicom.uid.UID:
+    """Register a transfer syntax with pydicom, if it is not known already.
+
+    Registering the same syntax again is a no-op, the pydicom tables
+    are only ever extended once per syntax.
+    """
+    if syntax.uid in _REGISTERED:
+        return _REGISTERED[syntax.uid]
+
+    uid = pydicom.uid.UID(syntax.uid)
+    if uid not in pydicom.uid.UID_dictionary:
+        pydicom.uid.UID_dictionary[uid] = (
+            syntax.name,
+            "Transfer Syntax",
+            "",
+            "",
+            syntax.keyword,
+        )
+    if uid not in pydicom.uid.AllTransferSyntaxes:
+        pydicom.uid.AllTransferSyntaxes.append(uid)
+    if syntax.jpeg2000 and uid not in pydicom.uid.JPEG2000TransferSyntaxes:
+        pydicom.uid.JPEG2000TransferSyntaxes.append(uid)
+
+    _REGISTERED[syntax.uid] = uid
+    return uid
+
+
+def register_altadb_transfer_syntaxes() -> List[pydicom.uid.UID]:
+    """Register all the transfer syntaxes AltaDB stores frames in."""
+    return [register_transfer_syntax(syntax) for syntax in ALTADB_TRANSFER_SYNTAXES]
+
+
+def can_decode(transfer_syntax: str) -> bool:
+    """Check if pixel data in the transfer syntax can be decoded locally.
+
+    This depends on the pydicom version and the installed
+    pixel data plugins (e.g. pylibjpeg, openjpeg, gdcm).
+    """
+    uid = pydicom.uid.UID(transfer_syntax)
+    try:
+        from pydicom.pixels import (  # pylint: disable=import-outside-toplevel
+            get_decoder,
+        )
+    except ImportError:
+        # pydicom < 3
+        return any(
+            handler.supports_transfer_syntax(uid) and handler.is_available()
+            for handler in pydicom.config.pixel_data_handlers
+        )
+
+    try:
+        return bool(get_decoder(uid).is_available)
+    except NotImplementedError:
+        return False
+
+
+def decodable_transfer_syntaxes(
+    transfer_syntaxes: Optional[Sequence[str]] = None,
+) -> List[pydicom.uid.UID]:
+    """Get the transfer syntaxes (default: all known) that can be decoded locally."""
+    return [
+        pydicom.uid.UID(transfer_syntax)
+        for transfer_syntax in (
+            pydicom.uid.AllTransferSyntaxes
+            if transfer_syntaxes is None
+            else transfer_syntaxes
+        )
+        if can_decode(transfer_syntax)
+    ]
+
+
+register_altadb_transfer_syntaxes()
@@ -0,0 +1 @@
+"""Benchmarks for the AltaDB SDK (not part of the test suite)."""
@@ -0,0 +1,85 @@
+"""Export a synthetic dataset from the local mock server.
+
+Usage: python -m benchmarks.export_dataset [number_of_series] [instances_per_series]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from altadb.export.public import Export
+from benchmarks.mock_server import MockAltaDBServer
+
+
+class MockDatasetRepo:
+    """Serve series listings for the mock server."""
+
+    def __init__(self, server: MockAltaDBServer, series_count: int) -> None:
+        """Construct MockDatasetRepo."""
+        self.server = server
+        self.series_count = series_count
+        self.pages = 0
+
+    def get_data_store_import_series(
+        self,
+        org_id: str,  # pylint: disable=unused-argument
+        data_store: str,
+        search: Optional[str] = None,  # pylint: disable=unused-argument
+        first: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """List one page of series."""
+        self.pages += 1
+        start = int(cursor or 0)
+        end = min(start + first, self.series_count)
+        return (
+            [
+                {
+                    "seriesId": f"{data_store}-{idx}",
+                    "importId": "import",
+                    "createdAt": "",
+                    "createdBy": "",
+                    "url": self.server.series_url(f"{data_store}-{idx}"),
+                }
+                for idx in range(start, end)
+            ],
+            str(end) if end < self.series_count else None,
+        )
+
+
+async def run(series_count: int, instances: int) -> None:
+    """Export the synthetic dataset."""
+    server = MockAltaDBServer(instances=instances)
+    await server.start()
+    repo = MockDatasetRepo(server, series_count)
+    context = SimpleNamespace(
+        client=SimpleNamespace(url=server.base_url, headers={}), dataset=repo
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start = time.perf_counter()
+            await Export(context, "org", "bench").export_to_files(  # type: ignore
+                "bench", tmpdir
+            )
+            elapsed = time.perf_counter() - start
+            files = sum(len(files) for _, _, files in os.walk(tmpdir))
+    finally:
+        await server.stop()
+
+    print(f"series: {series_count}, instances per series: {instances}")
+    print(f"files written: {files}, listing pages: {repo.pages}")
+    print(f"connections: {len(server.connections)}, requests: {server.requests}")
+    print(f"elapsed: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        run(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+        )
+    )
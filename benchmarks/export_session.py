@@ -0,0 +1,48 @@
+"""Compare connections opened by per-series sessions vs a shared export session.
+
+Usage: python -m benchmarks.export_session [number_of_series]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from altadb.utils.files import save_dicom_series
+from altadb.utils.session import create_session
+from benchmarks.mock_server import MockAltaDBServer
+
+
+async def run(series_count: int) -> None:
+    """Run both export modes against the mock server."""
+    server = MockAltaDBServer()
+    await server.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start = time.perf_counter()
+            for idx in range(series_count):
+                await save_dicom_series(
+                    server.series_url(f"per-{idx}"), f"{tmpdir}/per-{idx}"
+                )
+            per_series = (len(server.connections), time.perf_counter() - start)
+            server.reset()
+
+            start = time.perf_counter()
+            async with create_session() as aiosession:
+                for idx in range(series_count):
+                    await save_dicom_series(
+                        server.series_url(f"shared-{idx}"),
+                        f"{tmpdir}/shared-{idx}",
+                        aiosession=aiosession,
+                    )
+            shared = (len(server.connections), time.perf_counter() - start)
+    finally:
+        await server.stop()
+
+    print(f"series: {series_count}")
+    print(f"per-series sessions: {per_series[0]} connections, {per_series[1]:.2f}s")
+    print(f"shared session:      {shared[0]} connections, {shared[1]:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
@@ -0,0 +1,170 @@
+"""Minimal local AltaDB series server used by the export benchmarks."""
+
+import os
+from typing import Dict, Set, Tuple
+
+from aiohttp import web
+
+HTJ2K_LOSSLESS_RPCL = "1.2.840.10008.1.2.4.202"
+SOP_CLASS_UID = "1.2.840.10008.5.1.4.1.1.2"
+
+
+def instance_metadata(series_id: str, index: int) -> Dict:
+    """Build DICOM JSON metadata for a single instance."""
+    sop_instance_uid = f"1.2.3.{abs(hash(series_id)) % 10**8}.{index}"
+    return {
+        "00020002": {"vr": "UI", "Value": [SOP_CLASS_UID]},
+        "00020003": {"vr": "UI", "Value": [sop_instance_uid]},
+        "00020010": {"vr": "UI", "Value": [HTJ2K_LOSSLESS_RPCL]},
+        "00080016": {"vr": "UI", "Value": [SOP_CLASS_UID]},
+        "00080018": {"vr": "UI", "Value": [sop_instance_uid]},
+        "00080060": {"vr": "CS", "Value": ["CT"]},
+        "00100010": {"vr": "PN", "Value": [{"Alphabetic": "Bench^Patient"}]},
+        "00100020": {"vr": "LO", "Value": ["BENCH"]},
+        "0020000D": {"vr": "UI", "Value": ["1.2.3.4"]},
+        "0020000E": {"vr": "UI", "Value": [f"1.2.3.4.{abs(hash(series_id)) % 10**8}"]},
+        "00200013": {"vr": "IS", "Value": [index + 1]},
+        "00280010": {"vr": "US", "Value": [64]},
+        "00280011": {"vr": "US", "Value": [64]},
+    }
+
+
+class MockAltaDBServer:
+    """Serve series, metadata and frames while counting client connections."""
+
+    def __init__(
+        self,
+        instances: int = 4,
+        frames: int = 1,
+        frame_size: int = 16 * 1024,
+        fault_every: int = 0,
+    ) -> None:
+        """Construct the mock server.
+
+        Every `fault_every`-th frame request fails, alternately with a 503
+        and with a connection dropped halfway through the body.
+        """
+        self.instances = instances
+        self.frames = frames
+        self.fault_every = fault_every
+        self.frame_requests = 0
+        self.range_requests = 0
+        self.frame = os.urandom(frame_size)
+        self.connections: Set[Tuple] = set()
+        self.requests = 0
+        self.base_url = ""
+        self._runner: web.AppRunner
+
+    def _track(self, request: web.Request) -> None:
+        self.requests += 1
+        transport = request.transport
+        if transport is not None:
+            self.connections.add(transport.get_extra_info("peername"))
+
+    async def series(self, request: web.Request) -> web.Response:
+        """Return the series document."""
+        self._track(request)
+        series_id = request.match_info["series_id"]
+        return web.json_response(
+            {
+                "metaData": f"{self.base_url}/meta/{series_id}",
+                "imageFrames": [
+                    {
+                        "id": f"{series_id}-{idx}-{frame}",
+                        "path": f"{self.base_url}/frame/{series_id}-{idx}-{frame}",
+                    }
+                    for idx in range(self.instances)
+                    for frame in range(self.frames)
+                ],
+            }
+        )
+
+    async def metadata(self, request: web.Request) -> web.Response:
+        """Return the instances metadata document."""
+        self._track(request)
+        series_id = request.match_info["series_id"]
+        return web.json_response(
+            {
+                "instances": [
+                    {
+                        "metaData": instance_metadata(series_id, idx),
+                        "frames": [
+                            {
+                                "id": f"{series_id}-{idx}-{frame}",
+                                "metaData": {
+                                    "00020010": {
+                                        "vr": "UI",
+                                        "Value": [HTJ2K_LOSSLESS_RPCL],
+                                    }
+                                },
+                            }
+                            for frame in range(self.frames)
+                        ],
+                    }
+                    for idx in range(self.instances)
+                ]
+            }
+        )
+
+    async def frame_data(self, request: web.Request) -> web.StreamResponse:
+        """Return the frame bytes, honouring `Range: bytes=N-` requests."""
+        self._track(request)
+        self.frame_requests += 1
+        fault = (
+            self.frame_requests // self.fault_every
+            if self.fault_every and self.frame_requests % self.fault_every == 0
+            else 0
+        )
+        if fault % 2:
+            return web.Response(status=503)
+
+        offset = 0
+        status = 200
+        headers = {"Accept-Ranges": "bytes"}
+        if request.http_range.start:
+            self.range_requests += 1
+            offset = request.http_range.start
+            status = 206
+            headers["Content-Range"] = (
+                f"bytes {offset}-{len(self.frame) - 1}/{len(self.frame)}"
+            )
+        body = self.frame[offset:]
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = len(body)
+        await response.prepare(request)
+        if fault:
+            await response.write(body[: len(body) // 2])
+            assert request.transport is not None
+            request.transport.close()
+            return response
+        await response.write(body)
+        await response.write_eof()
+        return response
+
+    def reset(self) -> None:
+        """Reset the counters."""
+        self.connections = set()
+        self.requests = 0
+        self.frame_requests = 0
+        self.range_requests = 0
+
+    def series_url(self, series_id: str) -> str:
+        """Get the series URL."""
+        return f"{self.base_url}/series/{series_id}"
+
+    async def start(self) -> None:
+        """Start listening on a random local port."""
+        app = web.Application()
+        app.router.add_get("/series/{series_id}", self.series)
+        app.router.add_get("/meta/{series_id}", self.metadata)
+        app.router.add_get("/frame/{frame_id}", self.frame_data)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        await self._runner.cleanup()
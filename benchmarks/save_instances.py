@@ -0,0 +1,53 @@
+"""Measure the per-instance cost of writing exported DICOM files.
+
+The cost should stay flat however many instances have been saved,
+in particular the pydicom transfer syntax tables must not grow.
+
+Usage: python -m benchmarks.save_instances [number_of_instances] [series_size]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pydicom.uid
+
+from altadb.utils.dicom_utils import assemble_dicom_file
+from altadb.utils.transfer_syntax import HTJ2KLosslessRPCL
+from benchmarks.mock_server import instance_metadata
+
+
+def run(instances: int, series_size: int) -> None:
+    """Save the instances and report the mean cost of every bucket."""
+    bucket = max(1, instances // 10)
+    frame = os.urandom(4096)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        destination = os.path.join(tmpdir, "instance.dcm")
+        start = time.perf_counter()
+        for idx in range(instances):
+            series = idx // series_size
+            metadata = instance_metadata(f"series-{series}", idx % series_size)
+            assemble_dicom_file(
+                metadata,
+                HTJ2KLosslessRPCL.uid,
+                [io.BytesIO(frame)],
+                destination,
+                os.path.join(tmpdir, str(series)),
+            )
+            if (idx + 1) % bucket == 0:
+                elapsed = time.perf_counter() - start
+                print(
+                    f"instances {idx + 1 - bucket:>7}-{idx + 1:<7} "
+                    f"{elapsed / bucket * 1e6:8.1f} us/instance, "
+                    f"transfer syntaxes: {len(pydicom.uid.AllTransferSyntaxes)}"
+                )
+                start = time.perf_counter()
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
@@ -0,0 +1,95 @@
+"""Compare the makespan of upload schedules on skewed file size distributions.
+
+Uploads are simulated (each file takes size / rate seconds on its slot),
+through the actual UploadPipeline, and through static batches uploaded in
+scan order as UploadPipeline did before it scheduled items largest first.
+The lower bound is max(total size / slots, largest file) / rate.
+
+Usage: python -m benchmarks.upload_schedule [number_of_files] [target_seconds]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+from altadb.upload.pipeline import UploadPipeline
+from altadb.utils.async_utils import gather_with_concurrency
+
+BATCH_SIZE = 100
+BATCH_WORKERS = 5
+FILE_SLOTS = 10
+
+DISTRIBUTIONS: Dict[str, Callable[[random.Random], float]] = {
+    "uniform": lambda rng: rng.uniform(0.5, 1.5),
+    "lognormal": lambda rng: rng.lognormvariate(0, 1.5),
+    "pareto": lambda rng: rng.paretovariate(1.2),
+    "few huge": lambda rng: 200.0 if rng.random() < 0.002 else rng.uniform(0.5, 1.5),
+}
+
+
+async def static_batches(sizes: List[float], rate: float) -> float:
+    """Upload batches in scan order, each batch with its own file slots."""
+
+    async def upload_batch(batch: List[float]) -> bool:
+        await gather_with_concurrency(
+            FILE_SLOTS, [asyncio.sleep(size / rate) for size in batch]
+        )
+        return True
+
+    start = time.perf_counter()
+    await gather_with_concurrency(
+        BATCH_WORKERS,
+        [
+            upload_batch(sizes[idx : idx + BATCH_SIZE])
+            for idx in range(0, len(sizes), BATCH_SIZE)
+        ],
+    )
+    return time.perf_counter() - start
+
+
+async def size_scheduled(sizes: List[float], rate: float) -> float:
+    """Upload through the pipeline, largest files first on shared slots."""
+
+    async def presign(batch: List[float]) -> List[str]:
+        return ["" for _ in batch]
+
+    async def upload(size: float, _: str) -> bool:
+        await asyncio.sleep(size / rate)
+        return True
+
+    pipeline: UploadPipeline[float] = UploadPipeline(
+        presign,
+        upload,
+        BATCH_WORKERS * FILE_SLOTS,
+        BATCH_SIZE,
+        size=lambda size: int(size * 1000),
+    )
+    start = time.perf_counter()
+    await pipeline.run(iter(sizes))
+    return time.perf_counter() - start
+
+
+def run(files: int, target: float) -> None:
+    """Report the makespan of both schedules for every distribution."""
+    slots = BATCH_WORKERS * FILE_SLOTS
+    for name, distribution in DISTRIBUTIONS.items():
+        rng = random.Random(42)
+        sizes = [distribution(rng) for _ in range(files)]
+        rate = sum(sizes) / slots / target
+        bound = max(sum(sizes) / slots, max(sizes)) / rate
+        static = asyncio.run(static_batches(sizes, rate))
+        scheduled = asyncio.run(size_scheduled(sizes, rate))
+        print(
+            f"{name:<10} lower bound {bound:6.2f} s, "
+            f"static batches {static:6.2f} s ({static / bound:4.2f}x), "
+            f"size scheduled {scheduled:6.2f} s ({scheduled / bound:4.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 2.0,
+    )
@@ -0,0 +1,115 @@
+"""Compare the directory walkers on a synthetic tree of DICOM files.
+
+The tree holds series directories of 500 files, grouped 100 series per
+study, with a few non-DICOM files and hidden entries mixed in. It is
+created once and reused. Pass the path of an existing tree (e.g. on an
+NFS mount) to measure the walkers on a high-latency filesystem.
+
+Usage: python -m benchmarks.walk_files [number_of_files] [directory]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+from typing import Callable, List, Set
+
+from natsort import natsorted, ns
+
+from altadb.utils.files import find_files_recursive, has_file_type
+
+FILES_PER_SERIES = 500
+SERIES_PER_STUDY = 100
+
+
+def listdir_files_recursive(
+    root: str, file_types: Set[str], multiple: bool = False
+) -> List[List[str]]:
+    """Walk with os.listdir and a stat per check, as find_files_recursive used to."""
+    if not os.path.isdir(root):
+        return []
+
+    items = []
+    list_items = []
+    discard_list_items = False
+
+    for item in os.listdir(root):
+        if item.startswith("."):
+            continue
+        path = os.path.join(root, item)
+        if os.path.isdir(path):
+            items.extend(listdir_files_recursive(path, file_types, multiple))
+            discard_list_items = True
+        elif os.path.isfile(path) and has_file_type(item, file_types):
+            if multiple:
+                if not discard_list_items:
+                    list_items.append(path)
+            else:
+                items.append([path])
+        else:
+            discard_list_items = True
+
+    if (
+        not discard_list_items
+        and len({item.rsplit(".", 1)[-1].lower() for item in list_items}) == 1
+    ):
+        items.append(list(natsorted(list_items, alg=ns.IGNORECASE)))  # type: ignore
+
+    return items
+
+
+def create_tree(root: str, files: int) -> None:
+    """Create the synthetic tree, unless it exists already."""
+    marker = os.path.join(root, f".tree-{files}")
+    if os.path.exists(marker):
+        return
+    for idx in range(files):
+        series = idx // FILES_PER_SERIES
+        directory = os.path.join(
+            root, f"study-{series // SERIES_PER_STUDY}", f"series-{series}"
+        )
+        if idx % FILES_PER_SERIES == 0:
+            os.makedirs(directory, exist_ok=True)
+            if series % 10 == 0:
+                open(os.path.join(directory, "notes.txt"), "wb").close()
+            open(os.path.join(directory, ".DS_Store"), "wb").close()
+        open(os.path.join(directory, f"IM{idx % FILES_PER_SERIES}.dcm"), "wb").close()
+    open(marker, "wb").close()
+
+
+def measure(name: str, walk: Callable[[], List[List[str]]]) -> List[List[str]]:
+    """Time a walker."""
+    start = time.perf_counter()
+    items = walk()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<24} {elapsed:7.2f} s, {len(items):>8} groups, "
+        f"{sum(len(item) for item in items) / max(elapsed, 1e-6):10.0f} files/s"
+    )
+    return items
+
+
+def run(files: int, root: str) -> None:
+    """Walk the tree with every walker, and check that they agree."""
+    create_tree(root, files)
+    file_types = {"dcm"}
+    for multiple in (False, True):
+        print(f"multiple={multiple}")
+        expected = measure(
+            "os.listdir", partial(listdir_files_recursive, root, file_types, multiple)
+        )
+        for workers in (1, 8, 32):
+            items = measure(
+                f"os.scandir workers={workers}",
+                partial(find_files_recursive, root, file_types, multiple, workers),
+            )
+            assert items == expected, "walkers disagree"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        run(int(sys.argv[1]), sys.argv[2])
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, tmpdir)
@@ -7,25 +7,20 @@ import pytest
 import altadb
 
 
-ALTADB_API_KEY = os.environ["ALTADB_API_KEY"]
-ALTADB_SECRET_KEY = os.environ["ALTADB_SECRET_KEY"]
-ALTADB_URL = os.environ["ALTADB_URL"]
-ALTADB_ORG_ID = os.environ["ALTADB_ORG_ID"]
-
-
+# Read by the fixtures, unit tests run without credentials
 @pytest.fixture(scope="session", name="altadb_api_key")
 def altadb_api_key() -> str:
-    return ALTADB_API_KEY
+    return os.environ["ALTADB_API_KEY"]
 
 
 @pytest.fixture(scope="session", name="altadb_secret_key")
 def altadb_secret_key() -> str:
-    return ALTADB_SECRET_KEY
+    return os.environ["ALTADB_SECRET_KEY"]
 
 
 @pytest.fixture(scope="session", name="altadb_url")
 def altadb_url() -> str:
-    return ALTADB_URL
+    return os.environ["ALTADB_URL"]
 
 
 @pytest.fixture(scope="function", name="context")
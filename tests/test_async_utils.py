@@ -0,0 +1,111 @@
+"""Unit tests of the concurrency helpers."""
+
+import asyncio
+import random
+from asyncio import run
+from typing import Awaitable, Callable, Iterator, List
+
+import pytest
+
+from altadb.utils.async_utils import iter_with_concurrency
+
+
+def _factories(count: int) -> Iterator[Callable[[], Awaitable[int]]]:
+    """Yield factories of tasks finishing in random order."""
+
+    async def task(idx: int) -> int:
+        await asyncio.sleep(random.uniform(0, 0.01))
+        return idx
+
+    for idx in range(count):
+        yield lambda idx=idx: task(idx)  # type: ignore
+
+
+async def _collect(**kwargs) -> List[int]:  # type: ignore
+    return [value async for value in iter_with_concurrency(4, _factories(50), **kwargs)]
+
+
+@pytest.mark.unit
+def test_iter_with_concurrency_ordered() -> None:
+    """Test that ordered results follow the factories, unordered are all yielded."""
+    assert run(_collect(ordered=True)) == list(range(50))
+    assert sorted(run(_collect())) == list(range(50))
+
+
+@pytest.mark.unit
+def test_iter_with_concurrency_is_lazy_and_cancelled() -> None:
+    """Test that tasks are created lazily, and cancelled when the caller stops.
+
+    Steps:
+    1. Stop iterating after the first result, the other tasks never finish.
+    2. Check only the tasks of the workers were started, not all of them.
+    3. Check the tasks in flight were cancelled, none is left running.
+    """
+    started: List[int] = []
+    cancelled: List[int] = []
+
+    async def task(idx: int) -> int:
+        started.append(idx)
+        try:
+            await asyncio.sleep(0 if idx == 0 else 60)
+        except asyncio.CancelledError:
+            cancelled.append(idx)
+            raise
+        return idx
+
+    async def consume() -> None:
+        results = iter_with_concurrency(
+            4, (lambda idx=idx: task(idx) for idx in range(1000))  # type: ignore
+        )
+        async for _ in results:
+            break
+        await results.aclose()  # type: ignore
+        current = asyncio.current_task()
+        assert not [task for task in asyncio.all_tasks() if task is not current]
+
+    run(consume())
+    assert 4 <= len(started) < 10
+    assert sorted(cancelled) == sorted(started)[1:]
+
+
+@pytest.mark.unit
+def test_iter_with_concurrency_errors() -> None:
+    """Test that task errors are raised, or yielded with return_exceptions."""
+
+    async def fail() -> int:
+        raise ValueError("task failed")
+
+    async def collect(return_exceptions: bool) -> List:
+        return [
+            value
+            async for value in iter_with_concurrency(
+                2, [fail, fail], return_exceptions=return_exceptions
+            )
+        ]
+
+    with pytest.raises(ValueError):
+        run(collect(False))
+    assert all(isinstance(value, ValueError) for value in run(collect(True)))
+
+
+@pytest.mark.unit
+def test_iter_with_concurrency_factories_error() -> None:
+    """Test that an error of the factories iterator stops every worker."""
+
+    async def task() -> int:
+        await asyncio.sleep(0.01)
+        return 0
+
+    def factories() -> Iterator[Callable[[], Awaitable[int]]]:
+        yield task
+        yield task
+        raise RuntimeError("listing failed")
+
+    async def consume() -> None:
+        with pytest.raises(RuntimeError):
+            async for _ in iter_with_concurrency(4, factories()):
+                pass
+        current = asyncio.current_task()
+        assert not [task for task in asyncio.all_tasks() if task is not current]
+
+    run(consume())
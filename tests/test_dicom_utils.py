@@ -0,0 +1,105 @@
+"""Unit tests of the DICOM files written by the export."""
+
+import glob
+import io
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pydicom
+import pydicom.encaps
+import pytest
+
+from altadb.utils.dicom_utils import (
+    assemble_dicom_file,
+    get_header_template,
+    move_group2_to_file_meta,
+)
+
+from tests import marks
+from tests.contstants import DATA_DIR
+
+HTJ2K_LOSSLESS = "1.2.840.10008.1.2.4.202"
+DATA_PATH = os.path.join(os.path.dirname(__file__), DATA_DIR)
+
+
+def _series() -> List[str]:
+    return sorted(glob.glob(os.path.join(DATA_PATH, "*")))
+
+
+def _instance_metadata(path: str) -> Dict:
+    """Get the DICOM JSON metadata of a file, as served by AltaDB."""
+    dataset = pydicom.dcmread(path)
+    metadata = dataset.file_meta.to_json_dict()
+    metadata.update(dataset.to_json_dict())
+    metadata.pop("7FE00010", None)
+    return metadata
+
+
+def _write_with_pydicom(metadata: Dict, frames: List[bytes], path: str) -> bytes:
+    """Write a file with pydicom, holding the frames in memory."""
+    dataset = pydicom.Dataset.from_json(metadata)
+    dataset.TransferSyntaxUID = pydicom.uid.UID(HTJ2K_LOSSLESS)
+    move_group2_to_file_meta(dataset)
+    dataset.PixelData = pydicom.encaps.encapsulate(frames)
+    dataset.is_little_endian = True
+    dataset.is_implicit_VR = False
+    dataset.save_as(path, write_like_original=False)
+    with open(path, "rb") as file_:
+        return file_.read()
+
+
+def _compare(
+    tmpdir: str, series_dir: str, series_key: Optional[str] = None
+) -> List[Tuple[str, bool]]:
+    results = []
+    for path in sorted(glob.glob(os.path.join(series_dir, "*.dcm"))):
+        metadata = _instance_metadata(path)
+        # Odd and even sizes, odd frames are padded
+        frames = [os.urandom(101), os.urandom(200)]
+        expected = _write_with_pydicom(
+            metadata, frames, os.path.join(tmpdir, "expected.dcm")
+        )
+        destination = os.path.join(tmpdir, "written.dcm")
+        size = assemble_dicom_file(
+            metadata,
+            HTJ2K_LOSSLESS,
+            [io.BytesIO(frame) for frame in frames],
+            destination,
+            series_key,
+        )
+        with open(destination, "rb") as file_:
+            written = file_.read()
+        assert size == len(written)
+        results.append((os.path.basename(path), written == expected))
+    return results
+
+
+@pytest.mark.unit
+@marks.parametrize("series_dir", _series())
+def test_streamed_file_matches_pydicom(tmpdir: str, series_dir: str) -> None:
+    """Test that files streamed frame by frame are identical to pydicom's.
+
+    Steps:
+    1. Write every instance of the series with pydicom, frames in memory.
+    2. Write it again from frame file objects (assemble_dicom_file).
+    3. Check the files are byte-identical, and no .part file is left.
+    """
+    results = _compare(str(tmpdir), series_dir)
+    assert results and all(identical for _, identical in results), results
+    assert not glob.glob(os.path.join(str(tmpdir), "*.part"))
+
+
+@pytest.mark.unit
+@marks.parametrize("series_dir", _series())
+def test_header_template_matches_pydicom(tmpdir: str, series_dir: str) -> None:
+    """Test that files written with the series header template are identical.
+
+    Steps:
+    1. Write every instance of the series with pydicom, frames in memory.
+    2. Write it again, reusing the header elements of the series.
+    3. Check the files are byte-identical, and the template was filled.
+    """
+    series_key = os.path.join(str(tmpdir), os.path.basename(series_dir))
+    results = _compare(str(tmpdir), series_dir, series_key)
+    assert results and all(identical for _, identical in results), results
+    assert get_header_template(series_key, HTJ2K_LOSSLESS).elements
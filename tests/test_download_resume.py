@@ -0,0 +1,45 @@
+"""Unit tests of the resumed downloads (HTTP Range)."""
+
+import os
+from asyncio import run
+
+import pytest
+
+from altadb.utils.files import download_to_file
+from altadb.utils.session import create_session
+from benchmarks.mock_server import MockAltaDBServer
+
+
+@pytest.mark.unit
+def test_download_resumes_dropped_connection(tmpdir: str) -> None:
+    """Test that a download dropped halfway is resumed, byte-identical.
+
+    Steps:
+    1. Download a frame 8 times, the mock server fails every 4th request,
+       with a 503 (retried) then by dropping the connection halfway.
+    2. Check the dropped download was resumed with a Range request.
+    3. Check every downloaded file is identical to the frame.
+    """
+    server = MockAltaDBServer(frame_size=256 * 1024, fault_every=4)
+    paths = [os.path.join(str(tmpdir), f"frame-{idx}") for idx in range(8)]
+
+    async def download() -> None:
+        await server.start()
+        try:
+            async with create_session() as session:
+                for idx, path in enumerate(paths):
+                    with open(path, "wb") as file_:
+                        size = await download_to_file(
+                            session, f"{server.base_url}/frame/{idx}", file_
+                        )
+                    assert size == len(server.frame)
+        finally:
+            await server.stop()
+
+    run(download())
+
+    assert server.frame_requests == 10
+    assert server.range_requests == 1
+    for path in paths:
+        with open(path, "rb") as file_:
+            assert file_.read() == server.frame
@@ -0,0 +1,129 @@
+"""Unit tests of the export manifest and journal."""
+
+import json
+import os
+from typing import Dict, List
+
+import pytest
+
+from altadb.export.manifest import INDEX_ENTRY, SeriesManifest
+from altadb.export.public import Export
+
+
+def _entries(count: int) -> List[Dict]:
+    return [
+        {"seriesId": f"series-{idx}", "items": [], "sizes": []} for idx in range(count)
+    ]
+
+
+@pytest.mark.unit
+def test_manifest_drops_partial_write(tmpdir: str) -> None:
+    """Test that only the lines in the offset index are read after a crash.
+
+    Steps:
+    1. Append entries to the manifest.
+    2. Write a partial line, and a partial index entry (as a crash would).
+    3. Reload the manifest, and check the partial writes are dropped.
+    4. Append again, and check the new entry follows the others.
+    """
+    manifest = SeriesManifest(str(tmpdir))
+    entries = _entries(3)
+    manifest.append(entries[:2])
+    size = os.path.getsize(manifest.path)
+
+    with open(manifest.path, "ab") as manifest_file:
+        manifest_file.write(b'{"seriesId": "series-')
+    with open(manifest.index_path, "ab") as index_file:
+        index_file.write(INDEX_ENTRY.pack(size + 100)[:3])
+
+    manifest = SeriesManifest(str(tmpdir))
+    assert len(manifest) == 2
+    assert list(manifest) == entries[:2]
+    assert os.path.getsize(manifest.path) == size
+    assert os.path.getsize(manifest.index_path) == 2 * INDEX_ENTRY.size
+
+    manifest.append(entries[2:])
+    assert list(SeriesManifest(str(tmpdir))) == entries
+
+
+@pytest.mark.unit
+def test_manifest_drops_offsets_past_data(tmpdir: str) -> None:
+    """Test that index entries past the end of the data are dropped."""
+    manifest = SeriesManifest(str(tmpdir))
+    manifest.append(_entries(2))
+    with open(manifest.path, "r+b") as manifest_file:
+        manifest_file.truncate(os.path.getsize(manifest.path) - 1)
+
+    manifest = SeriesManifest(str(tmpdir))
+    assert list(manifest) == _entries(1)
+    assert os.path.getsize(manifest.index_path) == INDEX_ENTRY.size
+
+
+@pytest.mark.unit
+def test_resume_export(tmpdir: str) -> None:
+    """Test that an export resumes from the series with intact files.
+
+    Steps:
+    1. Journal three series, then truncate a file of one and remove another.
+    2. Resume the export, and check only the intact series are completed.
+    3. Check the truncated file is removed, and the manifest compacted.
+    """
+    dataset_root = str(tmpdir)
+    manifest = SeriesManifest(dataset_root)
+    entries = []
+    for idx in range(3):
+        item = os.path.join(dataset_root, f"series-{idx}.dcm")
+        with open(item, "wb") as item_file:
+            item_file.write(b"DICM" * (idx + 1))
+        entries.append(
+            {"seriesId": f"series-{idx}", "items": [item], "sizes": [4 * (idx + 1)]}
+        )
+    manifest.append(entries)
+
+    truncated = entries[1]["items"][0]
+    with open(truncated, "r+b") as item_file:
+        item_file.truncate(1)
+    os.remove(entries[2]["items"][0])
+
+    manifest = SeriesManifest(dataset_root)
+    assert Export.resume_export(manifest) == {"series-0"}
+    assert not os.path.exists(truncated)
+    assert list(SeriesManifest(dataset_root)) == entries[:1]
+
+
+@pytest.mark.unit
+def test_resume_export_from_series_json(tmpdir: str) -> None:
+    """Test that a finished export (series.json only) is resumed."""
+    dataset_root = str(tmpdir)
+    manifest = SeriesManifest(dataset_root)
+    item = os.path.join(dataset_root, "series-0.dcm")
+    with open(item, "wb") as item_file:
+        item_file.write(b"DICM")
+    entries = [{"seriesId": "series-0", "items": [item]}]
+    with open(manifest.legacy_path, "w", encoding="utf-8") as series_file:
+        json.dump(entries, series_file)
+
+    assert Export.resume_export(manifest) == {"series-0"}
+    assert list(manifest) == entries
+
+
+@pytest.mark.unit
+def test_resume_export_removes_partial_files(tmpdir: str) -> None:
+    """Test that the partial files of an interrupted export are removed."""
+    dataset_root = str(tmpdir)
+    series_dir = os.path.join(dataset_root, "series-0")
+    os.makedirs(series_dir)
+    partial_files = [
+        os.path.join(series_dir, "instance.dcm.part"),
+        os.path.join(series_dir, ".tmp1234.frame"),
+        os.path.join(dataset_root, "series.json.part"),
+    ]
+    complete = os.path.join(series_dir, "instance.dcm")
+    for path in partial_files + [complete]:
+        with open(path, "wb") as file_:
+            file_.write(b"DICM")
+
+    Export.resume_export(SeriesManifest(dataset_root))
+
+    assert not any(os.path.exists(path) for path in partial_files)
+    assert os.path.exists(complete)
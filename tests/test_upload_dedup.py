@@ -0,0 +1,73 @@
+"""Unit tests of the de-duplication of files before they are uploaded."""
+
+import os
+import shutil
+from typing import List
+
+import pydicom
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+
+from altadb.upload.dedup import Deduplicator
+from altadb.upload.index import UploadIndex
+from altadb.upload.scan import UploadScanner
+from altadb.utils.common_utils import hash_file_sha256
+
+
+def _write_instance(path: str, sop_instance_uid: str, patient: str = "Patient") -> str:
+    """Write a minimal DICOM instance."""
+    dataset = Dataset()
+    dataset.SOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    dataset.SOPInstanceUID = sop_instance_uid
+    dataset.PatientName = patient
+    dataset.file_meta = FileMetaDataset()
+    dataset.file_meta.TransferSyntaxUID = pydicom.uid.ExplicitVRLittleEndian
+    dataset.file_meta.MediaStorageSOPClassUID = dataset.SOPClassUID
+    dataset.file_meta.MediaStorageSOPInstanceUID = sop_instance_uid
+    dataset.is_little_endian = True
+    dataset.is_implicit_VR = False
+    dataset.save_as(path, write_like_original=False)
+    return path
+
+
+def _scan(index: UploadIndex, paths: List[str]) -> List[str]:
+    return list(UploadScanner(index, Deduplicator(index), workers=2).scan(paths))
+
+
+@pytest.mark.unit
+def test_dedup_skips_duplicates_of_the_upload(tmpdir: str) -> None:
+    """Test that copies of a file, and other files of an instance, are skipped.
+
+    Steps:
+    1. Write an instance, a copy of it, a re-export of it (same
+       SOPInstanceUID, other content) and another instance.
+    2. Check only the first file of each instance is uploaded, in order.
+    """
+    root = str(tmpdir)
+    first = _write_instance(os.path.join(root, "a.dcm"), "1.2.3.1")
+    copy = shutil.copy(first, os.path.join(root, "b.dcm"))
+    reexport = _write_instance(os.path.join(root, "c.dcm"), "1.2.3.1", "Other")
+    other = _write_instance(os.path.join(root, "d.dcm"), "1.2.3.2")
+
+    with UploadIndex("org", "dataset", os.path.join(root, "index.db")) as index:
+        scanner = UploadScanner(index, Deduplicator(index), workers=2)
+        assert list(scanner.scan([first, copy, reexport, other])) == [first, other]
+        assert scanner.dedup is not None and scanner.dedup.skipped == 2
+
+
+@pytest.mark.unit
+def test_dedup_skips_duplicates_of_earlier_uploads(tmpdir: str) -> None:
+    """Test that copies of files uploaded in processed imports are skipped."""
+    root = str(tmpdir)
+    first = _write_instance(os.path.join(root, "a.dcm"), "1.2.3.1")
+    other = _write_instance(os.path.join(root, "b.dcm"), "1.2.3.2")
+
+    with UploadIndex("org", "dataset", os.path.join(root, "index.db")) as index:
+        assert _scan(index, [first]) == [first]
+        index.record([(first, hash_file_sha256(first))], "import-1")
+        # Not processed yet, the file could still fail to be imported
+        assert _scan(index, [shutil.copy(first, os.path.join(root, "c.dcm"))])
+        index.processed("import-1")
+
+        copy = shutil.copy(first, os.path.join(root, "d.dcm"))
+        assert _scan(index, [first, copy, other]) == [other]
@@ -0,0 +1,85 @@
+"""Unit tests of the upload index, which skips unchanged files on rescans."""
+
+import os
+from typing import List
+
+import pytest
+
+import altadb.upload.index
+from altadb.upload.index import UploadIndex
+from altadb.upload.scan import UploadScanner
+from altadb.utils.common_utils import hash_file_sha256
+
+
+def _write(path: str, content: bytes) -> str:
+    with open(path, "wb") as file_:
+        file_.write(b"\0" * 128 + b"DICM" + content)
+    return path
+
+
+def _upload(index: UploadIndex, paths: List[str], import_id: str) -> List[str]:
+    """Scan the files, and record the selected ones as uploaded and processed."""
+    selected = list(UploadScanner(index, workers=2).scan(paths))
+    index.record([(path, hash_file_sha256(path)) for path in selected], import_id)
+    index.processed(import_id)
+    return selected
+
+
+@pytest.mark.unit
+def test_index_skips_unchanged_files(
+    tmpdir: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test which files a rescan uploads, and which files it hashes.
+
+    Steps:
+    1. Upload files, then rescan them: none is uploaded, or hashed.
+    2. Touch a file, change the content of another (same size), append
+       to a third, and add a new file.
+    3. Check only the changed files are uploaded, and only the files of
+       the same size as their indexed row are hashed.
+    """
+    hashed: List[str] = []
+
+    def hash_file(path: str) -> str:
+        hashed.append(os.path.basename(path))
+        return hash_file_sha256(path)
+
+    monkeypatch.setattr(altadb.upload.index, "hash_file_sha256", hash_file)
+    paths = [
+        _write(os.path.join(str(tmpdir), f"{idx}.dcm"), bytes([idx]) * 64)
+        for idx in range(4)
+    ]
+
+    with UploadIndex("org", "dataset", os.path.join(str(tmpdir), "index.db")) as index:
+        assert _upload(index, paths, "import-1") == paths
+        assert not _upload(index, paths, "import-2")
+        assert index.skipped == len(paths)
+        assert not hashed
+
+        os.utime(paths[0], ns=(0, 0))
+        _write(paths[1], b"\xff" * 64)
+        _write(paths[2], bytes([2]) * 65)
+        paths.append(_write(os.path.join(str(tmpdir), "new.dcm"), b"new"))
+        assert _upload(index, paths, "import-3") == [paths[1], paths[2], paths[4]]
+        assert sorted(hashed) == ["0.dcm", "1.dcm"]
+
+        # The touched file is skipped on stat again, once its new stat is known
+        hashed.clear()
+        assert not _upload(index, paths, "import-4")
+        assert not hashed
+
+
+@pytest.mark.unit
+def test_index_only_skips_processed_imports(tmpdir: str) -> None:
+    """Test that files are only skipped once their import has been processed."""
+    path = _write(os.path.join(str(tmpdir), "0.dcm"), b"content")
+    with UploadIndex("org", "dataset", os.path.join(str(tmpdir), "index.db")) as index:
+        assert list(UploadScanner(index).scan([path])) == [path]
+        index.record([(path, hash_file_sha256(path))], "import-1")
+        assert list(UploadScanner(index).scan([path])) == [path]
+        index.processed("import-1")
+        assert not list(UploadScanner(index).scan([path]))
+
+    # Other datasets have their own files
+    with UploadIndex("org", "other", os.path.join(str(tmpdir), "index.db")) as index:
+        assert list(UploadScanner(index).scan([path])) == [path]
@@ -0,0 +1,68 @@
+"""Unit tests of the adaptive presign requests."""
+
+from asyncio import run
+from typing import List
+
+import pytest
+
+from altadb.common.errors import RequestTooLargeError
+from altadb.upload.presign import AdaptiveBatchSize, presign_in_batches
+
+
+class FakePresign:
+    """Presign endpoint rejecting requests of more than `limit` items."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.requests: List[int] = []
+
+    async def __call__(self, items: List[int]) -> List[str]:
+        self.requests.append(len(items))
+        if len(items) > self.limit:
+            raise RequestTooLargeError("Request entity too large")
+        return [f"url-{item}" for item in items]
+
+
+@pytest.mark.unit
+def test_presign_bisects_on_413() -> None:
+    """Test that requests rejected with a 413 are bisected.
+
+    Steps:
+    1. Presign more items than the server accepts per request.
+    2. Check every item is presigned once, in order.
+    3. Check the requests were bisected, and the limit learned.
+    """
+    presign = FakePresign(limit=3)
+    batch_size = AdaptiveBatchSize(maximum=8)
+    items = list(range(10))
+
+    urls = run(presign_in_batches(presign, items, batch_size))
+
+    assert urls == [f"url-{item}" for item in items]
+    assert presign.requests[:3] == [8, 4, 2]
+    assert all(count <= 3 for count in presign.requests[3:])
+    assert batch_size.ceiling == 3
+
+    # The learned size is reused, without requests that are too large
+    presign.requests.clear()
+    assert run(presign_in_batches(presign, items, batch_size)) == urls
+    assert max(presign.requests) <= 3
+
+
+@pytest.mark.unit
+def test_presign_single_item_too_large() -> None:
+    """Test that a single item that is too large fails."""
+    presign = FakePresign(limit=0)
+    with pytest.raises(RequestTooLargeError):
+        run(presign_in_batches(presign, [1, 2], AdaptiveBatchSize(maximum=2)))
+    assert presign.requests == [2, 1]
+
+
+@pytest.mark.unit
+def test_presign_url_count_mismatch() -> None:
+    """Test that a response missing URLs presigns nothing."""
+
+    async def presign(items: List[int]) -> List[str]:
+        return ["url"] * (len(items) - 1)
+
+    assert not run(presign_in_batches(presign, [1, 2, 3], AdaptiveBatchSize()))
@@ -0,0 +1,90 @@
+"""Unit tests of the directory walk of the uploads."""
+
+import os
+from typing import List, Set
+
+import pytest
+from natsort import natsorted, ns
+
+from altadb.utils.files import find_files_recursive, has_file_type, iter_files_recursive
+
+from tests import marks
+
+FILE_TYPES = {"dcm", "nii", ""}
+
+
+def _listdir_walk(root: str, file_types: Set[str], multiple: bool) -> List[List[str]]:
+    """Walk a directory like find_files_recursive did before os.scandir."""
+    items = []
+    list_items = []
+    discard_list_items = False
+    for item in os.listdir(root):
+        if item.startswith("."):
+            continue
+        path = os.path.join(root, item)
+        if os.path.isdir(path):
+            items.extend(_listdir_walk(path, file_types, multiple))
+            discard_list_items = True
+        elif os.path.isfile(path) and has_file_type(item, file_types):
+            if multiple:
+                if not discard_list_items:
+                    list_items.append(path)
+            else:
+                items.append([path])
+        else:
+            discard_list_items = True
+    if (
+        not discard_list_items
+        and len({item.rsplit(".", 1)[-1].lower() for item in list_items}) == 1
+    ):
+        items.append(list(natsorted(list_items, alg=ns.IGNORECASE)))
+    return items
+
+
+def _make_tree(root: str) -> None:
+    """Create folders of a single type, of mixed types, nested, and hidden."""
+    files = [
+        "series-a/IMG10.dcm",
+        "series-a/img2.dcm",
+        "series-a/IMG1.dcm",
+        "series-b/1.dcm.gz",
+        "series-b/2.dcm.gz",
+        "mixed/a.dcm",
+        "mixed/b.nii",
+        "mixed/notes.txt",
+        "nested/c.dcm",
+        "nested/deeper/d.dcm",
+        "nested/deeper/e.dcm",
+        "unnamed/IM0001",
+        "unnamed/IM0002",
+        "unnamed/DICOMDIR",
+        ".hidden/f.dcm",
+        "series-a/.g.dcm",
+        "top.dcm",
+    ]
+    for name in files:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file_:
+            file_.write(b"DICM")
+
+
+@pytest.mark.unit
+@marks.parametrize("multiple", [False, True])
+@marks.parametrize("workers", [1, 4])
+def test_walk_matches_listdir_walk(tmpdir: str, multiple: bool, workers: int) -> None:
+    """Test that the scandir walk finds and groups files like the listdir walk."""
+    root = str(tmpdir)
+    _make_tree(root)
+
+    expected = _listdir_walk(root, FILE_TYPES, multiple)
+    series_a = [
+        os.path.join(root, "series-a", name)
+        for name in ("IMG1.dcm", "img2.dcm", "IMG10.dcm")
+    ]
+    assert (series_a in expected) == multiple
+    assert not any(path.endswith("DICOMDIR") for group in expected for path in group)
+    assert find_files_recursive(root, FILE_TYPES, multiple, workers) == expected
+    assert list(iter_files_recursive(root, FILE_TYPES, workers)) == [
+        path for group in _listdir_walk(root, FILE_TYPES, False) for path in group
+    ]
@@ -3,7 +3,6 @@
 from asyncio import run
 from dataclasses import dataclass
 import os
-from time import sleep
 from typing import Any, Dict, List
 from itkwasm_htj2k import decode  # type: ignore
 
@@ -116,29 +115,18 @@ def upload_export(
     import_id: str,
 ):
     """Upload the exported dataset to AltaDB and wait for the dataset to be created."""
-    run(dataset.upload.upload_files(new_dataset, export_dir1, import_name=import_id))
-
-    # Wait for max 10 mins till the images are processed by the server.
-    total_slept = 0
-    # First wait for one minute.
-    sleep(60)
-    total_slept += 60
-    # pylint: disable=unused-variable
-    imports, cursor = context.dataset.get_data_store_imports(org_id, new_dataset)
-    # then wait for 10 seconds till the images are processed by the server.
-    while total_slept < MAX_SLEEP_TIME:
-        # pylint: disable=unused-variable
-        imports, cursor = context.dataset.get_data_store_imports(org_id, new_dataset)
-        import_item = imports[0]
-        if import_item["status"] in [
-            ResourceStatus.CREATION_FAILURE.value,
-            ResourceStatus.CREATION_PARTIAL.value,
-        ]:
-            raise ValueError("The dataset creation has failed.")
-        if import_item["status"] == ResourceStatus.CREATION_SUCCESS.value:
-            break
-        sleep(10)
-        total_slept += 10
+
+    async def _upload_and_wait() -> Dict:
+        new_import_id = await dataset.upload.upload_files(
+            new_dataset, export_dir1, import_name=import_id
+        )
+        assert new_import_id, "Nothing was uploaded."
+        # Wait for max 15 mins till the images are processed by the server.
+        return await dataset.upload.wait_for_import(
+            new_import_id, new_dataset, timeout=MAX_SLEEP_TIME
+        )
+
+    import_item = run(_upload_and_wait())
     if import_item["status"] != ResourceStatus.CREATION_SUCCESS.value:
         raise ValueError("The dataset creation has failed.")
 